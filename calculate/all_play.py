@@ -0,0 +1,85 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "wrenjr@yahoo.com"
+
+import numpy as np
+
+from dao.base import BaseLeague
+from report.logger import get_logger
+
+logger = get_logger(__name__, propagate=False)
+
+
+class AllPlayRecords(object):
+    def __init__(self, team_ids, weeks, scores):
+        """All-play records (the wins, ties, and losses of every team against every other team in the league) of every
+        week of the season. The scores of each week are sorted once, after which the number of teams each team beat,
+        tied, and lost to is the number of scores below, equal to, and above its score in the sorted scores.
+
+        :param team_ids: list of team ids
+        :param weeks: list of weeks
+        :param scores: (teams x weeks) array-like of the scores of the teams in the order of the team ids
+        """
+        logger.debug("Calculating all-play records.")
+
+        self.team_ids = list(team_ids)
+        self.weeks = [int(week) for week in weeks]
+
+        self.team_ndx = {
+            str(team_id): ndx for ndx, team_id in enumerate(self.team_ids)
+        }
+        self.week_ndx = {week: ndx for ndx, week in enumerate(self.weeks)}
+
+        scores = np.asarray(scores, dtype=np.float64).reshape(
+            len(self.team_ids), len(self.weeks)
+        )
+        sorted_scores = np.sort(scores, axis=0)
+
+        num_lower_scores = np.empty(scores.shape, dtype=np.int64)
+        num_lower_or_equal_scores = np.empty(scores.shape, dtype=np.int64)
+        for week_ndx in range(len(self.weeks)):
+            num_lower_scores[:, week_ndx] = np.searchsorted(
+                sorted_scores[:, week_ndx], scores[:, week_ndx], side="left"
+            )
+            num_lower_or_equal_scores[:, week_ndx] = np.searchsorted(
+                sorted_scores[:, week_ndx], scores[:, week_ndx], side="right"
+            )
+
+        self.wins = num_lower_scores
+        # the score of the team itself is one of the equal scores
+        self.ties = num_lower_or_equal_scores - num_lower_scores - 1
+        self.losses = len(self.team_ids) - num_lower_or_equal_scores
+
+    @classmethod
+    def from_league(cls, league: BaseLeague, weeks):
+        """Get the all-play records of the teams of the first of the weeks from the points of every team by week.
+
+        :param league: league data
+        :param weeks: list of weeks
+        :return: AllPlayRecords
+        """
+        team_ids = list(league.teams_by_week.get(str(weeks[0])).keys())
+        scores = np.empty((len(team_ids), len(weeks)), dtype=np.float64)
+        for week_ndx, week in enumerate(weeks):
+            teams = league.teams_by_week.get(str(week))
+            for team_ndx, team_id in enumerate(team_ids):
+                scores[team_ndx, week_ndx] = float(teams[team_id].points)
+
+        return cls(team_ids, weeks, scores)
+
+    def has_week(self, week):
+        return int(week) in self.week_ndx
+
+    def get_record(self, team_id, week):
+        """Get the all-play record of a team in a week.
+
+        :param team_id: team id
+        :param week: week
+        :return: tuple of the number of wins, ties, and losses
+        """
+        team_ndx = self.team_ndx[str(team_id)]
+        week_ndx = self.week_ndx[int(week)]
+        return (
+            int(self.wins[team_ndx, week_ndx]),
+            int(self.ties[team_ndx, week_ndx]),
+            int(self.losses[team_ndx, week_ndx]),
+        )
@@ -2,15 +2,24 @@ __author__ = "Wren J. R. (uberfastman)"
 __email__ = "wrenjr@yahoo.com"
 
 import math
-from collections import defaultdict, Counter
+from collections import Counter
 
+from calculate.optimal_lineup import OptimalLineupSolver
+from report.instrumentation import instrumented
 from report.logger import get_logger
 
 logger = get_logger(__name__, propagate=False)
 
 
 class CoachingEfficiency(object):
-    def __init__(self, config, league):
+    def __init__(self, config, league, lineup_solver=None):
+        """Coaching efficiency (the points of a team as a percentage of the optimal points of its roster).
+
+        :param config: application config
+        :param league: league data
+        :param lineup_solver: OptimalLineupSolver of the league, which may already have the optimal points of the
+            rosters of every week (a new one is created if not given)
+        """
         logger.debug("Initializing coaching efficiency.")
 
         self.config = config
@@ -26,71 +35,13 @@ class CoachingEfficiency(object):
         self.roster_slot_counts = self.league.roster_position_counts
         self.roster_active_slots = self.league.active_positions
         self.roster_bench_slots = self.league.bench_positions
-        self.flex_positions_dict = self.league.get_flex_positions_dict()
+        self.lineup_solver = (
+            lineup_solver
+            if lineup_solver
+            else OptimalLineupSolver.from_league(self.league)
+        )
         self.coaching_efficiency_dqs = {}
 
-    def get_eligible_positions(self, player):
-        eligible = []
-        for position in self.roster_slot_counts:
-            eligible_positions = player.eligible_positions
-
-            if position in self.roster_bench_slots:
-                # do not tally eligible player for bench positions
-                pass
-            elif position in eligible_positions:
-                eligible.append(position)
-
-        return eligible
-
-    @staticmethod
-    def get_optimal_players(eligible_players, position, position_count):
-        player_list = eligible_players[position]
-        return sorted(player_list, key=lambda x: x.points, reverse=True)[
-            :position_count
-        ]
-
-    def get_optimal_flex(self, eligible_flex_players, optimal_position_lineup):
-
-        optimal_flex_players = []
-        allocated_flex_players = set()
-
-        ordered_flex_positions_dict = {
-            k: v
-            for k, v in sorted(
-                self.flex_positions_dict.items(), key=lambda item: len(item[1])
-            )
-        }
-
-        for (
-            flex_position,
-            base_positions,
-        ) in ordered_flex_positions_dict.items():
-            candidates = {
-                player for player in eligible_flex_players[flex_position]
-            }
-
-            # subtract already allocated players from candidates
-            available_flex_players = (
-                candidates
-                - set(optimal_position_lineup)
-                - allocated_flex_players
-            )
-
-            num_slots = self.roster_slot_counts[flex_position]
-
-            # convert back to list, sort, take as many as there are slots available
-            optimal_flex_position_players = sorted(
-                list(available_flex_players),
-                key=lambda x: x.points,
-                reverse=True,
-            )[:num_slots]
-
-            for player in optimal_flex_position_players:
-                allocated_flex_players.add(player)
-                optimal_flex_players.append(player)
-
-        return list(set(optimal_flex_players))
-
     def is_player_eligible(self, player, week, inactives):
         return (
             player.status in self.inactive_statuses
@@ -98,6 +49,7 @@ class CoachingEfficiency(object):
             or player.full_name in inactives
         )
 
+    @instrumented(arg_names=("team_name", "week"))
     def execute_coaching_efficiency(
         self,
         team_name,
@@ -112,44 +64,8 @@ class CoachingEfficiency(object):
             'Calculating coaching efficiency for team "{0}".'.format(team_name)
         )
 
-        eligible_position_players = defaultdict(list)
-        for player in team_roster:
-            for position in self.get_eligible_positions(player):
-                eligible_position_players[position].append(player)
-
-        optimal_full_lineup = []
-        optimal_primary_lineup = []
-        for position, position_count in self.roster_slot_counts.items():
-            # handle flex positions later...
-            if position not in self.flex_positions_dict.keys():
-                optimal_players_for_position = self.get_optimal_players(
-                    eligible_position_players, position, position_count
-                )
-                optimal_primary_lineup.extend(optimal_players_for_position)
-
-        optimal_full_lineup.extend(optimal_primary_lineup)
-
-        eligible_flex_players = defaultdict(list)
-        for position, players in eligible_position_players.items():
-            eligible_flex_players[position] = [
-                player
-                for player in players
-                if player not in optimal_primary_lineup
-            ]
-
-        # now that we have optimal by position, figure out flex positions
-        optimal_flex_players = list(
-            set(
-                self.get_optimal_flex(
-                    eligible_flex_players, optimal_primary_lineup
-                )
-            )
-        )
-
-        optimal_full_lineup.extend(optimal_flex_players)
-
         # calculate optimal score
-        optimal_score = sum([x.points for x in optimal_full_lineup])
+        optimal_score = self.lineup_solver.get_optimal_points(team_roster)
 
         # calculate coaching efficiency
         try:
@@ -0,0 +1,113 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "wrenjr@yahoo.com"
+
+import numpy as np
+
+
+def get_metric_value(value):
+    """Get the number of a metric value as it is displayed (such as "95.50%"). Values that are not numbers (such as
+    "DQ" or "N/A") are equal to each other and below every number.
+
+    :param value: metric value
+    :return: float
+    """
+    try:
+        return float(str(value).replace("%", ""))
+    except ValueError:
+        return -np.inf
+
+
+def get_num_first_place(results_data, column):
+    """Get the number of rows at the top of a metric table that have the same value in a column as the first row.
+
+    :param results_data: list of rows of the metric table
+    :param column: index of the column
+    :return: int
+    """
+    num_first_place = 0
+    for row in results_data:
+        if row[column] != results_data[0][column]:
+            break
+        num_first_place += 1
+    return num_first_place
+
+
+class MetricRanks(object):
+    def __init__(self, values, excluded=None, tiebreakers=None):
+        """Ranks of the rows of a metric table that is already ordered by the metric, in which consecutive rows with the
+        same value are tied. The tie groups and the dense (1, 2, 2, 3) and competition (1, 2, 2, 4) ranks of every row
+        are found in one pass over the values, and the order of the rows after ties are broken is a single stable sort
+        on the tie groups and the tiebreakers.
+
+        :param values: list of the metric value of every row
+        :param excluded: list of True for every row that is never tied (such as disqualified teams)
+        :param tiebreakers: list of the lists of the tiebreaker values of every row in order of precedence, where higher
+            values rank first
+        """
+        values = np.asarray(values, dtype=np.float64)
+        num_rows = len(values)
+
+        new_group = np.ones(num_rows, dtype=bool)
+        new_group[1:] = values[1:] != values[:-1]
+        group_starts = np.flatnonzero(new_group)
+
+        self.group_ids = np.cumsum(new_group) - 1
+        self.group_sizes = np.diff(np.append(group_starts, num_rows))
+        self.dense_ranks = self.group_ids + 1
+        self.competition_ranks = group_starts[self.group_ids] + 1
+
+        excluded = (
+            np.zeros(num_rows, dtype=bool)
+            if excluded is None
+            else np.asarray(excluded, dtype=bool)
+        )
+        # every row of a group has the same value, so the first row decides if the group is excluded
+        tied_groups = (self.group_sizes > 1) & ~excluded[group_starts]
+        self.tied = tied_groups[self.group_ids]
+        # every pair of rows in a tie group is a tie
+        self.num_ties = int(
+            np.sum(
+                self.group_sizes[tied_groups]
+                * (self.group_sizes[tied_groups] - 1)
+                // 2
+            )
+        )
+
+        if tiebreakers:
+            self.resolved_order = np.lexsort(
+                [
+                    -np.asarray(tiebreaker, dtype=np.float64)
+                    for tiebreaker in reversed(tiebreakers)
+                ]
+                + [self.group_ids]
+            )
+        else:
+            self.resolved_order = np.arange(num_rows)
+
+    @classmethod
+    def from_results_data(
+        cls, results_data, column, tiebreaker_columns=None, excluded=None
+    ):
+        """Get the ranks of the rows of a metric table from the values in one of its columns.
+
+        :param results_data: list of rows of the metric table
+        :param column: index of the column of the metric values
+        :param tiebreaker_columns: list of indices of the columns of the tiebreaker values in order of precedence
+        :param excluded: list of True for every row that is never tied (rows with a "DQ" value if not given)
+        :return: MetricRanks
+        """
+        return cls(
+            [get_metric_value(row[column]) for row in results_data],
+            excluded=(
+                excluded
+                if excluded is not None
+                else ["DQ" in row for row in results_data]
+            ),
+            tiebreakers=[
+                [
+                    get_metric_value(row[tiebreaker_column])
+                    for row in results_data
+                ]
+                for tiebreaker_column in (tiebreaker_columns or [])
+            ],
+        )
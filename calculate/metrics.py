@@ -5,9 +5,11 @@ import itertools
 from collections import defaultdict, OrderedDict
 from statistics import mean
 
-import numpy as np
-
+from calculate.all_play import AllPlayRecords
+from calculate.metric_ranks import MetricRanks
+from calculate.score_statistics import SeasonScoreStatistics
 from dao.base import BaseLeague, BaseTeam, BaseRecord, BasePlayer
+from report.instrumentation import instrumented
 from report.logger import get_logger
 
 logger = get_logger(__name__, propagate=False)
@@ -66,6 +68,7 @@ class CalculateMetrics(object):
         return current_standings_data
 
     @staticmethod
+    @instrumented()
     def get_division_standings_data(league: BaseLeague):
         logger.debug("Creating league division standings data.")
 
@@ -172,6 +175,7 @@ class CalculateMetrics(object):
         return current_division_standings_data
 
     @staticmethod
+    @instrumented()
     def get_median_standings_data(league: BaseLeague):
         logger.debug("Creating league median standings data.")
 
@@ -327,6 +331,50 @@ class CalculateMetrics(object):
 
         return sorted_playoff_probs_data
 
+    @staticmethod
+    @instrumented()
+    def get_playoff_scenarios_data(
+        league_standings, data_for_playoff_probs, next_week_scenarios
+    ):
+        logger.debug("Creating league playoff scenarios data.")
+
+        teams_by_id = {team.team_id: team for team in league_standings}
+        playoff_scenarios_data = []
+        for team in league_standings:  # type: BaseTeam
+            if team.team_id not in next_week_scenarios:
+                continue
+
+            opponent_id, win_chance, loss_chance = next_week_scenarios[
+                team.team_id
+            ]
+            playoff_chance = data_for_playoff_probs[int(team.team_id)][1]
+
+            # skip teams whose playoff chances do not depend on the next matchup
+            if win_chance == loss_chance and win_chance in (0.0, 100.0):
+                continue
+
+            playoff_scenarios_data.append(
+                [
+                    team.name,
+                    team.manager_str,
+                    teams_by_id[opponent_id].name,
+                    playoff_chance,
+                    win_chance,
+                    loss_chance,
+                ]
+            )
+
+        sorted_playoff_scenarios_data = sorted(
+            playoff_scenarios_data, key=lambda x: x[3], reverse=True
+        )
+        for team_playoff_scenarios_data in sorted_playoff_scenarios_data:
+            for ndx in range(3, 6):
+                team_playoff_scenarios_data[ndx] = (
+                    "%.2f%%" % team_playoff_scenarios_data[ndx]
+                )
+
+        return sorted_playoff_scenarios_data
+
     @staticmethod
     def get_score_data(score_results):
         logger.debug("Creating league score data.")
@@ -498,123 +546,72 @@ class CalculateMetrics(object):
             ndx += 1
         return covid_risk_data
 
-    def get_ties_count(self, results_data, tie_type, break_ties):
+    @staticmethod
+    def get_ties_count(results_data, tie_type, break_ties):
 
-        if tie_type == "power_ranking":
-            groups = [
-                list(group)
-                for key, group in itertools.groupby(
-                    results_data, lambda x: x[0]
-                )
-            ]
-            num_ties = self.count_ties(groups)
-        else:
-            groups = [
-                list(group)
-                for key, group in itertools.groupby(
-                    results_data, lambda x: x[3]
-                )
-            ]
-            num_ties = self.count_ties(groups)
+        metric_ranks = MetricRanks.from_results_data(
+            results_data, 0 if tie_type == "power_ranking" else 3
+        )
+        num_ties = metric_ranks.num_ties
 
         # if there are ties, record them and break them if possible
         if num_ties > 0:
-            ties_count = 0
-            team_index = 0
-            place = 1
-            while ties_count != num_ties:
-                for group in groups:
-                    group_has_ties = len(group) > 1 and "DQ" not in group[0]
-                    if group_has_ties:
-                        ties_count += sum(range(len(group)))
-
-                    for team in group:
-                        if tie_type == "power_ranking":
-                            results_data[team_index] = [
-                                str(team[0]) + ("*" if group_has_ties else ""),
-                                team[1],
-                                team[2],
-                            ]
-                        elif tie_type == "score" and break_ties:
-                            results_data[team_index] = [
-                                str(place),
-                                team[1],
-                                team[2],
-                                team[3],
-                            ]
-                            if group.index(team) != (len(group) - 1):
-                                place += 1
-                        elif tie_type == "bad_boy":
-                            results_data[team_index] = [
-                                str(place) + ("*" if group_has_ties else ""),
-                                team[1],
-                                team[2],
-                                team[3],
-                                team[4],
-                                team[5],
-                            ]
-                        else:
-                            results_data[team_index] = [
-                                str(place) + ("*" if group_has_ties else ""),
-                                team[1],
-                                team[2],
-                                team[3],
-                            ]
-
-                        if tie_type == "score":
-                            results_data[team_index].append(team[4])
+            for team_index, team in enumerate(list(results_data)):
+                tie_marker = "*" if metric_ranks.tied[team_index] else ""
+                place = str(metric_ranks.dense_ranks[team_index])
+
+                if tie_type == "power_ranking":
+                    results_data[team_index] = [
+                        str(team[0]) + tie_marker,
+                        team[1],
+                        team[2],
+                    ]
+                elif tie_type == "score" and break_ties:
+                    results_data[team_index] = [
+                        str(team_index + 1),
+                        team[1],
+                        team[2],
+                        team[3],
+                    ]
+                elif tie_type == "bad_boy":
+                    results_data[team_index] = [place + tie_marker] + team[1:6]
+                else:
+                    results_data[team_index] = [place + tie_marker] + team[1:4]
 
-                        team_index += 1
-                    place += 1
+                if tie_type == "score":
+                    results_data[team_index].append(team[4])
 
         if tie_type == "bad_boy":
-            groups = [
-                list(group)
-                for key, group in itertools.groupby(
-                    results_data, lambda x: x[3]
-                )
-            ]
-            num_ties = 0
-            for group in groups:
-                if len(group) > 1 and int(group[0][3]) > 0:
-                    num_ties += sum(range(len(group)))
-
-        return num_ties
-
-    @staticmethod
-    def count_ties(groups):
-        num_ties = 0
-        for group in groups:
-            if len(group) > 1 and "DQ" not in group[0]:
-                num_ties += sum(range(len(group)))
+            # teams without bad boy points are not tied
+            num_ties = MetricRanks.from_results_data(
+                results_data,
+                3,
+                excluded=[int(team[3]) <= 0 for team in results_data],
+            ).num_ties
 
         return num_ties
 
     @staticmethod
+    @instrumented()
     def resolve_score_ties(data_for_scores, break_ties):
-
-        groups = [
-            list(group)
-            for key, group in itertools.groupby(
-                data_for_scores, lambda x: x[3]
-            )
-        ]
+        """Order the teams tied in score by bench points. The places of the score data are already those of the tie
+        count, so only the places of the teams change when ties are broken.
+        """
+        metric_ranks = MetricRanks.from_results_data(
+            data_for_scores, 3, tiebreaker_columns=[-1]
+        )
 
         resolved_score_results_data = []
-        place = 1
-        for group in groups:
-            for team in sorted(group, key=lambda x: x[-1], reverse=True):
-                if groups.index(group) != 0:
-                    team[0] = place
-                else:
-                    if break_ties:
-                        team[0] = place
-                resolved_score_results_data.append(team)
-                place += 1
+        for place, team_index in enumerate(metric_ranks.resolved_order, 1):
+            team = data_for_scores[team_index]
+            if break_ties:
+                team[0] = str(place)
+            resolved_score_results_data.append(team)
 
         return resolved_score_results_data
 
     @staticmethod
+    @instrumented()
     def resolve_coaching_efficiency_ties(
         data_for_coaching_efficiency,
         ties_for_coaching_efficiency,
@@ -637,6 +634,23 @@ class CalculateMetrics(object):
                 and ties_for_coaching_efficiency > 0
                 and int(week) == int(week_for_report)
             ):
+                # retrieve the points of every week of the starters of all tied teams before comparing them
+                tied_team_names = [
+                    ce_result[1]
+                    for ce_result in data_for_coaching_efficiency
+                    if ce_result[0] == "1*"
+                ]
+                league.prefetch_player_points_by_week(
+                    [
+                        player.player_id
+                        for team_result in teams_results.values()
+                        if team_result.name in tied_team_names
+                        for player in team_result.roster
+                        if player.selected_position not in bench_positions
+                    ],
+                    range(1, int(week) + 1),
+                )
+
                 for ce_result in data_for_coaching_efficiency:
                     if ce_result[0] == "1*":
                         players = []
@@ -654,23 +668,11 @@ class CalculateMetrics(object):
                             if player.selected_position not in bench_positions:
                                 week_counter = 1
                                 while week_counter <= int(week):
-                                    players_by_week = league.players_by_week[
-                                        str(week_counter)
-                                    ]
-                                    if (
-                                        str(player.player_id)
-                                        in players_by_week.keys()
-                                    ):
-                                        weekly_player_points = players_by_week[
-                                            str(player.player_id)
-                                        ].points
-                                    else:
-                                        weekly_player_points = (
-                                            league.get_player_data_by_week(
-                                                str(player.player_id),
-                                                str(week_counter),
-                                            )
+                                    weekly_player_points = (
+                                        league.get_player_points_by_week(
+                                            player.player_id, week_counter
                                         )
+                                    )
 
                                     season_average_points_by_player_dict[
                                         player.player_id
@@ -737,34 +739,46 @@ class CalculateMetrics(object):
                             ce_result
                         )
 
-                groups = [
-                    list(group)
-                    for key, group in itertools.groupby(
-                        coaching_efficiency_results_data_with_tiebreakers,
-                        lambda x: x[3],
-                    )
-                ]
+                metric_ranks = MetricRanks.from_results_data(
+                    coaching_efficiency_results_data_with_tiebreakers,
+                    3,
+                    tiebreaker_columns=[-2, -1],
+                )
+                resolved_order = metric_ranks.resolved_order
             else:
-                groups = [
-                    list(group)
-                    for key, group in itertools.groupby(
-                        data_for_coaching_efficiency, lambda x: x[3]
+                coaching_efficiency_results_data_with_tiebreakers = (
+                    data_for_coaching_efficiency
+                )
+                metric_ranks = MetricRanks.from_results_data(
+                    coaching_efficiency_results_data_with_tiebreakers, 3
+                )
+
+                # without tiebreakers, the teams of each tie group are ordered by their last two columns (the manager
+                # and the coaching efficiency) in descending order
+                tie_order_keys = [
+                    (
+                        ce_result[-2] if ce_result[-2] != "DQ" else 0,
+                        ce_result[-1],
                     )
+                    for ce_result in data_for_coaching_efficiency
                 ]
+                resolved_order = sorted(
+                    sorted(
+                        range(len(tie_order_keys)),
+                        key=lambda x: tie_order_keys[x],
+                        reverse=True,
+                    ),
+                    key=lambda x: metric_ranks.group_ids[x],
+                )
 
             resolved_coaching_efficiency_results_data = []
-            place = 1
-            for group in groups:
-                for team in sorted(
-                    group,
-                    key=lambda x: (x[-2] if x[-2] != "DQ" else 0, x[-1]),
-                    reverse=True,
-                ):
-                    if groups.index(group) == 0:
-                        if break_ties:
-                            team[0] = place
-                    resolved_coaching_efficiency_results_data.append(team)
-                    place += 1
+            for place, team_index in enumerate(resolved_order, 1):
+                team = coaching_efficiency_results_data_with_tiebreakers[
+                    team_index
+                ]
+                if metric_ranks.group_ids[team_index] == 0 and break_ties:
+                    team[0] = place
+                resolved_coaching_efficiency_results_data.append(team)
             return resolved_coaching_efficiency_results_data
         else:
             logger.debug(
@@ -772,31 +786,6 @@ class CalculateMetrics(object):
             )
             return data_for_coaching_efficiency
 
-    @staticmethod
-    def resolve_season_average_ties(data_for_season_averages, with_percent):
-
-        groups = [
-            list(group)
-            for key, group in itertools.groupby(
-                data_for_season_averages, lambda x: x[2]
-            )
-        ]
-
-        resolved_season_average_results_data = []
-        place = 1
-        for group in groups:
-            for team in sorted(group, key=lambda x: x[-1], reverse=True):
-                team[0] = place
-                if with_percent:
-                    team[2] = "{0}% ({1})".format(str(team[2]), str(place))
-                else:
-                    team[2] = "{0} ({1})".format(str(team[2]), str(place))
-
-                resolved_season_average_results_data.append(team)
-            place += 1
-
-        return resolved_season_average_results_data
-
     # noinspection PyUnusedLocal
     @staticmethod
     def test_ties(teams_results):
@@ -872,6 +861,7 @@ class CalculateMetrics(object):
             # team.power_rank = test_power_rank
 
     @staticmethod
+    @instrumented(arg_names=("week",))
     def calculate_records(week, league: BaseLeague, custom_weekly_matchups):
         logger.debug('Calculating league records for week "{0}".'.format(week))
 
@@ -967,9 +957,26 @@ class CalculateMetrics(object):
         return records
 
     @staticmethod
-    def calculate_luck(week, league: BaseLeague, custom_weekly_matchups):
+    @instrumented(arg_names=("week",))
+    def calculate_luck(
+        week,
+        league: BaseLeague,
+        custom_weekly_matchups,
+        all_play_records: AllPlayRecords = None,
+    ):
+        """Calculate the luck of every team in a week from its all-play record (its record against every other team).
+
+        :param week: week
+        :param league: league data
+        :param custom_weekly_matchups: list of dicts of matchup results by team id for the week
+        :param all_play_records: AllPlayRecords of the season (calculated for the week alone if it is not included)
+        :return: dict of dicts of the luck and the all-play record (as a BaseRecord) by team id
+        """
         logger.debug('Calculating luck for week "{0}".'.format(week))
 
+        if all_play_records is None or not all_play_records.has_week(week):
+            all_play_records = AllPlayRecords.from_league(league, [week])
+
         luck_results = defaultdict(defaultdict)
 
         teams = league.teams_by_week.get(str(week))
@@ -980,45 +987,29 @@ class CalculateMetrics(object):
             for team_id, value in list(pair.items())
         }
 
-        for team_1 in teams.values():  # type: BaseTeam
-            luck_record = BaseRecord()
-
-            for team_2 in teams.values():
-                if team_1.team_id == team_2.team_id:
-                    continue
-                score_1 = team_1.points
-                score_2 = team_2.points
-
-                if float(score_1) > float(score_2):
-                    luck_record.add_win()
-                elif float(score_1) < float(score_2):
-                    luck_record.add_loss()
-                else:
-                    luck_record.add_tie()
+        # number of teams excluding current team
+        num_teams = float(len(teams)) - 1
 
-            luck_results[team_1.team_id]["luck_record"] = luck_record
+        for team in teams.values():  # type: BaseTeam
+            wins, ties, losses = all_play_records.get_record(
+                team.team_id, week
+            )
+            luck_results[team.team_id]["luck_record"] = BaseRecord(
+                wins=wins, ties=ties, losses=losses
+            )
 
             # calc luck %
             # TODO: assuming no ties...  how are tiebreakers handled?
             luck = 0.0
-            # number of teams excluding current team
-            num_teams = float(len(teams)) - 1
-
-            if luck_record.get_wins() != 0 and luck_record.get_losses() != 0:
-                matchup_result = matchups[str(team_1.team_id)]
+            if wins != 0 and losses != 0:
+                matchup_result = matchups[str(team.team_id)]
                 if matchup_result == "W" or matchup_result == "T":
-                    luck = (
-                        luck_record.get_losses() + luck_record.get_ties()
-                    ) / num_teams
+                    luck = (losses + ties) / num_teams
                 else:
-                    luck = (
-                        0
-                        - (luck_record.get_wins() + luck_record.get_ties())
-                        / num_teams
-                    )
+                    luck = 0 - (wins + ties) / num_teams
 
             # noinspection PyTypeChecker
-            luck_results[team_1.team_id]["luck"] = luck * 100
+            luck_results[team.team_id]["luck"] = luck * 100
 
         return luck_results
 
@@ -1033,6 +1024,7 @@ class CalculateMetrics(object):
                     team_rankings[metric_ranking_key] = rank
             rank += 1
 
+    @instrumented()
     def calculate_power_rankings(
         self,
         teams_results,
@@ -1072,35 +1064,10 @@ class CalculateMetrics(object):
         return power_ranked_teams
 
     @staticmethod
-    def calculate_z_scores(weekly_teams_results):
+    @instrumented()
+    def calculate_z_scores(
+        season_score_statistics: SeasonScoreStatistics, weekly_teams_points
+    ):
         logger.debug("Calculating z-scores.")
 
-        results = {}
-
-        # can only determine z_score
-        can_calculate = len(weekly_teams_results) > 2
-
-        # iterates through team ids of first week since team ids remain unchanged
-        for team_id in weekly_teams_results[0].keys():
-            z_score = None
-
-            if can_calculate:
-                scores = [
-                    week[team_id].points for week in weekly_teams_results
-                ]
-
-                scores_excluding_current = scores[:-1]
-                current_score = scores[-1]
-
-                standard_deviation = np.std(scores_excluding_current)
-                mean_score = np.mean(scores_excluding_current)
-                z_score = (
-                    (float(current_score) - float(mean_score))
-                    / float(standard_deviation)
-                    if standard_deviation != 0
-                    else 0
-                )
-
-            results[team_id] = z_score
-
-        return results
+        return season_score_statistics.get_z_scores(weekly_teams_points)
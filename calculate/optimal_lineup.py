@@ -0,0 +1,152 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "wrenjr@yahoo.com"
+
+from collections import defaultdict
+
+from dao.base import BaseLeague, get_roster_slot_table
+from report.logger import get_logger
+
+logger = get_logger(__name__, propagate=False)
+
+
+class OptimalLineupSolver(object):
+    def __init__(self, roster_slot_counts, bench_slots):
+        """Optimal lineups (the most points the players of a roster could have scored in the active roster slots) found
+        as a max-weight assignment of players to roster slots, which stays optimal when players are eligible for more
+        than one slot, such as overlapping flex slots like FLEX_RB_TE_WR and FLEX_QB_RB_TE_WR. Every slot that can be
+        filled is filled, and the optimal points of every roster are memoized by the fingerprint of the roster.
+
+        :param roster_slot_counts: dict of the number of slots of every roster position
+        :param bench_slots: list of bench roster positions, which are never part of the optimal lineup
+        """
+        logger.debug("Initializing optimal lineup solver.")
+
+        self.roster_slot_table = get_roster_slot_table(
+            roster_slot_counts, bench_slots
+        )
+        self.slot_positions = list(self.roster_slot_table.keys())
+        self.slot_counts = [
+            roster_slot_counts[position] for position in self.slot_positions
+        ]
+
+        # the numbers of open slots of every position are the digits of a mixed radix state number
+        self.slot_strides = []
+        stride = 1
+        for count in self.slot_counts:
+            self.slot_strides.append(stride)
+            stride *= count + 1
+        self.all_slots_open = sum(
+            count * stride
+            for count, stride in zip(self.slot_counts, self.slot_strides)
+        )
+
+        self.optimal_points_by_fingerprint = {}
+
+    @classmethod
+    def from_league(cls, league: BaseLeague):
+        return cls(league.roster_position_counts, league.bench_positions)
+
+    def get_roster_fingerprint(self, roster):
+        """Get the fingerprint of a roster, which is the same for any roster whose players have the same eligibility and
+        points, whoever the players are.
+
+        :param roster: list of BasePlayer
+        :return: tuple of (eligibility mask, points) tuples
+        """
+        return tuple(
+            sorted(
+                (
+                    player.get_eligibility_mask(self.roster_slot_table),
+                    float(player.points),
+                )
+                for player in roster
+            )
+        )
+
+    def solve_fingerprint(self, fingerprint):
+        """Get the optimal points of a roster fingerprint with dynamic programming over the players, where the state is
+        the number of open slots of every position.
+
+        :param fingerprint: roster fingerprint
+        :return: float
+        """
+        # players with the same eligibility are interchangeable, so only the highest scoring players of an eligibility
+        # that can all be in the lineup at once need to be considered
+        points_by_eligibility = defaultdict(list)
+        for eligibility_mask, points in fingerprint:
+            if eligibility_mask:
+                points_by_eligibility[eligibility_mask].append(points)
+
+        candidates = []
+        for eligibility_mask, points in points_by_eligibility.items():
+            eligible_slots = [
+                slot_ndx
+                for slot_ndx, position in enumerate(self.slot_positions)
+                if eligibility_mask & self.roster_slot_table[position]
+            ]
+            num_eligible_slots = sum(
+                self.slot_counts[slot_ndx] for slot_ndx in eligible_slots
+            )
+            for player_points in sorted(points, reverse=True)[
+                :num_eligible_slots
+            ]:
+                candidates.append((eligible_slots, player_points))
+
+        # (number of filled slots, points) by state, so that every slot that can be filled is filled
+        lineups = {self.all_slots_open: (0, 0.0)}
+        for eligible_slots, player_points in candidates:
+            next_lineups = dict(lineups)
+            for state, (num_filled, points) in lineups.items():
+                for slot_ndx in eligible_slots:
+                    stride = self.slot_strides[slot_ndx]
+                    if (state // stride) % (self.slot_counts[slot_ndx] + 1):
+                        lineup = (num_filled + 1, points + player_points)
+                        next_state = state - stride
+                        if (
+                            next_state not in next_lineups
+                            or lineup > next_lineups[next_state]
+                        ):
+                            next_lineups[next_state] = lineup
+            lineups = next_lineups
+
+        return max(lineups.values())[1]
+
+    def get_optimal_points(self, roster):
+        """Get the optimal points of a roster.
+
+        :param roster: list of BasePlayer
+        :return: float
+        """
+        fingerprint = self.get_roster_fingerprint(roster)
+        if fingerprint not in self.optimal_points_by_fingerprint:
+            self.optimal_points_by_fingerprint[
+                fingerprint
+            ] = self.solve_fingerprint(fingerprint)
+        return self.optimal_points_by_fingerprint[fingerprint]
+
+    def solve_rosters(self, rosters):
+        """Find the optimal points of many rosters (such as every roster of every week of the season) in one batch, in
+        which every distinct roster fingerprint is only solved once.
+
+        :param rosters: list of lists of BasePlayer
+        :return: list of the optimal points of every roster
+        """
+        fingerprints = [
+            self.get_roster_fingerprint(roster) for roster in rosters
+        ]
+        new_fingerprints = set(fingerprints) - set(
+            self.optimal_points_by_fingerprint.keys()
+        )
+        logger.debug(
+            "Solving optimal lineups of {0} rosters ({1} new).".format(
+                len(rosters), len(new_fingerprints)
+            )
+        )
+        for fingerprint in new_fingerprints:
+            self.optimal_points_by_fingerprint[
+                fingerprint
+            ] = self.solve_fingerprint(fingerprint)
+        return [
+            self.optimal_points_by_fingerprint[fingerprint]
+            for fingerprint in fingerprints
+        ]
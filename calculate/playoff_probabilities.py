@@ -3,21 +3,25 @@ __email__ = "wrenjr@yahoo.com"
 # code snippets: https://github.com/cdtdev/ff_monte_carlo (originally written by https://github.com/cdtdev)
 
 import datetime
-import itertools
+import hashlib
 import json
 import os
-import random
 import traceback
-from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
+from statistics import NormalDist
 
 import numpy as np
 
+from report.instrumentation import instrumented
 from report.logger import get_logger
 
 logger = get_logger(__name__, propagate=False)
 
 
 class PlayoffProbabilities(object):
+    clinch_status_markers = {"clinched": " (x)", "eliminated": " (e)"}
+
     def __init__(
         self,
         config,
@@ -29,6 +33,8 @@ class PlayoffProbabilities(object):
         save_data=False,
         recalculate=False,
         dev_offline=False,
+        num_workers=None,
+        precision=None,
     ):
         logger.debug("Initializing playoff probabilities.")
 
@@ -47,334 +53,114 @@ class PlayoffProbabilities(object):
         self.save_data = save_data
         self.recalculate = recalculate
         self.dev_offline = dev_offline
+        self.num_playoff_slots_per_division = self.config.getint(
+            "Settings", "num_playoff_slots_per_division", fallback=1
+        )
+        self.simulation_batch_size = self.config.getint(
+            "Settings", "playoff_simulation_batch_size", fallback=10000
+        )
+        self.num_workers = (
+            int(num_workers)
+            if num_workers is not None
+            else self.config.getint(
+                "Settings", "num_playoff_simulation_workers", fallback=1
+            )
+        )
+        seed = self.config.get(
+            "Settings", "playoff_simulation_seed", fallback=None
+        )
+        self.seed = int(seed) if seed else None
+        self.max_exact_outcomes = self.config.getint(
+            "Settings", "max_exact_playoff_outcomes", fallback=65536
+        )
+        precision = (
+            precision
+            if precision is not None
+            else self.config.get(
+                "Settings", "playoff_simulation_precision", fallback=None
+            )
+        )
+        self.precision = float(precision) if precision else None
+        self.confidence = self.config.getfloat(
+            "Settings", "playoff_simulation_confidence", fallback=0.95
+        )
+        self.antithetic = self.config.getboolean(
+            "Settings", "playoff_simulation_antithetic", fallback=False
+        )
+        self.simulations_run = self.simulations
+        self.is_exact = False
+        self.effective_sample_size = None
+        self.clinch_statuses = {}
+        self.use_cache = self.config.getboolean(
+            "Settings", "cache_playoff_probs", fallback=True
+        )
         self.playoff_probs_data = {}
 
+    def get_playoff_teams(self, standings, records=None):
+        return PlayoffTeams(standings, records, self.num_divisions)
+
+    @instrumented(arg_names=("week",))
     def calculate(self, week, week_for_report, standings, remaining_matchups):
         logger.debug("Calculating playoff probabilities.")
 
-        teams_for_playoff_probs = {}
-        for team in standings:
-            # noinspection PyTypeChecker,PyUnresolvedReferences
-            teams_for_playoff_probs[team.team_id] = TeamWithPlayoffProbs(
-                team.team_id,
-                team.name,
-                team.manager_str,
-                int(team.record.get_wins()),
-                int(team.record.get_losses()),
-                int(team.record.get_ties()),
-                float(team.record.get_points_for()),
-                self.num_playoff_slots,
-                self.simulations,
-                team.division,
-                int(team.record.get_division_wins()),
-                int(team.record.get_division_losses()),
-                int(team.record.get_division_ties()),
-                float(team.record.get_division_points_for()),
-            )
+        playoff_teams = self.get_playoff_teams(standings)
 
         try:
             if int(week) == int(week_for_report):
-                if self.recalculate:
+                cache_file_path = os.path.join(
+                    self.data_dir,
+                    "week_" + str(week_for_report),
+                    "playoff_probs_cache_{0}.json".format(
+                        self.get_inputs_hash(playoff_teams, remaining_matchups)
+                    ),
+                )
+                if (
+                    self.recalculate
+                    and self.use_cache
+                    and os.path.exists(cache_file_path)
+                ):
                     logger.info(
-                        "Running %s Monte Carlo playoff simulation%s..."
-                        % (
-                            "{0:,}".format(self.simulations),
-                            ("s" if self.simulations > 1 else ""),
-                        )
+                        "Using cached playoff probabilities for unchanged standings and remaining matchups."
                     )
+                    self.load_cache(cache_file_path)
 
+                elif self.recalculate:
                     begin = datetime.datetime.now()
-                    avg_wins = [0.0] * self.num_playoff_slots
-                    sim_count = 1
-                    while sim_count <= self.simulations:
-                        # create random binary results representing the rest of the season matchups and add them to the
-                        # existing wins
-                        for week, matchups in remaining_matchups.items():
-                            for matchup in matchups:
-                                team_1 = teams_for_playoff_probs[matchup[0]]
-                                team_2 = teams_for_playoff_probs[matchup[1]]
-                                result = int(random.getrandbits(1))
-                                if result == 1:
-                                    team_1.add_win()
-                                    team_2.add_loss()
-                                    if self.num_divisions > 0:
-                                        if (
-                                            team_1.division
-                                            and team_2.division
-                                            and team_1.division
-                                            == team_2.division
-                                        ):
-                                            team_1.add_division_win()
-                                            team_2.add_division_loss()
-                                else:
-                                    team_2.add_win()
-                                    team_1.add_loss()
-                                    if self.num_divisions > 0:
-                                        if (
-                                            team_1.division
-                                            and team_2.division
-                                            and team_1.division
-                                            == team_2.division
-                                        ):
-                                            team_2.add_division_win()
-                                            team_1.add_division_loss()
-
-                        if self.num_divisions > 0:
-                            sorted_divisions = self.group_by_division(
-                                teams_for_playoff_probs
-                            )
+                    tallies = self.simulate(playoff_teams, remaining_matchups)
 
-                            num_playoff_slots_per_division_without_leader = (
-                                self.config.getint(
-                                    "Settings",
-                                    "num_playoff_slots_per_division",
-                                    fallback=1,
-                                )
-                                - 1
-                            )
-
-                            # pick the teams making the playoffs
-                            division_winners = []
-                            division_qualifiers = []
-                            remaining_teams = []
-                            for division in sorted_divisions.values():
-                                division_winners.append(division[0])
-
-                                div_qual_count = deepcopy(
-                                    num_playoff_slots_per_division_without_leader
-                                )
-                                for remaining_team in division[1:]:
-                                    if div_qual_count > 0:
-                                        division_qualifiers.append(
-                                            remaining_team
-                                        )
-                                    else:
-                                        remaining_teams.append(remaining_team)
-                                    div_qual_count -= 1
-
-                            division_winners = sorted(
-                                division_winners,
-                                key=lambda x: x.get_wins_with_points(),
-                                reverse=True,
-                            )
-                            division_qualifiers = sorted(
-                                division_qualifiers,
-                                key=lambda x: x.get_wins_with_points(),
-                                reverse=True,
-                            )
-                            remaining_teams = sorted(
-                                remaining_teams,
-                                key=lambda x: x.get_wins_with_points(),
-                                reverse=True,
-                            )
-
-                            playoff_count = 1
-                            for team in division_winners:
-                                teams_for_playoff_probs[
-                                    division_winners[playoff_count - 1].team_id
-                                ].add_playoff_tally()
-                                avg_wins[playoff_count - 1] += round(
-                                    division_winners[
-                                        playoff_count - 1
-                                    ].get_wins_with_points(),
-                                    0,
-                                )
-                                teams_for_playoff_probs[
-                                    team.team_id
-                                ].add_playoff_stats(playoff_count)
-                                teams_for_playoff_probs[
-                                    team.team_id
-                                ].add_division_leader_tally()
-                                playoff_count += 1
-
-                            if (
-                                len(division_winners) < self.num_playoff_slots
-                            ) and (len(division_qualifiers) > 0):
-                                if len(division_qualifiers) <= (
-                                    self.num_playoff_slots
-                                    - len(division_winners)
-                                ):
-                                    remaining_playoff_count = 1
-                                    for division_qualifier_count in range(
-                                        1, len(division_qualifiers) + 1
-                                    ):
-                                        teams_for_playoff_probs[
-                                            division_qualifiers[
-                                                remaining_playoff_count - 1
-                                            ].team_id
-                                        ].add_playoff_tally()
-                                        avg_wins[
-                                            len(division_winners)
-                                            + remaining_playoff_count
-                                            - 1
-                                        ] += round(
-                                            division_qualifiers[
-                                                remaining_playoff_count - 1
-                                            ].get_wins_with_points(),
-                                            0,
-                                        )
-                                        teams_for_playoff_probs[
-                                            division_qualifiers[
-                                                remaining_playoff_count - 1
-                                            ].team_id
-                                        ].add_playoff_stats(
-                                            len(division_winners)
-                                            + remaining_playoff_count
-                                        )
-                                        teams_for_playoff_probs[
-                                            division_qualifiers[
-                                                remaining_playoff_count - 1
-                                            ].team_id
-                                        ].add_division_qualifier_tally()
-                                        remaining_playoff_count += 1
-                                else:
-                                    raise ValueError(
-                                        "Specified number of playoff qualifiers per division ({0}) exceeds"
-                                        " available league playoff spots. Please correct the value of "
-                                        '"num_playoff_slots_per_division" in "config.ini".'.format(
-                                            num_playoff_slots_per_division_without_leader
-                                            + 1
-                                        )
-                                    )
-
-                            if (
-                                len(division_winners)
-                                + len(division_qualifiers)
-                            ) < self.num_playoff_slots:
-                                remaining_playoff_count = 1
-                                while remaining_playoff_count <= (
-                                    self.num_playoff_slots
-                                    - len(division_winners)
-                                    - len(division_qualifiers)
-                                ):
-                                    teams_for_playoff_probs[
-                                        remaining_teams[
-                                            remaining_playoff_count - 1
-                                        ].team_id
-                                    ].add_playoff_tally()
-                                    avg_wins[
-                                        len(division_winners)
-                                        + len(division_qualifiers)
-                                        + remaining_playoff_count
-                                        - 1
-                                    ] += round(
-                                        remaining_teams[
-                                            remaining_playoff_count - 1
-                                        ].get_wins_with_points(),
-                                        0,
-                                    )
-                                    teams_for_playoff_probs[
-                                        remaining_teams[
-                                            remaining_playoff_count - 1
-                                        ].team_id
-                                    ].add_playoff_stats(
-                                        len(division_winners)
-                                        + len(division_qualifiers)
-                                        + remaining_playoff_count
-                                    )
-                                    remaining_playoff_count += 1
+                    # team objects are only built from the team arrays once all simulations have been tallied
+                    teams_for_playoff_probs = (
+                        self.get_teams_with_playoff_probs(
+                            playoff_teams, tallies
+                        )
+                    )
 
+                    playoff_min_wins = round(
+                        tallies["avg_wins"][self.num_playoff_slots - 1]
+                        / self.simulations_run,
+                        2,
+                    )
+                    for (
+                        team
+                    ) in teams_for_playoff_probs:  # type: TeamWithPlayoffProbs
+                        if team.is_predicted_division_leader:
+                            modified_team_name = "†"
+                        elif team.is_predicted_division_qualifier:
+                            modified_team_name = "‡"
                         else:
-                            # sort the teams
-                            sorted_teams = sorted(
-                                teams_for_playoff_probs.values(),
-                                key=lambda x: x.get_wins_with_points(),
-                                reverse=True,
-                            )
-
-                            # pick the teams making the playoffs
-                            playoff_count = 1
-                            while playoff_count <= self.num_playoff_slots:
-                                teams_for_playoff_probs[
-                                    sorted_teams[playoff_count - 1].team_id
-                                ].add_playoff_tally()
-                                avg_wins[playoff_count - 1] += round(
-                                    sorted_teams[
-                                        playoff_count - 1
-                                    ].get_wins_with_points(),
-                                    0,
+                            modified_team_name = (
+                                self.clinch_status_markers.get(
+                                    self.clinch_statuses.get(team.team_id), ""
                                 )
-                                teams_for_playoff_probs[
-                                    sorted_teams[playoff_count - 1].team_id
-                                ].add_playoff_stats(playoff_count)
-                                playoff_count += 1
-
-                        for (
-                            team
-                        ) in (
-                            teams_for_playoff_probs.values()
-                        ):  # type: TeamWithPlayoffProbs
-                            team.reset_to_base_record()
-
-                        sim_count += 1
-
-                    modified_team_names = {
-                        team_id: ""
-                        for team_id in teams_for_playoff_probs.keys()
-                    }
-                    if self.num_divisions > 0:
-                        sorted_divisions = self.group_by_division(
-                            teams_for_playoff_probs
-                        )
-
-                        num_playoff_slots_per_division_without_leader = (
-                            self.config.getint(
-                                "Settings",
-                                "num_playoff_slots_per_division",
-                                fallback=1,
                             )
-                            - 1
-                        )
 
-                        for division in sorted_divisions.values():
-                            ranked_division = sorted(
-                                division,
-                                key=lambda x: (
-                                    x.division_leader_tally,
-                                    x.division_qualifier_tally,
-                                ),
-                                reverse=True,
-                            )
-                            modified_team_names[
-                                ranked_division[0].team_id
-                            ] = "†"
-                            teams_for_playoff_probs[
-                                ranked_division[0].team_id
-                            ].is_predicted_division_leader = True
-
-                            division_qualifier_count = deepcopy(
-                                num_playoff_slots_per_division_without_leader
-                            )
-                            if division_qualifier_count > 0:
-                                for division_ndx in range(
-                                    1, division_qualifier_count + 1
-                                ):
-                                    modified_team_names[
-                                        ranked_division[division_ndx].team_id
-                                    ] = "‡"
-                                    teams_for_playoff_probs[
-                                        ranked_division[division_ndx].team_id
-                                    ].is_predicted_division_qualifier = True
-
-                                    division_qualifier_count -= 1
-
-                    for (
-                        team
-                    ) in (
-                        teams_for_playoff_probs.values()
-                    ):  # type: TeamWithPlayoffProbs
-                        playoff_min_wins = round(
-                            (avg_wins[self.num_playoff_slots - 1])
-                            / self.simulations,
-                            2,
-                        )
                         if playoff_min_wins > team.wins:
                             needed_wins = np.rint(playoff_min_wins - team.wins)
                         else:
                             needed_wins = 0
 
                         self.playoff_probs_data[int(team.team_id)] = [
-                            team.name + modified_team_names[team.team_id],
+                            team.name + modified_team_name,
                             team.get_playoff_chance_percentage(),
                             team.get_playoff_stats(),
                             needed_wins,
@@ -386,14 +172,19 @@ class PlayoffProbabilities(object):
 
                     delta = datetime.datetime.now() - begin
                     logger.info(
-                        "...ran %s playoff simulation%s in %s\n"
+                        "...%s %s playoff %s%s in %s\n"
                         % (
-                            "{0:,}".format(self.simulations),
-                            ("s" if self.simulations > 1 else ""),
+                            "enumerated" if self.is_exact else "ran",
+                            "{0:,}".format(self.simulations_run),
+                            "outcome" if self.is_exact else "simulation",
+                            ("s" if self.simulations_run > 1 else ""),
                             str(delta),
                         )
                     )
 
+                    if self.use_cache:
+                        self.save_cache(cache_file_path)
+
                     if self.save_data:
                         save_dir = os.path.join(
                             self.data_dir, "week_" + str(week_for_report)
@@ -448,35 +239,769 @@ class PlayoffProbabilities(object):
             )
             return None
 
-    def group_by_division(self, teams_for_playoff_probs):
-        # group teams into divisions
-        division_groups = [
-            list(group)
-            for key, group in itertools.groupby(
-                sorted(
-                    teams_for_playoff_probs.values(), key=lambda x: x.division
-                ),
-                lambda x: str(x.division),
+    def get_inputs_hash(self, playoff_teams, remaining_matchups):
+        """Hash everything the playoff probabilities depend on so that cached results are only reused when none of the
+        standings, remaining matchups, or simulation settings have changed.
+
+        :return: hex digest of the playoff probabilities inputs
+        """
+        inputs = {
+            "teams": [
+                list(team_inputs)
+                for team_inputs in zip(
+                    playoff_teams.team_ids,
+                    playoff_teams.names,
+                    playoff_teams.wins.tolist(),
+                    playoff_teams.losses.tolist(),
+                    playoff_teams.ties.tolist(),
+                    playoff_teams.points_for.tolist(),
+                    playoff_teams.divisions,
+                    playoff_teams.division_wins.tolist(),
+                    playoff_teams.division_losses.tolist(),
+                    playoff_teams.division_ties.tolist(),
+                    playoff_teams.division_points_for.tolist(),
+                )
+            ],
+            "remaining_matchups": [
+                [str(week), [list(matchup) for matchup in week_matchups]]
+                for week, week_matchups in remaining_matchups.items()
+            ],
+            "num_playoff_slots": self.num_playoff_slots,
+            "num_playoff_slots_per_division": self.num_playoff_slots_per_division,
+            "num_divisions": self.num_divisions,
+            "simulations": self.simulations,
+            "seed": self.seed,
+            "num_workers": self.num_workers,
+            "simulation_batch_size": self.simulation_batch_size,
+            "max_exact_outcomes": self.max_exact_outcomes,
+            "precision": self.precision,
+            "confidence": self.confidence,
+            "antithetic": self.antithetic,
+        }
+        return hashlib.sha256(
+            json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+    def load_cache(self, cache_file_path):
+        with open(cache_file_path, "r") as cache_in:
+            cached_results = json.load(cache_in)
+
+        self.simulations_run = cached_results["simulations_run"]
+        self.is_exact = cached_results["is_exact"]
+        self.effective_sample_size = cached_results["effective_sample_size"]
+        self.clinch_statuses = cached_results["clinch_statuses"]
+        # JSON object keys are always strings, so restore the integer team ids
+        self.playoff_probs_data = {
+            int(team_id): team_playoff_probs
+            for team_id, team_playoff_probs in cached_results[
+                "playoff_probs_data"
+            ].items()
+        }
+
+    def save_cache(self, cache_file_path):
+        cache_dir = os.path.dirname(cache_file_path)
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+        # remove cached results from previous inputs, since they can no longer be reused
+        for file_name in os.listdir(cache_dir):
+            if file_name.startswith("playoff_probs_cache_"):
+                os.remove(os.path.join(cache_dir, file_name))
+
+        with open(cache_file_path, "w") as cache_out:
+            json.dump(
+                {
+                    "simulations_run": self.simulations_run,
+                    "is_exact": self.is_exact,
+                    "effective_sample_size": self.effective_sample_size,
+                    "clinch_statuses": self.clinch_statuses,
+                    "playoff_probs_data": self.playoff_probs_data,
+                },
+                cache_out,
+                ensure_ascii=False,
+                indent=2,
             )
+
+    def get_simulator(self, playoff_teams, remaining_matchups):
+        """Create the playoff simulator for the teams that have not been eliminated from playoff contention (for leagues
+        without divisions) and the remaining matchups that involve them.
+
+        :return: tuple of the PlayoffSimulator and the array of the simulated team indices in simulator index order
+        """
+        if self.num_divisions == 0:
+            self.clinch_statuses = self.get_clinch_statuses(
+                playoff_teams, remaining_matchups
+            )
+        else:
+            self.clinch_statuses = {}
+        contested_team_indices = np.array(
+            [
+                team_ndx
+                for team_ndx, team_id in enumerate(playoff_teams.team_ids)
+                if self.clinch_statuses.get(team_id) != "eliminated"
+            ],
+            dtype=np.int64,
+        )
+        contested_teams = playoff_teams.get_subset(contested_team_indices)
+        contested_matchups = {
+            week: [
+                matchup
+                for matchup in week_matchups
+                if matchup[0] in contested_teams.team_indices
+                or matchup[1] in contested_teams.team_indices
+            ]
+            for week, week_matchups in remaining_matchups.items()
+        }
+
+        simulator = PlayoffSimulator(
+            contested_teams,
+            contested_matchups,
+            self.num_playoff_slots,
+            self.num_divisions,
+            self.num_playoff_slots_per_division,
+            self.simulation_batch_size,
+            self.antithetic,
+        )
+
+        return simulator, contested_team_indices
+
+    def simulate(self, playoff_teams, remaining_matchups):
+        """Calculate the playoff tallies for the remaining matchups. For leagues without divisions, teams that have
+        already been eliminated from playoff contention and the remaining matchups between them are left out. When the
+        number of possible outcomes of the remaining matchups does not exceed the configured maximum, every outcome is
+        enumerated once for exact playoff probabilities. Otherwise, the Monte Carlo playoff simulations are split into
+        shards of vectorized seasons. Each shard uses its own random number generator seeded from the master seed, so
+        results are reproducible for a given seed and number of workers, and shards are run in a process pool when more
+        than one worker is configured. When a target precision is configured, the simulations are run one batch per
+        shard at a time until the confidence interval of every team's playoff chance is within the target precision (or
+        the maximum number of simulations is reached).
+
+        :param playoff_teams: PlayoffTeams object
+        :param remaining_matchups: dict of lists of (team_1_id, team_2_id) matchup tuples by week
+        :return: dict of playoff tally arrays by team index of the playoff teams and summed wins (with points) by
+            playoff place
+        """
+        simulator, contested_team_indices = self.get_simulator(
+            playoff_teams, remaining_matchups
+        )
+
+        num_outcomes = 2**simulator.num_games
+        if (
+            0 < self.max_exact_outcomes
+            and num_outcomes <= self.max_exact_outcomes
+        ):
+            logger.info(
+                "Enumerating all %s possible outcome%s of %s remaining matchup%s for exact playoff probabilities..."
+                % (
+                    "{0:,}".format(num_outcomes),
+                    ("s" if num_outcomes > 1 else ""),
+                    simulator.num_games,
+                    ("s" if simulator.num_games != 1 else ""),
+                )
+            )
+            self.is_exact = True
+            self.simulations_run = num_outcomes
+            self.effective_sample_size = None
+            return self.expand_tallies(
+                playoff_teams.num_teams,
+                contested_team_indices,
+                simulator.run_exact(),
+            )
+
+        self.is_exact = False
+
+        num_shards = max(1, min(self.num_workers, self.simulations))
+        seed_sequence = np.random.SeedSequence(self.seed)
+        logger.debug(
+            "Playoff simulation master seed: {0}".format(seed_sequence.entropy)
+        )
+        if num_shards > 1:
+            logger.debug(
+                "Running playoff simulations in {0} shards across {1} worker processes.".format(
+                    num_shards, self.num_workers
+                )
+            )
+
+        executor = (
+            ProcessPoolExecutor(max_workers=num_shards)
+            if num_shards > 1
+            else None
+        )
+        try:
+            if self.precision:
+                logger.info(
+                    "Running up to %s Monte Carlo playoff simulation%s until all playoff chances are within "
+                    "+/-%s%% at %s%% confidence..."
+                    % (
+                        "{0:,}".format(self.simulations),
+                        ("s" if self.simulations > 1 else ""),
+                        self.precision,
+                        round(self.confidence * 100, 2),
+                    )
+                )
+
+                # run a batch in every shard at a time and stop once the confidence intervals have converged
+                tallies = simulator.get_empty_tallies()
+                while tallies["num_simulations"] < self.simulations:
+                    round_size = min(
+                        self.simulation_batch_size * num_shards,
+                        self.simulations - tallies["num_simulations"],
+                    )
+                    tallies = self.merge_tallies(
+                        [tallies]
+                        + self.run_shards(
+                            simulator,
+                            round_size,
+                            seed_sequence,
+                            num_shards,
+                            executor,
+                        )
+                    )
+
+                    max_interval = self.get_confidence_interval(
+                        tallies["playoff_tally"],
+                        tallies["num_simulations"],
+                        self.get_effective_sample_sizes(tallies),
+                    ).max()
+                    logger.debug(
+                        "Widest playoff chance confidence interval after {0:,} simulations: +/-{1:.3f}%".format(
+                            tallies["num_simulations"], max_interval
+                        )
+                    )
+                    if max_interval <= self.precision:
+                        break
+            else:
+                logger.info(
+                    "Running %s Monte Carlo playoff simulation%s..."
+                    % (
+                        "{0:,}".format(self.simulations),
+                        ("s" if self.simulations > 1 else ""),
+                    )
+                )
+
+                tallies = self.merge_tallies(
+                    self.run_shards(
+                        simulator,
+                        self.simulations,
+                        seed_sequence,
+                        num_shards,
+                        executor,
+                    )
+                )
+        finally:
+            if executor:
+                executor.shutdown()
+
+        self.simulations_run = int(tallies["num_simulations"])
+        effective_sample_sizes = self.get_effective_sample_sizes(tallies)
+        # teams that always or never made the playoffs have no sampling variance to compare against
+        contested = (
+            (tallies["playoff_tally"] > 0)
+            & (tallies["playoff_tally"] < self.simulations_run)
+            & np.isfinite(effective_sample_sizes)
+        )
+        self.effective_sample_size = (
+            int(effective_sample_sizes[contested].min())
+            if contested.any()
+            else self.simulations_run
+        )
+        if self.antithetic:
+            logger.info(
+                "Effective sample size of %s antithetic playoff simulations: %s"
+                % (
+                    "{0:,}".format(self.simulations_run),
+                    "{0:,}".format(self.effective_sample_size),
+                )
+            )
+
+        return self.expand_tallies(
+            playoff_teams.num_teams, contested_team_indices, tallies
+        )
+
+    def calculate_scenarios(self, standings, remaining_matchups, scenarios):
+        """Calculate the playoff chances of every team under each of a list of what-if scenarios in one batched pass.
+        All scenarios share the same simulated (or enumerated) outcomes of the remaining matchups and only differ in the
+        results they force, so differences between scenarios are not masked by simulation noise.
+
+        :param standings: list of BaseTeam objects
+        :param remaining_matchups: dict of lists of (team_1_id, team_2_id) matchup tuples by week
+        :param scenarios: list of scenarios, each a list of forced (week, winning_team_id, losing_team_id) results
+        :return: list (by scenario) of dicts of playoff chance percentages by team id
+        """
+        logger.debug(
+            "Calculating playoff probabilities for {0} scenarios.".format(
+                len(scenarios)
+            )
+        )
+
+        for scenario in scenarios:
+            for week, winning_team_id, losing_team_id in scenario:
+                week_matchups = remaining_matchups.get(
+                    week, remaining_matchups.get(str(week), [])
+                )
+                if not any(
+                    {winning_team_id, losing_team_id} == set(matchup)
+                    for matchup in week_matchups
+                ):
+                    raise ValueError(
+                        "Scenario result {0} beats {1} in week {2} is not a remaining matchup.".format(
+                            winning_team_id, losing_team_id, week
+                        )
+                    )
+
+        playoff_teams = self.get_playoff_teams(standings)
+        simulator, contested_team_indices = self.get_simulator(
+            playoff_teams, remaining_matchups
+        )
+        forced_outcomes = [
+            simulator.get_forced_outcomes(scenario) for scenario in scenarios
         ]
 
-        # sort the teams
-        sorted_divisions = {}
-        for division_num in range(1, self.num_divisions + 1):
-            sorted_divisions[division_num] = sorted(
-                division_groups[division_num - 1],
-                key=lambda x: (
-                    x.get_wins_with_points(),
-                    -x.losses,
-                    x.ties,
-                    x.get_division_wins_with_points(),
-                    -x.division_losses,
-                    x.division_ties,
+        if 0 < self.max_exact_outcomes and (
+            2**simulator.num_games <= self.max_exact_outcomes
+        ):
+            scenario_tallies = simulator.run_exact(forced_outcomes)
+        else:
+            num_shards = max(1, min(self.num_workers, self.simulations))
+            executor = (
+                ProcessPoolExecutor(max_workers=num_shards)
+                if num_shards > 1
+                else None
+            )
+            try:
+                shard_scenario_tallies = self.run_shards(
+                    simulator,
+                    self.simulations,
+                    np.random.SeedSequence(self.seed),
+                    num_shards,
+                    executor,
+                    forced_outcomes,
+                )
+            finally:
+                if executor:
+                    executor.shutdown()
+            scenario_tallies = [
+                self.merge_tallies(list(tallies_by_shard))
+                for tallies_by_shard in zip(*shard_scenario_tallies)
+            ]
+
+        scenario_playoff_chances = []
+        for tallies in scenario_tallies:
+            # eliminated teams are not simulated
+            tallies = self.expand_tallies(
+                playoff_teams.num_teams, contested_team_indices, tallies
+            )
+            scenario_playoff_chances.append(
+                self.get_playoff_chances(playoff_teams, tallies)
+            )
+
+        return scenario_playoff_chances
+
+    @instrumented()
+    def calculate_next_week_scenarios(self, standings, remaining_matchups):
+        """Calculate the playoff chances of every team with a win and with a loss in its next remaining matchup.
+
+        :param standings: list of BaseTeam objects
+        :param remaining_matchups: dict of lists of (team_1_id, team_2_id) matchup tuples by week
+        :return: dict of (opponent team id, playoff chance with a win, playoff chance with a loss) tuples by team id
+        """
+        if not remaining_matchups:
+            return {}
+
+        next_week = min(remaining_matchups.keys(), key=int)
+        scenarios = []
+        for team_1_id, team_2_id in remaining_matchups[next_week]:
+            scenarios.append([(next_week, team_1_id, team_2_id)])
+            scenarios.append([(next_week, team_2_id, team_1_id)])
+
+        scenario_playoff_chances = self.calculate_scenarios(
+            standings, remaining_matchups, scenarios
+        )
+
+        next_week_scenarios = {}
+        for matchup_ndx, (team_1_id, team_2_id) in enumerate(
+            remaining_matchups[next_week]
+        ):
+            team_1_wins = scenario_playoff_chances[2 * matchup_ndx]
+            team_2_wins = scenario_playoff_chances[(2 * matchup_ndx) + 1]
+            next_week_scenarios[team_1_id] = (
+                team_2_id,
+                team_1_wins[team_1_id],
+                team_2_wins[team_1_id],
+            )
+            next_week_scenarios[team_2_id] = (
+                team_1_id,
+                team_2_wins[team_2_id],
+                team_1_wins[team_2_id],
+            )
+
+        return next_week_scenarios
+
+    @instrumented()
+    def calculate_historical(
+        self, standings, records_by_week, matchups_by_week
+    ):
+        """Calculate the playoff chances of every team as of the end of each completed week in one batched pass. The
+        outcomes of the full schedule after the first completed week are drawn (or enumerated) once, and the playoff
+        chances as of each later week only use the outcomes of the matchups that had not been played yet, with the
+        matchups already played masked out and replaced by the records as of that week.
+
+        :param standings: list of BaseTeam objects
+        :param records_by_week: dict of dicts of BaseRecord objects by team id by completed week
+        :param matchups_by_week: dict of lists of (team_1_id, team_2_id) matchup tuples by week for the full regular
+            season
+        :return: dict of dicts of playoff chance percentages by team id by completed week
+        """
+        completed_weeks = sorted(records_by_week.keys(), key=int)
+        logger.debug(
+            "Calculating playoff probabilities as of weeks {0}.".format(
+                completed_weeks
+            )
+        )
+
+        # simulators are built in order of completed weeks, so each simulator's remaining matchups are the last columns
+        # of the outcomes of the first simulator
+        simulators = {}
+        for completed_week in completed_weeks:
+            simulators[completed_week] = PlayoffSimulator(
+                self.get_playoff_teams(
+                    standings, records_by_week[completed_week]
                 ),
-                reverse=True,
+                {
+                    week: matchups
+                    for week, matchups in sorted(
+                        matchups_by_week.items(), key=lambda x: int(x[0])
+                    )
+                    if int(week) > int(completed_week)
+                },
+                self.num_playoff_slots,
+                self.num_divisions,
+                self.num_playoff_slots_per_division,
+                self.simulation_batch_size,
+                self.antithetic,
+            )
+        first_simulator = simulators[completed_weeks[0]]
+        num_games = first_simulator.num_games
+
+        if 0 < self.max_exact_outcomes and (
+            2**num_games <= self.max_exact_outcomes
+        ):
+            outcome_batches = first_simulator.get_exact_outcomes()
+        else:
+            outcome_batches = first_simulator.get_random_outcomes(
+                self.simulations, np.random.SeedSequence(self.seed)
+            )
+
+        tallies_by_week = {
+            completed_week: simulator.get_empty_tallies()
+            for completed_week, simulator in simulators.items()
+        }
+        for outcomes, num_pairs in outcome_batches:
+            for completed_week, simulator in simulators.items():
+                simulator.tally_outcomes(
+                    outcomes[:, num_games - simulator.num_games :],
+                    tallies_by_week[completed_week],
+                    num_pairs,
+                )
+
+        playoff_chances_by_week = {
+            completed_week: self.get_playoff_chances(
+                simulators[completed_week].teams, tallies
+            )
+            for completed_week, tallies in tallies_by_week.items()
+        }
+
+        return playoff_chances_by_week
+
+    @staticmethod
+    def run_shards(
+        simulator,
+        num_simulations,
+        seed_sequence,
+        num_shards,
+        executor=None,
+        forced_outcomes=None,
+    ):
+        """Split a number of simulations into shards that each use their own random number generator spawned from the
+        seed sequence.
+
+        :return: list of dicts of playoff tallies by shard, or of lists of dicts of playoff tallies by scenario when
+            forced outcomes are given
+        """
+        num_shards = max(1, min(num_shards, num_simulations))
+        shard_sizes = [
+            (num_simulations // num_shards)
+            + (1 if shard_ndx < (num_simulations % num_shards) else 0)
+            for shard_ndx in range(num_shards)
+        ]
+        shard_seeds = seed_sequence.spawn(num_shards)
+
+        if executor and num_shards > 1:
+            return list(
+                executor.map(
+                    simulator.run,
+                    shard_sizes,
+                    shard_seeds,
+                    [forced_outcomes] * num_shards,
+                )
+            )
+        else:
+            return [
+                simulator.run(shard_size, shard_seed, forced_outcomes)
+                for shard_size, shard_seed in zip(shard_sizes, shard_seeds)
+            ]
+
+    @staticmethod
+    def merge_tallies(tallies_list):
+        return {
+            tally_key: sum(tallies[tally_key] for tallies in tallies_list)
+            for tally_key in tallies_list[0].keys()
+        }
+
+    @staticmethod
+    def get_effective_sample_sizes(tallies):
+        """Get the number of independent simulations that would give the same variance of each team's playoff chance.
+        Without antithetic pairs this is the number of simulations run. With antithetic pairs, the variance is
+        estimated from the means of the pairs, so negatively correlated pairs give an effective sample size larger
+        than the number of simulations run.
+
+        :param tallies: dict of playoff tally arrays from the simulator
+        :return: array of effective sample sizes by team index (infinite when the pairs have no variance)
+        """
+        num_simulations = tallies["num_simulations"]
+        num_pairs = tallies["num_antithetic_pairs"]
+        effective_sample_sizes = np.full(
+            len(tallies["playoff_tally"]), float(num_simulations)
+        )
+        if num_pairs == 0:
+            return effective_sample_sizes
+
+        p = tallies["playoff_tally"] / num_simulations
+        pair_variance = np.maximum(
+            (tallies["playoff_tally"] + 2 * tallies["antithetic_pair_tally"])
+            / (4 * num_pairs)
+            - p**2,
+            0,
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            effective_sample_sizes = np.where(
+                p * (1 - p) > 0,
+                num_pairs * p * (1 - p) / pair_variance,
+                effective_sample_sizes,
+            )
+        return effective_sample_sizes
+
+    def get_confidence_interval(
+        self, tally, num_simulations, effective_sample_sizes=None
+    ):
+        """Get the half-width of the Wilson score interval of each team's playoff chance at the configured confidence.
+
+        :param tally: array of the number of simulations in which each team made the playoffs
+        :param num_simulations: number of simulations run
+        :param effective_sample_sizes: array of effective sample sizes by team index (defaults to num_simulations)
+        :return: array of confidence interval half-widths in percentage points
+        """
+        z = NormalDist().inv_cdf(0.5 + (self.confidence / 2))
+        p = tally / num_simulations
+        n = (
+            effective_sample_sizes
+            if effective_sample_sizes is not None
+            else num_simulations
+        )
+        half_width = (
+            z * np.sqrt((p * (1 - p) / n) + (z**2 / (4 * n**2)))
+        ) / (1 + (z**2 / n))
+        return half_width * 100.0
+
+    def get_clinch_statuses(self, playoff_teams, remaining_matchups):
+        """Find the teams that have clinched a playoff spot or been eliminated from playoff contention by comparing
+        the best-case and worst-case wins (with points) of every team. Points for are not simulated, so they only break
+        ties between equal win totals.
+
+        :param playoff_teams: PlayoffTeams object
+        :param remaining_matchups: dict of lists of (team_1_id, team_2_id) matchup tuples by week
+        :return: dict of "clinched" or "eliminated" statuses by team id (contested teams are left out)
+        """
+        num_remaining_games = np.zeros(playoff_teams.num_teams, dtype=np.int64)
+        for week_matchups in remaining_matchups.values():
+            for matchup in week_matchups:
+                num_remaining_games[
+                    playoff_teams.team_indices[matchup[0]]
+                ] += 1
+                num_remaining_games[
+                    playoff_teams.team_indices[matchup[1]]
+                ] += 1
+
+        min_wins_with_points = playoff_teams.get_wins_with_points()
+        max_wins_with_points = min_wins_with_points + num_remaining_games
+        other_teams = ~np.eye(playoff_teams.num_teams, dtype=bool)
+
+        # a team has clinched if fewer teams than there are playoff slots can ever match its worst case, and has been
+        # eliminated if at least as many teams as there are playoff slots will always beat its best case
+        num_teams_able_to_match = (
+            (max_wins_with_points[None, :] >= min_wins_with_points[:, None])
+            & other_teams
+        ).sum(axis=1)
+        num_teams_always_ahead = (
+            (min_wins_with_points[None, :] > max_wins_with_points[:, None])
+            & other_teams
+        ).sum(axis=1)
+
+        clinch_statuses = {}
+        for team_ndx, team_id in enumerate(playoff_teams.team_ids):
+            if num_teams_able_to_match[team_ndx] < self.num_playoff_slots:
+                clinch_statuses[team_id] = "clinched"
+            elif num_teams_always_ahead[team_ndx] >= self.num_playoff_slots:
+                clinch_statuses[team_id] = "eliminated"
+
+        logger.debug(
+            "Playoff clinch statuses before simulation: {0}".format(
+                clinch_statuses
+            )
+        )
+
+        return clinch_statuses
+
+    @staticmethod
+    def expand_tallies(num_teams, team_indices, tallies):
+        """Map the playoff tallies of the simulated teams back to the indices of all teams, where teams that were not
+        simulated (eliminated teams) never make the playoffs.
+
+        :param num_teams: number of teams
+        :param team_indices: array of the team indices of the simulated teams in simulator index order
+        :param tallies: dict of playoff tally arrays by simulator index
+        :return: dict of playoff tally arrays by team index
+        """
+        expanded_tallies = dict(tallies)
+        for tally_key in [
+            "playoff_tally",
+            "playoff_stats",
+            "division_leader_tally",
+            "division_qualifier_tally",
+            "antithetic_pair_tally",
+        ]:
+            expanded_tallies[tally_key] = np.zeros(
+                (num_teams,) + tallies[tally_key].shape[1:],
+                dtype=tallies[tally_key].dtype,
+            )
+            expanded_tallies[tally_key][team_indices] = tallies[tally_key]
+        return expanded_tallies
+
+    @staticmethod
+    def get_playoff_chances(playoff_teams, tallies):
+        """Get the playoff chance percentages of every team from the tallies.
+
+        :return: dict of playoff chance percentages by team id
+        """
+        return {
+            team_id: round(
+                (
+                    tallies["playoff_tally"][team_ndx]
+                    / tallies["num_simulations"]
+                )
+                * 100.0,
+                2,
             )
+            for team_ndx, team_id in enumerate(playoff_teams.team_ids)
+        }
 
-        return sorted_divisions
+    def get_predicted_division_ranks(self, playoff_teams, tallies):
+        """Predict the division leaders and division qualifiers by ranking the teams within each division by how often
+        they led or qualified from their division in the simulations, with ties broken by the current standings.
+
+        :return: tuple of boolean arrays by team index of the predicted division leaders and division qualifiers
+        """
+        is_predicted_division_leader = np.zeros(
+            playoff_teams.num_teams, dtype=bool
+        )
+        is_predicted_division_qualifier = np.zeros(
+            playoff_teams.num_teams, dtype=bool
+        )
+
+        # sort the teams within each division (np.lexsort uses the last key as the primary sort key)
+        division_order = np.lexsort(
+            (
+                -playoff_teams.division_ties,
+                playoff_teams.division_losses,
+                -playoff_teams.get_division_wins_with_points(),
+                -playoff_teams.ties,
+                playoff_teams.losses,
+                -playoff_teams.get_wins_with_points(),
+                -tallies["division_qualifier_tally"],
+                -tallies["division_leader_tally"],
+                playoff_teams.division_ndx,
+            )
+        )
+
+        division_start = 0
+        for division_size in playoff_teams.division_sizes:
+            division_teams = division_order[
+                division_start : division_start + division_size
+            ]
+            is_predicted_division_leader[division_teams[:1]] = True
+            is_predicted_division_qualifier[
+                division_teams[1 : self.num_playoff_slots_per_division]
+            ] = True
+            division_start += division_size
+
+        return is_predicted_division_leader, is_predicted_division_qualifier
+
+    def get_teams_with_playoff_probs(self, playoff_teams, tallies):
+        """Build the team objects with their playoff probabilities from the team arrays and the playoff tallies.
+
+        :param playoff_teams: PlayoffTeams object
+        :param tallies: dict of playoff tally arrays by team index
+        :return: list of TeamWithPlayoffProbs objects in team index order
+        """
+        if self.num_divisions > 0:
+            (
+                is_predicted_division_leader,
+                is_predicted_division_qualifier,
+            ) = self.get_predicted_division_ranks(playoff_teams, tallies)
+        else:
+            is_predicted_division_leader = np.zeros(
+                playoff_teams.num_teams, dtype=bool
+            )
+            is_predicted_division_qualifier = is_predicted_division_leader
+
+        teams_with_playoff_probs = []
+        for team_ndx, team_id in enumerate(playoff_teams.team_ids):
+            team = TeamWithPlayoffProbs(
+                team_id,
+                playoff_teams.names[team_ndx],
+                playoff_teams.managers[team_ndx],
+                int(playoff_teams.wins[team_ndx]),
+                int(playoff_teams.losses[team_ndx]),
+                int(playoff_teams.ties[team_ndx]),
+                float(playoff_teams.points_for[team_ndx]),
+                self.num_playoff_slots,
+                self.simulations_run,
+                playoff_teams.divisions[team_ndx],
+                int(playoff_teams.division_wins[team_ndx]),
+                int(playoff_teams.division_losses[team_ndx]),
+                int(playoff_teams.division_ties[team_ndx]),
+                float(playoff_teams.division_points_for[team_ndx]),
+            )
+            team.add_playoff_tally(int(tallies["playoff_tally"][team_ndx]))
+            team.add_division_leader_tally(
+                int(tallies["division_leader_tally"][team_ndx])
+            )
+            team.add_division_qualifier_tally(
+                int(tallies["division_qualifier_tally"][team_ndx])
+            )
+            for place_ndx, place_tally in enumerate(
+                tallies["playoff_stats"][team_ndx]
+            ):
+                team.add_playoff_stats(place_ndx + 1, int(place_tally))
+            team.is_predicted_division_leader = bool(
+                is_predicted_division_leader[team_ndx]
+            )
+            team.is_predicted_division_qualifier = bool(
+                is_predicted_division_qualifier[team_ndx]
+            )
+            teams_with_playoff_probs.append(team)
+
+        return teams_with_playoff_probs
 
     def __str__(self):
         return json.dumps(self.__dict__, indent=2, ensure_ascii=False)
@@ -485,6 +1010,508 @@ class PlayoffProbabilities(object):
         return json.dumps(self.__dict__, indent=2, ensure_ascii=False)
 
 
+class PlayoffSimulator(object):
+    def __init__(
+        self,
+        teams,
+        remaining_matchups,
+        num_playoff_slots,
+        num_divisions=0,
+        num_playoff_slots_per_division=1,
+        batch_size=10000,
+        antithetic=False,
+    ):
+        """Vectorized Monte Carlo playoff simulator. Only holds NumPy arrays derived from the teams and remaining
+        matchups so that it can be sent to worker processes.
+
+        :param teams: PlayoffTeams object (simulator indices are the team indices)
+        :param remaining_matchups: dict of lists of (team_1_id, team_2_id) matchup tuples by week
+        :param antithetic: simulate each random season together with its mirror season in which every remaining
+            matchup has the opposite result
+        """
+        self.teams = teams
+        self.num_teams = teams.num_teams
+        self.num_playoff_slots = int(num_playoff_slots)
+        self.num_divisions = num_divisions
+        self.num_playoff_slots_per_division = num_playoff_slots_per_division
+        self.batch_size = int(batch_size)
+        self.antithetic = antithetic
+        self.team_ids = teams.team_ids
+
+        matchups = [
+            matchup
+            for week_matchups in remaining_matchups.values()
+            for matchup in week_matchups
+        ]
+        self.num_games = len(matchups)
+        self.game_weeks = [
+            int(week)
+            for week, week_matchups in remaining_matchups.items()
+            for _ in week_matchups
+        ]
+        self.game_team_ids = [tuple(matchup) for matchup in matchups]
+
+        # game x team incidence of each remaining matchup, where a win for the first team in the matchup is +1 for the
+        # first team and -1 for the second team relative to the baseline of the second team winning every matchup
+        self.game_results = np.zeros(
+            (self.num_games, self.num_teams), dtype=np.int64
+        )
+        self.division_game_results = np.zeros(
+            (self.num_games, self.num_teams), dtype=np.int64
+        )
+        self.num_games_by_team = np.zeros(self.num_teams, dtype=np.int64)
+        self.num_division_games_by_team = np.zeros(
+            self.num_teams, dtype=np.int64
+        )
+        self.baseline_wins = np.zeros(self.num_teams, dtype=np.int64)
+        self.baseline_division_wins = np.zeros(self.num_teams, dtype=np.int64)
+        for game_ndx, matchup in enumerate(matchups):
+            # opponents that are not simulated (eliminated teams) are left out of the incidence
+            team_1_ndx = teams.team_indices.get(matchup[0])
+            team_2_ndx = teams.team_indices.get(matchup[1])
+            if team_1_ndx is not None:
+                self.game_results[game_ndx, team_1_ndx] += 1
+                self.num_games_by_team[team_1_ndx] += 1
+            if team_2_ndx is not None:
+                self.game_results[game_ndx, team_2_ndx] -= 1
+                self.num_games_by_team[team_2_ndx] += 1
+                self.baseline_wins[team_2_ndx] += 1
+
+            if self.num_divisions > 0:
+                if (
+                    team_1_ndx is not None
+                    and team_2_ndx is not None
+                    and teams.divisions[team_1_ndx]
+                    and teams.divisions[team_2_ndx]
+                    and teams.divisions[team_1_ndx]
+                    == teams.divisions[team_2_ndx]
+                ):
+                    self.division_game_results[game_ndx, team_1_ndx] += 1
+                    self.division_game_results[game_ndx, team_2_ndx] -= 1
+                    self.num_division_games_by_team[
+                        [team_1_ndx, team_2_ndx]
+                    ] += 1
+                    self.baseline_division_wins[team_2_ndx] += 1
+
+        self.base_wins = teams.wins
+        self.base_losses = teams.losses
+        self.ties = teams.ties
+        self.points_for = teams.points_for
+        self.base_division_wins = teams.division_wins
+        self.base_division_losses = teams.division_losses
+        self.division_ties = teams.division_ties
+        self.division_points_for = teams.division_points_for
+        self.division_ndx = teams.division_ndx
+        self.division_sizes = teams.division_sizes
+
+    def get_empty_tallies(self):
+        return {
+            "playoff_tally": np.zeros(self.num_teams, dtype=np.int64),
+            "playoff_stats": np.zeros(
+                (self.num_teams, self.num_playoff_slots), dtype=np.int64
+            ),
+            "division_leader_tally": np.zeros(self.num_teams, dtype=np.int64),
+            "division_qualifier_tally": np.zeros(
+                self.num_teams, dtype=np.int64
+            ),
+            "avg_wins": np.zeros(self.num_playoff_slots),
+            "num_simulations": 0,
+            "antithetic_pair_tally": np.zeros(self.num_teams, dtype=np.int64),
+            "num_antithetic_pairs": 0,
+        }
+
+    def get_forced_outcomes(self, scenario):
+        """Get the outcome columns forced by a scenario. Results of matchups that are not simulated (between teams that
+        have been eliminated) cannot change the playoff chances, so they are left out.
+
+        :param scenario: list of forced (week, winning_team_id, losing_team_id) results
+        :return: list of (game index, outcome) tuples, where an outcome of 1 is a win for the first team in the matchup
+        """
+        forced_outcomes = []
+        for week, winning_team_id, losing_team_id in scenario:
+            for game_ndx, team_ids in enumerate(self.game_team_ids):
+                if self.game_weeks[game_ndx] == int(week) and set(
+                    team_ids
+                ) == {winning_team_id, losing_team_id}:
+                    forced_outcomes.append(
+                        (game_ndx, 1 if team_ids[0] == winning_team_id else 0)
+                    )
+        return forced_outcomes
+
+    def get_random_outcomes(self, num_simulations, seed=None):
+        """Generate batches of random binary results representing the rest of the season matchups (1 is a win for the
+        first team in the matchup).
+
+        :param num_simulations: number of seasons to simulate
+        :param seed: seed (or np.random.SeedSequence) for the random number generator
+        :return: generator of (outcomes array, number of antithetic pairs) tuples
+        """
+        rng = np.random.default_rng(seed)
+        sim_count = 0
+        while sim_count < num_simulations:
+            batch_size = min(self.batch_size, num_simulations - sim_count)
+
+            num_pairs = batch_size // 2 if self.antithetic else 0
+            if num_pairs > 0:
+                outcomes = rng.integers(
+                    0, 2, size=(num_pairs, self.num_games), dtype=np.int64
+                )
+                outcomes = np.concatenate((outcomes, 1 - outcomes))
+            else:
+                outcomes = rng.integers(
+                    0, 2, size=(batch_size, self.num_games), dtype=np.int64
+                )
+
+            sim_count += outcomes.shape[0]
+            yield outcomes, num_pairs
+
+    def get_exact_outcomes(self):
+        """Generate batches of every possible outcome of the remaining matchups exactly once, where the bits of each
+        outcome number are the results of the remaining matchups.
+
+        :return: generator of (outcomes array, number of antithetic pairs) tuples
+        """
+        num_outcomes = 2**self.num_games
+        game_bits = np.arange(self.num_games, dtype=np.int64)
+        outcome_count = 0
+        while outcome_count < num_outcomes:
+            batch_size = min(self.batch_size, num_outcomes - outcome_count)
+
+            outcome_nums = np.arange(
+                outcome_count, outcome_count + batch_size, dtype=np.int64
+            )
+
+            outcome_count += batch_size
+            yield (outcome_nums[:, None] >> game_bits) & 1, 0
+
+    def run(self, num_simulations, seed=None, forced_outcomes=None):
+        """Run a number of simulated seasons in batches.
+
+        :param num_simulations: number of seasons to simulate
+        :param seed: seed (or np.random.SeedSequence) for the random number generator
+        :param forced_outcomes: optional list (by scenario) of lists of (game index, outcome) tuples
+        :return: dict of playoff tally arrays by team index and summed wins (with points) by playoff place, or a list
+            of them by scenario when forced outcomes are given
+        """
+        return self.tally_scenarios(
+            self.get_random_outcomes(num_simulations, seed), forced_outcomes
+        )
+
+    def run_exact(self, forced_outcomes=None):
+        """Enumerate every possible outcome of the remaining matchups exactly once in batches.
+
+        :param forced_outcomes: optional list (by scenario) of lists of (game index, outcome) tuples
+        :return: dict of playoff tally arrays by team index and summed wins (with points) by playoff place, or a list
+            of them by scenario when forced outcomes are given
+        """
+        return self.tally_scenarios(self.get_exact_outcomes(), forced_outcomes)
+
+    def tally_scenarios(self, outcome_batches, forced_outcomes=None):
+        """Tally batches of outcomes for every scenario, where each scenario overrides the shared outcomes with its
+        forced outcomes.
+        """
+        scenarios = forced_outcomes if forced_outcomes is not None else [[]]
+        scenario_tallies = [self.get_empty_tallies() for _ in scenarios]
+
+        for outcomes, num_pairs in outcome_batches:
+            for scenario, tallies in zip(scenarios, scenario_tallies):
+                if scenario:
+                    scenario_outcomes = outcomes.copy()
+                    for game_ndx, outcome in scenario:
+                        scenario_outcomes[:, game_ndx] = outcome
+                else:
+                    scenario_outcomes = outcomes
+                self.tally_outcomes(scenario_outcomes, tallies, num_pairs)
+
+        if forced_outcomes is not None:
+            return scenario_tallies
+        else:
+            return scenario_tallies[0]
+
+    def tally_outcomes(self, outcomes, tallies, num_pairs=0):
+        """Add a batch of remaining matchup outcomes to the existing records, rank the resulting seasons, and add the
+        teams making the playoffs to the tallies in place.
+
+        :param outcomes: array (seasons x remaining matchups) where 1 is a win for the first team in the matchup
+        :param tallies: dict of tally arrays from get_empty_tallies()
+        :param num_pairs: number of antithetic pairs, where the first 2 x num_pairs seasons are the random seasons
+            followed by their mirror seasons
+        """
+        batch_size = outcomes.shape[0]
+
+        wins = (
+            self.base_wins + self.baseline_wins + outcomes @ self.game_results
+        )
+        losses = (
+            self.base_losses + self.num_games_by_team - (wins - self.base_wins)
+        )
+        wins_with_points = wins + (self.points_for / 1000000)
+
+        if self.num_divisions > 0:
+            division_wins = (
+                self.base_division_wins
+                + self.baseline_division_wins
+                + outcomes @ self.division_game_results
+            )
+            division_losses = (
+                self.base_division_losses
+                + self.num_division_games_by_team
+                - (division_wins - self.base_division_wins)
+            )
+
+            (
+                playoff_teams,
+                division_leaders,
+                division_qualifiers,
+            ) = self.rank_divisions(
+                wins_with_points, losses, division_wins, division_losses
+            )
+            tallies["division_leader_tally"] += np.bincount(
+                division_leaders.ravel(), minlength=self.num_teams
+            )
+            tallies["division_qualifier_tally"] += np.bincount(
+                division_qualifiers.ravel(), minlength=self.num_teams
+            )
+        else:
+            # sort the teams
+            playoff_teams = np.argsort(
+                -wins_with_points, axis=1, kind="stable"
+            )[:, : self.num_playoff_slots]
+
+        # tally the teams making the playoffs by place
+        for place_ndx in range(self.num_playoff_slots):
+            place_teams = playoff_teams[:, place_ndx]
+            place_tally = np.bincount(place_teams, minlength=self.num_teams)
+            tallies["playoff_tally"] += place_tally
+            tallies["playoff_stats"][:, place_ndx] += place_tally
+            tallies["avg_wins"][place_ndx] += np.round(
+                wins_with_points[np.arange(batch_size), place_teams], 0
+            ).sum()
+        tallies["num_simulations"] += batch_size
+
+        # tally the antithetic pairs in which a team made the playoffs in both seasons to estimate the variance
+        if num_pairs > 0:
+            made_playoffs = np.zeros((batch_size, self.num_teams), dtype=bool)
+            made_playoffs[np.arange(batch_size)[:, None], playoff_teams] = True
+            tallies["antithetic_pair_tally"] += (
+                made_playoffs[:num_pairs]
+                & made_playoffs[num_pairs : 2 * num_pairs]
+            ).sum(axis=0)
+            tallies["num_antithetic_pairs"] += num_pairs
+
+    def rank_divisions(
+        self, wins_with_points, losses, division_wins, division_losses
+    ):
+        """Rank a batch of simulated seasons for leagues with divisions.
+
+        :return: tuple of team index arrays (simulations x teams) of the playoff teams by place, the division leaders,
+            and the division qualifiers that made the playoffs
+        """
+        batch_size = wins_with_points.shape[0]
+
+        division_wins_with_points = division_wins + (
+            self.division_points_for / 1000000
+        )
+
+        # sort the teams within each division (np.lexsort uses the last key as the primary sort key)
+        division_order = np.lexsort(
+            (
+                np.broadcast_to(-self.division_ties, losses.shape),
+                division_losses,
+                -division_wins_with_points,
+                np.broadcast_to(-self.ties, losses.shape),
+                losses,
+                -wins_with_points,
+                np.broadcast_to(self.division_ndx, losses.shape),
+            ),
+            axis=1,
+        )
+
+        # pick the teams making the playoffs
+        num_playoff_slots_per_division_without_leader = (
+            self.num_playoff_slots_per_division - 1
+        )
+        leader_cols = []
+        qualifier_cols = []
+        remaining_cols = []
+        division_start = 0
+        for division_size in self.division_sizes:
+            leader_cols.append(division_start)
+            for division_rank in range(1, division_size):
+                if (
+                    division_rank
+                    <= num_playoff_slots_per_division_without_leader
+                ):
+                    qualifier_cols.append(division_start + division_rank)
+                else:
+                    remaining_cols.append(division_start + division_rank)
+            division_start += division_size
+
+        def sort_by_wins_with_points(col_indices):
+            ranked_teams = division_order[:, col_indices]
+            ranked_wins_with_points = np.take_along_axis(
+                wins_with_points, ranked_teams, axis=1
+            )
+            return np.take_along_axis(
+                ranked_teams,
+                np.argsort(-ranked_wins_with_points, axis=1, kind="stable"),
+                axis=1,
+            )
+
+        division_leaders = sort_by_wins_with_points(leader_cols)
+        division_qualifiers = sort_by_wins_with_points(qualifier_cols)
+        remaining_teams = sort_by_wins_with_points(remaining_cols)
+
+        if len(leader_cols) < self.num_playoff_slots and qualifier_cols:
+            if len(qualifier_cols) > (
+                self.num_playoff_slots - len(leader_cols)
+            ):
+                raise ValueError(
+                    "Specified number of playoff qualifiers per division ({0}) exceeds"
+                    " available league playoff spots. Please correct the value of "
+                    '"num_playoff_slots_per_division" in "config.ini".'.format(
+                        num_playoff_slots_per_division_without_leader + 1
+                    )
+                )
+        else:
+            division_qualifiers = np.empty((batch_size, 0), dtype=np.int64)
+
+        playoff_teams = np.concatenate(
+            (division_leaders, division_qualifiers, remaining_teams), axis=1
+        )[:, : self.num_playoff_slots]
+
+        return playoff_teams, division_leaders, division_qualifiers
+
+
+class PlayoffTeams(object):
+    def __init__(self, standings, records=None, num_divisions=0):
+        """Struct-of-arrays state of the teams for the playoff simulations, where each team has a fixed integer index
+        following the order of the standings and the division membership of every team is precomputed once.
+
+        :param standings: list of BaseTeam objects
+        :param records: optional dict of BaseRecord objects by team id to use instead of the current team records (for
+            records from previous weeks)
+        :param num_divisions: number of divisions in the league (0 for leagues without divisions)
+        """
+        records = [
+            records[team.team_id] if records is not None else team.record
+            for team in standings
+        ]
+
+        self.num_teams = len(standings)
+        self.team_ids = [team.team_id for team in standings]
+        self.team_indices = {
+            team_id: team_ndx for team_ndx, team_id in enumerate(self.team_ids)
+        }
+        self.names = [team.name for team in standings]
+        self.managers = [team.manager_str for team in standings]
+        self.divisions = [team.division for team in standings]
+        # noinspection PyUnresolvedReferences
+        self.wins = np.array(
+            [int(record.get_wins()) for record in records], dtype=np.int64
+        )
+        # noinspection PyUnresolvedReferences
+        self.losses = np.array(
+            [int(record.get_losses()) for record in records], dtype=np.int64
+        )
+        # noinspection PyUnresolvedReferences
+        self.ties = np.array(
+            [int(record.get_ties()) for record in records], dtype=np.int64
+        )
+        # noinspection PyUnresolvedReferences
+        self.points_for = np.array(
+            [float(record.get_points_for()) for record in records],
+            dtype=np.float64,
+        )
+        # noinspection PyUnresolvedReferences
+        self.division_wins = np.array(
+            [int(record.get_division_wins()) for record in records],
+            dtype=np.int64,
+        )
+        # noinspection PyUnresolvedReferences
+        self.division_losses = np.array(
+            [int(record.get_division_losses()) for record in records],
+            dtype=np.int64,
+        )
+        # noinspection PyUnresolvedReferences
+        self.division_ties = np.array(
+            [int(record.get_division_ties()) for record in records],
+            dtype=np.int64,
+        )
+        # noinspection PyUnresolvedReferences
+        self.division_points_for = np.array(
+            [float(record.get_division_points_for()) for record in records],
+            dtype=np.float64,
+        )
+
+        # group teams into divisions, where teams outside of the first num_divisions divisions get the index after the
+        # last division
+        self.division_ndx = np.zeros(self.num_teams, dtype=np.int64)
+        self.division_sizes = np.zeros(0, dtype=np.int64)
+        if num_divisions > 0:
+            divisions = sorted(set(self.divisions))[:num_divisions]
+            self.division_ndx = np.array(
+                [
+                    divisions.index(division)
+                    if division in divisions
+                    else len(divisions)
+                    for division in self.divisions
+                ],
+                dtype=np.int64,
+            )
+            self.division_sizes = np.bincount(
+                self.division_ndx, minlength=len(divisions) + 1
+            )[: len(divisions)]
+
+    def __str__(self):
+        return str(self.__dict__)
+
+    def __repr__(self):
+        return str(self.__dict__)
+
+    def get_subset(self, team_indices):
+        """Get the state of a subset of the teams, where the teams are re-indexed in the order of the given indices.
+
+        :param team_indices: array of team indices
+        :return: PlayoffTeams object
+        """
+        subset = copy(self)
+        subset.num_teams = len(team_indices)
+        for attribute in ["team_ids", "names", "managers", "divisions"]:
+            setattr(
+                subset,
+                attribute,
+                [getattr(self, attribute)[ndx] for ndx in team_indices],
+            )
+        for attribute in [
+            "wins",
+            "losses",
+            "ties",
+            "points_for",
+            "division_wins",
+            "division_losses",
+            "division_ties",
+            "division_points_for",
+            "division_ndx",
+        ]:
+            setattr(subset, attribute, getattr(self, attribute)[team_indices])
+        subset.team_indices = {
+            team_id: team_ndx
+            for team_ndx, team_id in enumerate(subset.team_ids)
+        }
+        if len(self.division_sizes) > 0:
+            subset.division_sizes = np.bincount(
+                subset.division_ndx, minlength=len(self.division_sizes) + 1
+            )[: len(self.division_sizes)]
+        return subset
+
+    def get_wins_with_points(self):
+        return self.wins + (self.points_for / 1000000)
+
+    def get_division_wins_with_points(self):
+        return self.division_wins + (self.division_points_for / 1000000)
+
+
 class TeamWithPlayoffProbs(object):
     def __init__(
         self,
@@ -533,35 +1560,17 @@ class TeamWithPlayoffProbs(object):
     def __repr__(self):
         return str(self.__dict__)
 
-    def add_win(self):
-        self.wins += 1
-
-    def add_division_win(self):
-        self.division_wins += 1
-
-    def add_loss(self):
-        self.losses += 1
+    def add_division_leader_tally(self, tally=1):
+        self.division_leader_tally += tally
 
-    def add_division_loss(self):
-        self.division_losses += 1
+    def add_division_qualifier_tally(self, tally=1):
+        self.division_qualifier_tally += tally
 
-    def add_division_leader_tally(self):
-        self.division_leader_tally += 1
+    def add_playoff_tally(self, tally=1):
+        self.playoff_tally += tally
 
-    def add_division_qualifier_tally(self):
-        self.division_qualifier_tally += 1
-
-    def add_playoff_tally(self):
-        self.playoff_tally += 1
-
-    def add_playoff_stats(self, place):
-        self.playoff_stats[place - 1] += 1
-
-    def get_wins_with_points(self):
-        return self.wins + (self.points_for / 1000000)
-
-    def get_division_wins_with_points(self):
-        return self.division_wins + (self.division_points_for / 1000000)
+    def add_playoff_stats(self, place, tally=1):
+        self.playoff_stats[place - 1] += tally
 
     def get_playoff_chance_percentage(self):
         return round((self.playoff_tally / self.simulations) * 100.0, 2)
@@ -571,9 +1580,3 @@ class TeamWithPlayoffProbs(object):
             round((stat / self.simulations) * 100.0, 2)
             for stat in self.playoff_stats
         ]
-
-    def reset_to_base_record(self):
-        self.wins = self.base_wins
-        self.losses = self.base_losses
-        self.division_wins = self.base_division_wins
-        self.division_losses = self.base_division_losses
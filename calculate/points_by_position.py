@@ -4,6 +4,7 @@ __email__ = "wrenjr@yahoo.com"
 import copy
 
 from dao.base import BaseLeague, BaseTeam, BasePlayer
+from report.instrumentation import instrumented
 from report.logger import get_logger
 
 logger = get_logger(__name__, propagate=False)
@@ -16,16 +17,19 @@ class PointsByPosition(object):
         self.week_for_report = week_for_report
         self.roster_slot_counts = league.roster_position_counts
         self.bench_positions = league.bench_positions
+        self.roster_slot_table = league.get_roster_slot_table()
         self.flex_types = list(league.get_flex_positions_dict().keys())
         self.flex_types.remove(
             "FLEX_IDP"
         )  # comment/uncomment line to remove/add FLEX_IDP to team points by position
 
     def get_points_for_position(self, players, position):
+        position_bit = self.roster_slot_table.get(position, 0)
         total_points_by_position = 0
         for player in players:  # type: BasePlayer
             if (
-                position in player.eligible_positions
+                player.get_eligibility_mask(self.roster_slot_table)
+                & position_bit
                 and player.selected_position not in self.bench_positions
             ):
                 total_points_by_position += float(player.points)
@@ -102,6 +106,7 @@ class PointsByPosition(object):
         )
         return player_points_by_position
 
+    @instrumented()
     def get_weekly_points_by_position(self, teams_results):
         logger.debug("Retrieving weekly points by position.")
 
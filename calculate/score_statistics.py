@@ -0,0 +1,73 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "wrenjr@yahoo.com"
+
+import math
+
+from report.logger import get_logger
+
+logger = get_logger(__name__, propagate=False)
+
+
+class SeasonScoreStatistics(object):
+    def __init__(self):
+        """Running mean and variance of the weekly scores of every team (using Welford's algorithm), so that z-scores
+        can be calculated each week without keeping the scores of every previous week.
+        """
+        logger.debug("Initializing season score statistics.")
+
+        # team ids of the first week since team ids remain unchanged
+        self.team_ids = []
+        self.num_weeks = 0
+        self.means = {}
+        self.sums_of_squared_deviations = {}
+
+    def add_week(self, weekly_teams_points):
+        """Add the scores of a week to the running mean and variance of every team.
+
+        :param weekly_teams_points: dict of team points by team id for the week
+        """
+        if self.num_weeks == 0:
+            self.team_ids = list(weekly_teams_points.keys())
+            self.means = {team_id: 0.0 for team_id in self.team_ids}
+            self.sums_of_squared_deviations = {
+                team_id: 0.0 for team_id in self.team_ids
+            }
+
+        self.num_weeks += 1
+        for team_id in self.team_ids:
+            points = float(weekly_teams_points[team_id])
+            delta = points - self.means[team_id]
+            self.means[team_id] += delta / self.num_weeks
+            self.sums_of_squared_deviations[team_id] += delta * (
+                points - self.means[team_id]
+            )
+
+    def get_standard_deviation(self, team_id):
+        # population standard deviation to match np.std
+        return math.sqrt(
+            self.sums_of_squared_deviations[team_id] / self.num_weeks
+        )
+
+    def get_z_scores(self, weekly_teams_points):
+        """Get the z-score of every team's score for a week relative to its scores in all previous weeks added so far.
+        Z-scores can only be determined once at least two previous weeks have been added.
+
+        :param weekly_teams_points: dict of team points by team id for the week
+        :return: dict of z-scores (or None) by team id
+        """
+        results = {}
+        for team_id in self.team_ids or weekly_teams_points.keys():
+            z_score = None
+
+            if self.num_weeks >= 2:
+                standard_deviation = self.get_standard_deviation(team_id)
+                z_score = (
+                    (float(weekly_teams_points[team_id]) - self.means[team_id])
+                    / standard_deviation
+                    if standard_deviation != 0
+                    else 0
+                )
+
+            results[team_id] = z_score
+
+        return results
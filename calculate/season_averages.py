@@ -3,89 +3,91 @@ __email__ = "wrenjr@yahoo.com"
 
 import numpy as np
 
-from calculate.metrics import CalculateMetrics
+from calculate.season_time_series import SeasonTimeSeries
 from report.data import ReportData
+from report.instrumentation import instrumented
 from report.logger import get_logger
 
 logger = get_logger(__name__, propagate=False)
 
 
 class SeasonAverageCalculator(object):
-    def __init__(self, team_names, report_data: ReportData, break_ties):
+    def __init__(
+        self,
+        season_time_series: SeasonTimeSeries,
+        report_data: ReportData,
+        break_ties,
+    ):
         logger.debug("Initializing season averages.")
 
-        self.team_names = team_names
+        self.season_time_series = season_time_series
         self.report_data = report_data
         self.break_ties = break_ties
 
+    @instrumented(arg_names=("metric",))
     def get_average(
-        self, data, key, with_percent=False, first_ties=False, reverse=True
+        self, metric, key, with_percent=False, first_ties=False, reverse=True
     ):
-        logger.debug('Calculating season average from "{0}".'.format(key))
-
-        season_average_list = []
-        team_index = 0
-        for team in data:
-            team_name = self.team_names[team_index]
+        logger.debug(
+            'Calculating season average of "{0}" for "{1}".'.format(
+                metric, key
+            )
+        )
 
-            valid_values = [
-                value[1]
-                for value in team
-                if (value[1] is not None and value[1] != "DQ")
-            ]
-            average = np.mean(valid_values)
-            season_average_value = "{0:.2f}".format(average)
+        season_average_values = [
+            "{0:.2f}".format(average)
+            for average in self.season_time_series.get_season_averages(metric)
+        ]
 
-            season_average_list.append([team_name, season_average_value])
-            team_index += 1
-        ordered_average_values = sorted(
-            season_average_list, key=lambda x: float(x[1]), reverse=reverse
+        # teams with the same (displayed) season average share a place, and places are consecutive (dense ranks)
+        distinct_averages, average_ndx = np.unique(
+            np.array(season_average_values, dtype=np.float64),
+            return_inverse=True,
         )
-        index = 0
-        for team in ordered_average_values:
-            ordered_average_values[ordered_average_values.index(team)] = [
-                index,
-                team[0],
-                team[1],
-            ]
-            index += 1
+        if reverse:
+            places = len(distinct_averages) - average_ndx
+        else:
+            places = average_ndx + 1
 
-        ordered_average_values = CalculateMetrics(
-            None, None, None, None
-        ).resolve_season_average_ties(ordered_average_values, with_percent)
+        season_averages_by_team_name = {
+            team_name: "{0}{1} ({2})".format(
+                season_average_value, "%" if with_percent else "", place
+            )
+            for team_name, season_average_value, place in zip(
+                self.season_time_series.team_names,
+                season_average_values,
+                places.tolist(),
+            )
+        }
 
         ordered_season_average_list = []
         for ordered_team in getattr(self.report_data, key):
-            for team in ordered_average_values:
-                if ordered_team[1] == team[1]:
-                    if with_percent:
-                        ordered_team[3] = (
-                            "{0:.2f}%".format(
-                                float(str(ordered_team[3]).replace("%", ""))
-                            )
-                            if ordered_team[3] != "DQ"
-                            else "DQ"
-                        )
-                        value = str(team[2])
-                    elif key == "data_for_scores":
-                        ordered_team[3] = "{0:.2f}".format(
-                            float(str(ordered_team[3]))
-                        )
-                        value = str(team[2])
-                    else:
-                        value = "{0}".format(str(team[2]))
+            value = season_averages_by_team_name.get(ordered_team[1])
+            if value is None:
+                continue
+
+            if with_percent:
+                ordered_team[3] = (
+                    "{0:.2f}%".format(
+                        float(str(ordered_team[3]).replace("%", ""))
+                    )
+                    if ordered_team[3] != "DQ"
+                    else "DQ"
+                )
+            elif key == "data_for_scores":
+                ordered_team[3] = "{0:.2f}".format(float(str(ordered_team[3])))
 
-                    if key == "data_for_scores":
-                        ordered_team.insert(-1, value)
-                    elif (
-                        key == "data_for_coaching_efficiency"
-                        and self.break_ties
-                        and first_ties
-                    ):
-                        ordered_team.insert(-2, value)
-                    else:
-                        ordered_team.append(value)
+            if key == "data_for_scores":
+                ordered_team.insert(-1, value)
+            elif (
+                key == "data_for_coaching_efficiency"
+                and self.break_ties
+                and first_ties
+            ):
+                ordered_team.insert(-2, value)
+            else:
+                ordered_team.append(value)
 
-                    ordered_season_average_list.append(ordered_team)
+            ordered_season_average_list.append(ordered_team)
 
         return ordered_season_average_list
@@ -0,0 +1,91 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "wrenjr@yahoo.com"
+
+import numpy as np
+
+from report.logger import get_logger
+
+logger = get_logger(__name__, propagate=False)
+
+
+class SeasonTimeSeries(object):
+    metrics = [
+        "points",
+        "coaching_efficiency",
+        "luck",
+        "optimal_points",
+        "z_score",
+        "power_rank",
+        "playoff_probs",
+    ]
+
+    def __init__(self, team_ids, team_names, weeks):
+        """Weekly values of every metric of every team in the season, stored in a (teams x weeks x metrics) array.
+        Values that are disqualified ("DQ") or missing (such as z-scores of the first weeks or playoff probabilities of
+        weeks after the regular season) are stored as NaN.
+
+        :param team_ids: list of team ids (in the order of the chart series)
+        :param team_names: list of team names in the same order as the team ids
+        :param weeks: list of weeks of the season so far
+        """
+        logger.debug("Initializing season time series.")
+
+        self.team_ids = list(team_ids)
+        self.team_names = list(team_names)
+        self.weeks = list(weeks)
+
+        self.team_ndx = {
+            team_id: ndx for ndx, team_id in enumerate(self.team_ids)
+        }
+        self.week_ndx = {week: ndx for ndx, week in enumerate(self.weeks)}
+        self.metric_ndx = {
+            metric: ndx for ndx, metric in enumerate(self.metrics)
+        }
+
+        self.values = np.full(
+            (len(self.team_ids), len(self.weeks), len(self.metrics)),
+            np.nan,
+            dtype=np.float64,
+        )
+
+    def set_week_values(self, week, metric, values_by_team_id):
+        """Set the values of a metric for a week. Teams missing from the values keep NaN.
+
+        :param week: week of the values
+        :param metric: name of the metric
+        :param values_by_team_id: dict of metric values (None or "DQ" if missing or disqualified) by team id
+        """
+        week_ndx = self.week_ndx[int(week)]
+        metric_ndx = self.metric_ndx[metric]
+        for team_id, value in values_by_team_id.items():
+            if value is not None and value != "DQ":
+                self.values[
+                    self.team_ndx[team_id], week_ndx, metric_ndx
+                ] = value
+
+    def get_metric(self, metric):
+        """Get the (teams x weeks) values of a metric.
+
+        :param metric: name of the metric
+        :return: 2D array view of the metric values by team and week
+        """
+        return self.values[:, :, self.metric_ndx[metric]]
+
+    def get_season_averages(self, metric):
+        """Get the average of the valid (non-NaN) weekly values of a metric for every team.
+
+        :param metric: name of the metric
+        :return: array of the season average of every team (NaN for teams without any valid values)
+        """
+        metric_values = self.get_metric(metric)
+        valid_counts = np.count_nonzero(~np.isnan(metric_values), axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.nansum(metric_values, axis=1) / valid_counts
+
+    def get_season_totals(self, metric):
+        """Get the sum of the valid (non-NaN) weekly values of a metric for every team.
+
+        :param metric: name of the metric
+        :return: array of the season total of every team
+        """
+        return np.nansum(self.get_metric(metric), axis=1)
@@ -11,6 +11,82 @@ from calculate.covid_risk import CovidRisk
 from calculate.playoff_probabilities import PlayoffProbabilities
 
 
+def get_nfl_data_dir(data_dir, season):
+    """Get the directory of the saved NFL data of a season that is shared by all leagues (such as the bad boy, beef,
+    and COVID-19 risk data, player headshots, and Sleeper NFL player data).
+
+    :param data_dir: base directory of saved data
+    :param season: NFL season
+    :return: directory path of the shared NFL data of the season
+    """
+    return os.path.join(data_dir, str(season), "nfl")
+
+
+def get_saved_nfl_data_path(nfl_data_path, league_data_paths, dev_offline):
+    """Get the path of saved NFL data shared by all leagues. NFL data used to be saved in the data directory of each
+    league (data_dir/<season>/<league_id>), so when running offline without the shared data, the path of the same data
+    saved for a league is used instead if it exists.
+
+    :param nfl_data_path: path of the shared NFL data
+    :param league_data_paths: list of the paths the same data was saved to for leagues before it was shared
+    :param dev_offline: only use saved data
+    :return: path of the saved NFL data
+    """
+    if dev_offline and not os.path.exists(nfl_data_path):
+        for league_data_path in league_data_paths:
+            if os.path.exists(league_data_path):
+                return league_data_path
+    return nfl_data_path
+
+
+def get_saved_nfl_data_dir(
+    data_dir, season, league_ids, file_name, dev_offline, week=None
+):
+    """Get the directory of saved NFL data shared by all leagues, or of the same data saved for a league before it was
+    shared when running offline without the shared data (see get_saved_nfl_data_path).
+
+    :param data_dir: base directory of saved data
+    :param season: NFL season
+    :param league_ids: list of ids of the leagues whose data directories are checked for the data
+    :param file_name: name of the saved data file
+    :param dev_offline: only use saved data
+    :param week: week of weekly NFL data, which is shared in a directory for each week
+    :return: directory path of the saved NFL data
+    """
+    nfl_data_dir = get_nfl_data_dir(data_dir, season)
+    if week is not None:
+        nfl_data_dir = os.path.join(nfl_data_dir, "week_" + str(week))
+    return os.path.dirname(
+        get_saved_nfl_data_path(
+            os.path.join(nfl_data_dir, file_name),
+            [
+                os.path.join(data_dir, str(season), str(league_id), file_name)
+                for league_id in league_ids
+            ],
+            dev_offline,
+        )
+    )
+
+
+def get_roster_slot_table(roster_position_counts, bench_positions):
+    """Get the bit of every active roster slot position of a league, which are the bits of the eligibility masks of the
+    players of the league.
+
+    :param roster_position_counts: dict of the number of slots of every roster position
+    :param bench_positions: list of bench roster positions, which are not in the table
+    :return: dict of the bit of every active roster slot position by position
+    """
+    active_slot_positions = [
+        position
+        for position, count in roster_position_counts.items()
+        if position not in bench_positions and count > 0
+    ]
+    return {
+        position: 1 << slot_ndx
+        for slot_ndx, position in enumerate(active_slot_positions)
+    }
+
+
 def complex_json_handler(obj):
     """Custom handler to allow custom objects to be serialized into json.
 
@@ -139,6 +215,8 @@ class BaseLeague(FantasyFootballReportObject):
         self.flex_positions_qb_rb_te_wr = []
         self.flex_positions_offensive_player = []
         self.flex_positions_idp = []
+        # bit of every active roster slot position, see get_roster_slot_table
+        self.roster_slot_table = {}
 
         self.matchups_by_week = {}
         self.teams_by_week = {}
@@ -152,6 +230,10 @@ class BaseLeague(FantasyFootballReportObject):
 
         self.player_data_by_week_function = None
         self.player_data_by_week_key = None
+        # retrieves the data of many players of a week at once (by player id) on platforms that support it
+        self.players_data_by_week_function = None
+        # points of players by week by player id, see prefetch_player_points_by_week
+        self.player_points_by_week = defaultdict(dict)
 
     def get_player_data_by_week(self, player_id, week=None):
         return getattr(
@@ -159,6 +241,72 @@ class BaseLeague(FantasyFootballReportObject):
             self.player_data_by_week_key,
         )
 
+    def prefetch_player_points_by_week(self, player_ids, weeks):
+        """Add the points of players in every one of the weeks to the player points by week. The points are looked up
+        in the players of each week when the player is in them, and the points of the rest of the players are retrieved
+        from the platform together, with one batch of players per week when the platform supports it.
+
+        :param player_ids: list of player ids
+        :param weeks: list of weeks
+        """
+        missing_player_ids_by_week = defaultdict(list)
+        for week in weeks:
+            players_by_id = self.players_by_week.get(str(week), {})
+            for player_id in player_ids:
+                player_id = str(player_id)
+                if int(week) in self.player_points_by_week[player_id]:
+                    continue
+                if player_id in players_by_id:
+                    self.player_points_by_week[player_id][
+                        int(week)
+                    ] = players_by_id[player_id].points
+                elif player_id not in missing_player_ids_by_week[week]:
+                    missing_player_ids_by_week[week].append(player_id)
+
+        for week, missing_player_ids in missing_player_ids_by_week.items():
+            if not missing_player_ids:
+                continue
+            players_data = {}
+            if self.players_data_by_week_function:
+                players_data = self.players_data_by_week_function(
+                    missing_player_ids, str(week)
+                )
+            for player_id in missing_player_ids:
+                if player_id in players_data:
+                    player_points = getattr(
+                        players_data[player_id], self.player_data_by_week_key
+                    )
+                else:
+                    player_points = self.get_player_data_by_week(
+                        player_id, str(week)
+                    )
+                self.player_points_by_week[player_id][
+                    int(week)
+                ] = player_points
+
+    def get_player_points_by_week(self, player_id, week):
+        self.prefetch_player_points_by_week([player_id], [week])
+        return self.player_points_by_week[str(player_id)][int(week)]
+
+    def get_roster_slot_table(self):
+        if not self.roster_slot_table:
+            self.roster_slot_table = get_roster_slot_table(
+                self.roster_position_counts, self.bench_positions
+            )
+        return self.roster_slot_table
+
+    def set_player_eligibility_masks(self):
+        """Set the eligibility masks of the players of every week once the roster positions and players are mapped from
+        the platform data.
+        """
+        self.roster_slot_table = get_roster_slot_table(
+            self.roster_position_counts, self.bench_positions
+        )
+        for players in self.players_by_week.values():
+            for player in players.values():  # type: BasePlayer
+                player.eligibility_mask = None
+                player.get_eligibility_mask(self.roster_slot_table)
+
     def get_custom_weekly_matchups(self, week_for_report):
         """
         get weekly matchup data
@@ -254,6 +402,7 @@ class BaseLeague(FantasyFootballReportObject):
         playoff_prob_sims=None,
         dev_offline=False,
         recalculate=True,
+        playoff_prob_workers=None,
     ):
         # TODO: UPDATE USAGE OF recalculate PARAM (could use self.dev_offline)
         return PlayoffProbabilities(
@@ -268,13 +417,20 @@ class BaseLeague(FantasyFootballReportObject):
             save_data=save_data,
             recalculate=recalculate,
             dev_offline=dev_offline,
+            num_workers=playoff_prob_workers,
         )
 
     def get_bad_boy_stats(
         self, save_data=False, dev_offline=False, refresh=False
     ):
         return BadBoyStats(
-            os.path.join(self.data_dir, str(self.season), self.league_id),
+            get_saved_nfl_data_dir(
+                self.data_dir,
+                self.season,
+                [self.league_id],
+                "bad_boy_data.json",
+                dev_offline,
+            ),
             save_data=save_data,
             dev_offline=dev_offline,
             refresh=refresh,
@@ -284,7 +440,13 @@ class BaseLeague(FantasyFootballReportObject):
         self, save_data=False, dev_offline=False, refresh=False
     ):
         return BeefStats(
-            os.path.join(self.data_dir, str(self.season), self.league_id),
+            get_saved_nfl_data_dir(
+                self.data_dir,
+                self.season,
+                [self.league_id],
+                "beef_data.json",
+                dev_offline,
+            ),
             save_data=save_data,
             dev_offline=dev_offline,
             refresh=refresh,
@@ -295,7 +457,14 @@ class BaseLeague(FantasyFootballReportObject):
     ):
         return CovidRisk(
             self.config,
-            os.path.join(self.data_dir, str(self.season), self.league_id),
+            get_saved_nfl_data_dir(
+                self.data_dir,
+                self.season,
+                [self.league_id],
+                "covid_data.json",
+                dev_offline,
+                week=self.week_for_report,
+            ),
             season=self.season,
             week=self.week_for_report,
             save_data=save_data,
@@ -766,6 +935,8 @@ class BasePlayer(FantasyFootballReportObject):
         self.selected_position_is_flex = False
         self.status = None
         self.eligible_positions = []
+        # bitmask of the active roster slots of the league the player is eligible for, see BaseLeague.roster_slot_table
+        self.eligibility_mask = None
         self.stats = []
 
         # custom report attributes
@@ -776,6 +947,18 @@ class BasePlayer(FantasyFootballReportObject):
         self.tabbu = 0
         self.covid_risk = 0
 
+    def get_eligibility_mask(self, roster_slot_table):
+        """Get the bitmask of the active roster slots the player is eligible for, which is only calculated once.
+
+        :param roster_slot_table: dict of the bit of every active roster slot position of the league
+        :return: int
+        """
+        if self.eligibility_mask is None:
+            self.eligibility_mask = 0
+            for position in self.eligible_positions:
+                self.eligibility_mask |= roster_slot_table.get(position, 0)
+        return self.eligibility_mask
+
 
 class BaseStat(FantasyFootballReportObject):
     def __init__(self):
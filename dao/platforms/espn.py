@@ -783,6 +783,8 @@ class LeagueData(object):
             reverse=True,
         )
 
+        league.set_player_eligibility_masks()
+
         return league
 
 
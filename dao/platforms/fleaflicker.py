@@ -931,4 +931,6 @@ class LeagueData(object):
             reverse=True,
         )
 
+        league.set_player_eligibility_masks()
+
         return league
@@ -16,6 +16,8 @@ import requests
 from requests.exceptions import HTTPError
 
 from dao.base import (
+    get_nfl_data_dir,
+    get_saved_nfl_data_path,
     BaseLeague,
     BaseMatchup,
     BaseTeam,
@@ -109,11 +111,18 @@ class LeagueData(object):
         )
         self.median_score_by_week = {}
 
-        self.player_data = self.query(
+        # NFL player data and stats are the same for every league, so they are saved where all leagues can reuse them
+        nfl_data_dir = get_nfl_data_dir(self.data_dir, self.season)
+        league_data_dir = os.path.join(
+            self.data_dir, str(self.season), str(self.league_id)
+        )
+
+        self.player_data = self.query_nfl_data(
             self.base_url + "players/nfl",
-            os.path.join(self.data_dir, str(self.season), str(self.league_id)),
-            str(self.league_id) + "-player_data.json",
-            check_for_saved_data=True,
+            os.path.join(nfl_data_dir, "player_data.json"),
+            os.path.join(
+                league_data_dir, str(self.league_id) + "-player_data.json"
+            ),
             refresh_days_delay=7,
         )
 
@@ -122,11 +131,12 @@ class LeagueData(object):
         for week_for_player_stats in range(
             1, int(self.num_regular_season_weeks) + 1
         ):
+            week_dir = "week_" + str(week_for_player_stats)
             if int(week_for_player_stats) <= int(self.week_for_report):
 
                 self.player_stats_data_by_week[str(week_for_player_stats)] = {
                     player["player_id"]: player["stats"]
-                    for player in self.query(
+                    for player in self.query_nfl_data(
                         self.base_stat_url
                         + "stats/nfl/"
                         + str(season)
@@ -134,16 +144,15 @@ class LeagueData(object):
                         + str(week_for_player_stats)
                         + "?season_type=regular",
                         os.path.join(
-                            self.data_dir,
-                            str(self.season),
-                            str(self.league_id),
-                            "week_" + str(week_for_player_stats),
+                            nfl_data_dir,
+                            week_dir,
+                            week_dir + "-player_stats_by_week.json",
+                        ),
+                        os.path.join(
+                            league_data_dir,
+                            week_dir,
+                            week_dir + "-player_stats_by_week.json",
                         ),
-                        "week_"
-                        + str(week_for_player_stats)
-                        + "-player_stats_by_week.json",
-                        check_for_saved_data=True,
-                        refresh_days_delay=1,
                     )
                 }
 
@@ -151,7 +160,7 @@ class LeagueData(object):
                 str(week_for_player_stats)
             ] = {
                 player["player_id"]: player["stats"]
-                for player in self.query(
+                for player in self.query_nfl_data(
                     self.base_stat_url
                     + "projections/nfl/"
                     + str(season)
@@ -159,48 +168,48 @@ class LeagueData(object):
                     + str(week_for_player_stats)
                     + "?season_type=regular",
                     os.path.join(
-                        self.data_dir,
-                        str(self.season),
-                        str(self.league_id),
-                        "week_" + str(week_for_player_stats),
+                        nfl_data_dir,
+                        week_dir,
+                        week_dir + "-player_projected_stats_by_week.json",
+                    ),
+                    os.path.join(
+                        league_data_dir,
+                        week_dir,
+                        week_dir + "-player_projected_stats_by_week.json",
                     ),
-                    "week_"
-                    + str(week_for_player_stats)
-                    + "-player_projected_stats_by_week.json",
-                    check_for_saved_data=True,
-                    refresh_days_delay=1,
                 )
             }
 
         self.player_season_stats = {
             player["player_id"]: player["stats"]
-            for player in self.query(
+            for player in self.query_nfl_data(
                 self.base_stat_url
                 + "stats/nfl/"
                 + str(self.season)
                 + "?season_type=regular",
+                os.path.join(nfl_data_dir, "player_season_stats.json"),
                 os.path.join(
-                    self.data_dir, str(self.season), str(self.league_id)
+                    league_data_dir,
+                    str(self.league_id) + "-player_season_stats.json",
                 ),
-                str(self.league_id) + "-player_season_stats.json",
-                check_for_saved_data=True,
-                refresh_days_delay=1,
             )
         }
 
         self.player_season_projected_stats = {
             player["player_id"]: player["stats"]
-            for player in self.query(
+            for player in self.query_nfl_data(
                 self.base_stat_url
                 + "projections/nfl/"
                 + str(self.season)
                 + "?season_type=regular",
                 os.path.join(
-                    self.data_dir, str(self.season), str(self.league_id)
+                    nfl_data_dir, "player_season_projected_stats.json"
+                ),
+                os.path.join(
+                    league_data_dir,
+                    str(self.league_id)
+                    + "-player_season_projected_stats.json",
                 ),
-                str(self.league_id) + "-player_season_projected_stats.json",
-                check_for_saved_data=True,
-                refresh_days_delay=1,
             )
         }
 
@@ -378,6 +387,23 @@ class LeagueData(object):
                                     transaction
                                 )
 
+    def query_nfl_data(
+        self, url, nfl_data_path, league_data_path, refresh_days_delay=1
+    ):
+        """Query NFL data that is saved where every league can reuse it, or where it was saved for this league before
+        NFL data was shared between leagues when running offline without the shared data.
+        """
+        file_path = get_saved_nfl_data_path(
+            nfl_data_path, [league_data_path], self.dev_offline
+        )
+        return self.query(
+            url,
+            os.path.dirname(file_path),
+            os.path.basename(file_path),
+            check_for_saved_data=True,
+            refresh_days_delay=refresh_days_delay,
+        )
+
     def query(
         self,
         url,
@@ -472,13 +498,15 @@ class LeagueData(object):
                         url
                     )
                 )
-                if not os.path.exists(file_dir):
-                    os.makedirs(file_dir)
+                os.makedirs(file_dir, exist_ok=True)
 
-                with open(file_path, "w", encoding="utf-8") as data_out:
+                # write to a temporary file first so concurrent report runs never load partially saved data
+                temp_file_path = "{0}.{1}.tmp".format(file_path, os.getpid())
+                with open(temp_file_path, "w", encoding="utf-8") as data_out:
                     json.dump(
                         response_json, data_out, ensure_ascii=False, indent=2
                     )
+                os.replace(temp_file_path, file_path)
 
         return response_json
 
@@ -1220,4 +1248,6 @@ class LeagueData(object):
             reverse=True,
         )
 
+        league.set_player_eligibility_masks()
+
         return league
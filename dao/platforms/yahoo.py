@@ -299,6 +299,38 @@ class LeagueData(object):
                 data_type_class=Player,
             )
 
+    def get_players_data(self, player_keys, week):
+        """Get the stats of many players for a week, with a single Yahoo API query for every 25 players.
+
+        :param player_keys: list of player keys
+        :param week: week
+        :return: dict of Player by player key
+        """
+        if self.save_data or self.dev_offline:
+            # the data of every player is saved to and loaded from its own file
+            return {
+                player_key: self.get_player_data(player_key, week)
+                for player_key in player_keys
+            }
+
+        players_data = {}
+        for ndx in range(0, len(player_keys), 25):
+            # YAHOO API QUERY: run query to retrieve stats for up to 25 players for chosen week
+            players = self.yahoo_query.query(
+                "https://fantasysports.yahooapis.com/fantasy/v2/league/{0}/players;player_keys={1}/stats;type=week;"
+                "week={2}".format(
+                    self.league_key,
+                    ",".join(player_keys[ndx : ndx + 25]),
+                    week,
+                ),
+                ["league", "players"],
+            )
+            for player in players if isinstance(players, list) else [players]:
+                if isinstance(player, dict):
+                    player = player.get("player")
+                players_data[str(player.player_key)] = player
+        return players_data
+
     # noinspection PyTypeChecker
     def map_data_to_base(self, base_league_class):
         logger.debug("Mapping Yahoo data to base objects.")
@@ -335,6 +367,7 @@ class LeagueData(object):
 
         league.player_data_by_week_function = self.get_player_data
         league.player_data_by_week_key = "player_points_value"
+        league.players_data_by_week_function = self.get_players_data
 
         league.bench_positions = ["BN", "IR"]
 
@@ -731,4 +764,6 @@ class LeagueData(object):
             reverse=True,
         )
 
+        league.set_player_eligibility_masks()
+
         return league
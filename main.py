@@ -16,8 +16,10 @@ from pkg_resources import DistributionNotFound, VersionConflict
 from integrations.drive_integration import GoogleDriveUploader
 
 # from integrations.slack_integration import SlackMessenger
+from report.batch import FantasyFootballBatchReport, read_league_report_jobs
 from report.builder import FantasyFootballReport
 from report.logger import get_logger
+from report.service import FantasyFootballReportService
 from utils.report_tools import check_for_updates, get_valid_config
 
 colorama.init()
@@ -93,12 +95,16 @@ def main(argv):
         "      -w, --week <chosen_week>              Chosen week for which to generate report.\n"
         '      -g, --game-id <chosen_game_id>        Chosen fantasy game id for which to generate report. Defaults to "nfl", which is interpreted as the current season if using Yahoo.\n'
         "      -y, --year <chosen_year>              Chosen year (season) of the league for which a report is being generated.\n"
+        '      -m, --multi-league <jobs_file_path>   Generate reports for a batch of leagues listed in a file with one "platform,league_id[,week]" job per line.\n'
+        "      -k, --backfill                        Generate the report of every week of the season through the chosen week from a single retrieval of the league data.\n"
+        "      -v, --serve                           Run a report service that generates reports requested over a local HTTP API.\n"
         "\n"
         "    Configuration:\n"
         "      -c, --config-file <config_file_path>  System file path (including file name) for .ini file to be used for configuration.\n"
         "      -s, --save-data                       Save all retrieved data locally for faster future report generation.\n"
         "      -r, --refresh-web-data                Refresh all web data from external APIs (such as bad boy and beef data).\n"
         "      -p, --playoff-prob-sims               Number of Monte Carlo playoff probability simulations to run.\n"
+        "      -j, --playoff-prob-workers            Number of worker processes used to run playoff probability simulations.\n"
         "      -b, --break-ties                      Break ties in metric rankings.\n"
         "      -q, --disqualify-ce                   Automatically disqualify teams ineligible for coaching efficiency metric.\n"
         "\n"
@@ -108,7 +114,7 @@ def main(argv):
     )
 
     try:
-        opts, args = getopt.getopt(argv, "hac:f:l:w:g:y:srp:bqtd")
+        opts, args = getopt.getopt(argv, "hac:f:l:w:g:y:m:kvsrp:j:bqtd")
     except getopt.GetoptError:
         print(usage_str)
         sys.exit(2)
@@ -139,6 +145,12 @@ def main(argv):
             options_dict["game_id"] = arg
         elif opt in ("-y", "--year"):
             options_dict["year"] = arg
+        elif opt in ("-m", "--multi-league"):
+            options_dict["league_jobs_file"] = arg
+        elif opt in ("-k", "--backfill"):
+            options_dict["backfill"] = True
+        elif opt in ("-v", "--serve"):
+            options_dict["serve"] = True
 
         # report configuration
         elif opt in ("-c", "--config-file"):
@@ -149,6 +161,8 @@ def main(argv):
             options_dict["refresh_web_data"] = True
         elif opt in ("-p", "--playoff-prob-sims"):
             options_dict["playoff_prob_sims"] = arg
+        elif opt in ("-j", "--playoff-prob-workers"):
+            options_dict["playoff_prob_workers"] = arg
         elif opt in ("-b", "--break-ties"):
             options_dict["break_ties"] = True
         elif opt in ("-q", "--disqualify-ce"):
@@ -172,6 +186,7 @@ def select_league(
     season,
     refresh_web_data,
     playoff_prob_sims,
+    playoff_prob_workers,
     break_ties,
     dq_ce,
     save_data,
@@ -203,6 +218,7 @@ def select_league(
             config=config,
             refresh_web_data=refresh_web_data,
             playoff_prob_sims=playoff_prob_sims,
+            playoff_prob_workers=playoff_prob_workers,
             break_ties=break_ties,
             dq_ce=dq_ce,
             save_data=save_data,
@@ -231,6 +247,7 @@ def select_league(
                 config=config,
                 refresh_web_data=refresh_web_data,
                 playoff_prob_sims=playoff_prob_sims,
+                playoff_prob_workers=playoff_prob_workers,
                 break_ties=break_ties,
                 dq_ce=dq_ce,
                 save_data=save_data,
@@ -248,6 +265,7 @@ def select_league(
                 season,
                 refresh_web_data,
                 playoff_prob_sims,
+                playoff_prob_workers,
                 break_ties,
                 dq_ce,
                 save_data,
@@ -270,6 +288,7 @@ def select_league(
             config=config,
             refresh_web_data=refresh_web_data,
             playoff_prob_sims=playoff_prob_sims,
+            playoff_prob_workers=playoff_prob_workers,
             break_ties=break_ties,
             dq_ce=dq_ce,
             save_data=save_data,
@@ -288,6 +307,7 @@ def select_league(
             season,
             refresh_web_data,
             playoff_prob_sims,
+            playoff_prob_workers,
             break_ties,
             dq_ce,
             save_data,
@@ -351,22 +371,72 @@ if __name__ == "__main__":
     # check to see if the current app is behind any commits, and provide option to update and re-run if behind
     up_to_date = check_for_updates(options.get("auto_run", False))
 
-    report = select_league(
-        options.get("auto_run", False),
-        options.get("week", None),
-        options.get("platform", None),
-        options.get("league_id", None),
-        options.get("game_id", None),
-        options.get("year", None),
-        options.get("refresh_web_data", False),
-        options.get("playoff_prob_sims", None),
-        options.get("break_ties", False),
-        options.get("dq_ce", False),
-        options.get("save_data", False),
-        options.get("dev_offline", False),
-        options.get("test", False),
-    )
-    report_pdf = report.create_pdf_report()
+    if options.get("serve"):
+        # reports generated by the service are not uploaded or posted
+        FantasyFootballReportService(
+            config,
+            game_id=options.get("game_id", None),
+            season=options.get("year", None),
+            refresh_web_data=options.get("refresh_web_data", False),
+            playoff_prob_sims=options.get("playoff_prob_sims", None),
+            playoff_prob_workers=options.get("playoff_prob_workers", None),
+            break_ties=options.get("break_ties", False),
+            dq_ce=options.get("dq_ce", False),
+            save_data=options.get("save_data", False),
+            dev_offline=options.get("dev_offline", False),
+            test=options.get("test", False),
+        ).serve()
+        sys.exit(0)
+
+    if options.get("league_jobs_file"):
+        try:
+            league_report_jobs = read_league_report_jobs(
+                options.get("league_jobs_file")
+            )
+        except ValueError as ve:
+            logger.error(ve)
+            sys.exit("...run aborted.")
+
+        batch_report = FantasyFootballBatchReport(
+            league_report_jobs,
+            config,
+            game_id=options.get("game_id", None),
+            season=options.get("year", None),
+            refresh_web_data=options.get("refresh_web_data", False),
+            playoff_prob_sims=options.get("playoff_prob_sims", None),
+            playoff_prob_workers=options.get("playoff_prob_workers", None),
+            break_ties=options.get("break_ties", False),
+            dq_ce=options.get("dq_ce", False),
+            save_data=options.get("save_data", False),
+            dev_offline=options.get("dev_offline", False),
+            test=options.get("test", False),
+        )
+        report_pdfs = [
+            job.report_pdf
+            for job in batch_report.create_pdf_reports()
+            if job.report_pdf
+        ]
+    else:
+        report = select_league(
+            options.get("auto_run", False),
+            options.get("week", None),
+            options.get("platform", None),
+            options.get("league_id", None),
+            options.get("game_id", None),
+            options.get("year", None),
+            options.get("refresh_web_data", False),
+            options.get("playoff_prob_sims", None),
+            options.get("playoff_prob_workers", None),
+            options.get("break_ties", False),
+            options.get("dq_ce", False),
+            options.get("save_data", False),
+            options.get("dev_offline", False),
+            options.get("test", False),
+        )
+        if options.get("backfill"):
+            report_pdfs = report.create_backfill_pdf_reports()
+        else:
+            report_pdfs = [report.create_pdf_report()]
 
     upload_file_to_google_drive = config.getboolean(
         "Drive", "google_drive_upload"
@@ -374,16 +444,22 @@ if __name__ == "__main__":
     upload_message = ""
     if upload_file_to_google_drive:
         if not options.get("test", False):
-            # upload pdf to google drive
-            google_drive_uploader = GoogleDriveUploader(report_pdf, config)
-            upload_message = google_drive_uploader.upload_file()
-            logger.info(upload_message)
+            upload_messages = []
+            for report_pdf in report_pdfs:
+                # upload pdf to google drive
+                google_drive_uploader = GoogleDriveUploader(report_pdf, config)
+                upload_message = google_drive_uploader.upload_file()
+                logger.info(upload_message)
+                upload_messages.append(upload_message)
+
+            # write the upload messages of every report at once
             upload_message_file_path = os.path.join(
-                config.get("Configuration", "data_dir"), "gdrive_message.txt"
+                config.get("Configuration", "data_dir"),
+                "gdrive_message.txt",
             )
             logger.info(upload_message_file_path)
             with open(upload_message_file_path, "w") as f:
-                f.write(upload_message)
+                f.write("\n".join(upload_messages))
                 logger.info(
                     "GDrive Message file was created: "
                     + upload_message_file_path
@@ -0,0 +1,364 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "wrenjr@yahoo.com"
+
+import datetime
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from calculate.bad_boy_stats import BadBoyStats
+from calculate.beef_stats import BeefStats
+from calculate.covid_risk import CovidRisk
+from dao.base import get_saved_nfl_data_dir
+from report.builder import FantasyFootballReport
+from report.logger import get_logger
+from report.sections import ReportSections
+from utils.report_tools import supported_platforms
+
+logger = get_logger(__name__, propagate=False)
+
+# report settings and shared NFL data used by the worker processes that generate the league reports in parallel
+worker_report_settings = None  # type: dict
+
+
+def init_league_report_worker(report_settings):
+    global worker_report_settings
+    worker_report_settings = report_settings
+
+
+def create_league_report_in_worker(job):
+    return create_league_report(job, worker_report_settings)
+
+
+def create_league_report(job, report_settings):
+    """Generate the report of a single league. Any failure is caught and returned so that it does not stop the reports
+    of the other leagues in the batch.
+
+    :param job: LeagueReportJob of the league
+    :param report_settings: dict of FantasyFootballReport keyword arguments shared by all leagues, and of the shared
+        COVID-19 risk data by week
+    :return: tuple of the report pdf file path (or None), the error message (or None), and the duration in seconds
+    """
+    begin = datetime.datetime.now()
+    try:
+        report = FantasyFootballReport(
+            week_for_report=job.week,
+            platform=job.platform,
+            league_id=job.league_id,
+            covid_risk=report_settings["covid_risk_by_week"].get(
+                int(job.week) if job.week else None
+            ),
+            **report_settings["report_kwargs"]
+        )
+        report_pdf = report.create_pdf_report()
+        error = None
+    except (Exception, SystemExit) as e:
+        logger.debug("Error: {0}\n{1}".format(repr(e), traceback.format_exc()))
+        report_pdf = None
+        error = repr(e)
+
+    return (
+        report_pdf,
+        error,
+        (datetime.datetime.now() - begin).total_seconds(),
+    )
+
+
+def read_league_report_jobs(jobs_file_path):
+    """Read the league report jobs from a file with one "platform,league_id[,week]" job per line. Blank lines and lines
+    starting with "#" are ignored, and jobs without a week use the default (most recent) week.
+
+    :param jobs_file_path: system file path of the jobs file
+    :return: list of LeagueReportJob
+    :raises ValueError: if a line of the jobs file is not a valid job
+    """
+    jobs = []
+    with open(jobs_file_path, "r") as jobs_in:
+        for line_num, line in enumerate(jobs_in, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            job_values = [value.strip() for value in line.split(",")]
+            platform = job_values[0].lower()
+            league_id = job_values[1] if len(job_values) > 1 else ""
+            week = job_values[2] if len(job_values) > 2 else ""
+
+            if (
+                len(job_values) > 3
+                or platform not in supported_platforms
+                or not league_id
+                or (week and not (week.isdigit() and 1 <= int(week) <= 17))
+            ):
+                raise ValueError(
+                    'Invalid league report job "{0}" on line {1} of {2}. Jobs must be formatted as '
+                    '"platform,league_id[,week]" with a supported platform ({3}) and a week from 1 to 17.'.format(
+                        line,
+                        line_num,
+                        jobs_file_path,
+                        ", ".join(supported_platforms),
+                    )
+                )
+
+            jobs.append(LeagueReportJob(platform, league_id, week or None))
+
+    return jobs
+
+
+class LeagueReportJob(object):
+    def __init__(self, platform, league_id, week=None):
+        self.platform = platform
+        self.league_id = league_id
+        self.week = week
+
+        # results of the league report
+        self.report_pdf = None
+        self.error = None
+        self.duration = None
+
+    def __str__(self):
+        return "{0} league {1} (week {2})".format(
+            self.platform,
+            self.league_id,
+            self.week if self.week else "default",
+        )
+
+
+class FantasyFootballBatchReport(object):
+    def __init__(
+        self,
+        jobs,
+        config,
+        game_id=None,
+        season=None,
+        refresh_web_data=False,
+        playoff_prob_sims=None,
+        playoff_prob_workers=None,
+        break_ties=False,
+        dq_ce=False,
+        save_data=False,
+        dev_offline=False,
+        test=False,
+    ):
+        """Generate the reports of a batch of leagues, retrieving the NFL data that is the same for every league (bad
+        boy, beef, and COVID-19 risk data) only once, and running the league reports in parallel worker processes.
+
+        :param jobs: list of LeagueReportJob
+        :param config: app config
+        """
+        logger.debug("Instantiating fantasy football batch report.")
+
+        self.jobs = jobs  # type: list[LeagueReportJob]
+        self.config = config
+        self.season = season if season else config.get("Settings", "season")
+        self.refresh_web_data = refresh_web_data
+        self.save_data = save_data
+        self.dev_offline = dev_offline
+
+        self.report_kwargs = {
+            "game_id": game_id,
+            "season": season,
+            "config": config,
+            "refresh_web_data": refresh_web_data,
+            "playoff_prob_sims": playoff_prob_sims,
+            "playoff_prob_workers": playoff_prob_workers,
+            "break_ties": break_ties,
+            "dq_ce": dq_ce,
+            "save_data": save_data,
+            "dev_offline": dev_offline,
+            "test": test,
+        }
+
+        self.report_sections = ReportSections(self.config)
+
+        self.num_workers = self.config.getint(
+            "Settings", "num_league_report_workers", fallback=1
+        )
+
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.data_dir = os.path.join(
+            base_dir, self.config.get("Configuration", "data_dir")
+        )
+
+    def get_shared_nfl_data(self):
+        """Retrieve the NFL data used by every league report once for the whole batch. COVID-19 risk data depends on
+        the week, so it is only retrieved for the weeks chosen in the jobs (leagues using their default week retrieve
+        their own).
+
+        :return: dict of bad boy stats, beef stats, and COVID-19 risk data by week
+        """
+        begin = datetime.datetime.now()
+        logger.info(
+            "Retrieving NFL data shared by {0} league reports...".format(
+                len(self.jobs)
+            )
+        )
+
+        league_ids = [job.league_id for job in self.jobs]
+        shared_nfl_data = {
+            "bad_boy_stats": None,
+            "beef_stats": None,
+            "covid_risk_by_week": {},
+        }
+
+        if self.report_sections.is_required("bad_boy_stats"):
+            shared_nfl_data["bad_boy_stats"] = BadBoyStats(
+                get_saved_nfl_data_dir(
+                    self.data_dir,
+                    self.season,
+                    league_ids,
+                    "bad_boy_data.json",
+                    self.dev_offline,
+                ),
+                save_data=self.save_data,
+                dev_offline=self.dev_offline,
+                refresh=self.refresh_web_data,
+            )
+
+        if self.report_sections.is_required("beef_stats"):
+            shared_nfl_data["beef_stats"] = BeefStats(
+                get_saved_nfl_data_dir(
+                    self.data_dir,
+                    self.season,
+                    league_ids,
+                    "beef_data.json",
+                    self.dev_offline,
+                ),
+                save_data=self.save_data,
+                dev_offline=self.dev_offline,
+                refresh=self.refresh_web_data,
+            )
+
+        if (
+            self.report_sections.is_required("covid_risk")
+            and int(self.season) >= 2020
+        ):
+            for week in sorted(
+                {int(job.week) for job in self.jobs if job.week}
+            ):
+                shared_nfl_data["covid_risk_by_week"][week] = CovidRisk(
+                    self.config,
+                    get_saved_nfl_data_dir(
+                        self.data_dir,
+                        self.season,
+                        league_ids,
+                        "covid_data.json",
+                        self.dev_offline,
+                        week=week,
+                    ),
+                    season=self.season,
+                    week=week,
+                    save_data=self.save_data,
+                    dev_offline=self.dev_offline,
+                    refresh=self.refresh_web_data,
+                )
+
+        logger.info(
+            "...retrieved all shared NFL data in {0}\n".format(
+                str(datetime.datetime.now() - begin)
+            )
+        )
+
+        return shared_nfl_data
+
+    def create_pdf_reports(self):
+        """Generate the report of every league in the batch, running up to num_league_report_workers leagues at a time.
+
+        :return: list of LeagueReportJob with the report pdf file path or error of each league
+        """
+        begin = datetime.datetime.now()
+
+        shared_nfl_data = self.get_shared_nfl_data()
+        report_settings = {
+            "report_kwargs": dict(
+                self.report_kwargs,
+                bad_boy_stats=shared_nfl_data["bad_boy_stats"],
+                beef_stats=shared_nfl_data["beef_stats"],
+            ),
+            "covid_risk_by_week": shared_nfl_data["covid_risk_by_week"],
+        }
+
+        num_workers = min(self.num_workers, len(self.jobs))
+        if num_workers > 1:
+            logger.info(
+                "Generating {0} league reports with {1} worker processes...".format(
+                    len(self.jobs), num_workers
+                )
+            )
+            with ProcessPoolExecutor(
+                max_workers=num_workers,
+                initializer=init_league_report_worker,
+                initargs=(report_settings,),
+            ) as executor:
+                futures = {
+                    executor.submit(create_league_report_in_worker, job): job
+                    for job in self.jobs
+                }
+                for future in as_completed(futures):
+                    job = futures[future]
+                    try:
+                        (
+                            job.report_pdf,
+                            job.error,
+                            job.duration,
+                        ) = future.result()
+                    except Exception as e:
+                        # the worker process running the league report terminated unexpectedly
+                        job.error = repr(e)
+                    self.log_job_result(job)
+        else:
+            for job in self.jobs:
+                (
+                    job.report_pdf,
+                    job.error,
+                    job.duration,
+                ) = create_league_report(job, report_settings)
+                self.log_job_result(job)
+
+        self.log_summary(datetime.datetime.now() - begin)
+
+        return self.jobs
+
+    @staticmethod
+    def log_job_result(job: LeagueReportJob):
+        if job.error:
+            logger.error(
+                "...report for {0} FAILED{1}: {2}\n".format(
+                    job,
+                    " after {0:.1f}s".format(job.duration)
+                    if job.duration is not None
+                    else "",
+                    job.error,
+                )
+            )
+        else:
+            logger.info(
+                "...report for {0} generated in {1:.1f}s: {2}\n".format(
+                    job, job.duration, job.report_pdf
+                )
+            )
+
+    def log_summary(self, total_duration):
+        failed_jobs = [job for job in self.jobs if job.error]
+
+        summary = "\nGenerated {0} of {1} league reports ({2} failed) in {3}:\n".format(
+            len(self.jobs) - len(failed_jobs),
+            len(self.jobs),
+            len(failed_jobs),
+            total_duration,
+        )
+        for job in self.jobs:
+            summary += "    {0:<12} {1:<20} {2:<8} {3:>9} {4}\n".format(
+                job.platform,
+                job.league_id,
+                job.week if job.week else "default",
+                "{0:.1f}s".format(job.duration)
+                if job.duration is not None
+                else "-",
+                ("FAILED: " + job.error) if job.error else job.report_pdf,
+            )
+
+        if failed_jobs:
+            logger.error(summary)
+        else:
+            logger.info(summary)
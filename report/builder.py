@@ -2,21 +2,88 @@ __author__ = "Wren J. R. (uberfastman)"
 __email__ = "wrenjr@yahoo.com"
 
 import datetime
+import hashlib
+import json
 import os
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy, deepcopy
 
+from calculate.all_play import AllPlayRecords
+from calculate.bad_boy_stats import BadBoyStats
+from calculate.beef_stats import BeefStats
 from calculate.coaching_efficiency import CoachingEfficiency
+from calculate.covid_risk import CovidRisk
 from calculate.metrics import CalculateMetrics
+from calculate.optimal_lineup import OptimalLineupSolver
 from calculate.points_by_position import PointsByPosition
+from calculate.score_statistics import SeasonScoreStatistics
 from calculate.season_averages import SeasonAverageCalculator
-from dao.base import BaseLeague, BaseTeam
+from calculate.season_time_series import SeasonTimeSeries
+from dao.base import BaseLeague, BaseTeam, get_saved_nfl_data_dir
 from utils.report_tools import league_data_factory, patch_http_connection_pool
 from report.data import ReportData
+from report.instrumentation import (
+    add_instrumentation_events,
+    instrumented,
+    pop_instrumentation_events,
+    save_instrumentation_trace,
+    start_instrumentation,
+    stop_instrumentation,
+)
 from report.logger import get_logger
 from report.pdf.generator import PdfGenerator
+from report.scheduler import ReportStage, ReportStageScheduler
+from report.sections import ReportSections
 
 logger = get_logger(__name__, propagate=False)
 
+# version of the saved weekly results, which must be increased whenever the metrics calculated from the same inputs
+# change (such as optimal lineups or tie resolution), so that results saved by older versions are recalculated
+WEEK_RESULTS_CACHE_VERSION = 2
+
+# report used by the worker processes that calculate the weekly results in parallel
+worker_report = None  # type: FantasyFootballReport
+
+
+def init_week_results_worker(report):
+    global worker_report
+    worker_report = report
+    if worker_report.save_report_trace:
+        start_instrumentation()
+
+
+def calculate_week_results_in_worker(week, season_score_statistics):
+    week_results = worker_report.get_week_results(
+        week, worker_report.get_report_data(week, season_score_statistics)
+    )
+    # send the instrumentation events recorded in the worker process back with the results
+    return week_results, pop_instrumentation_events()
+
+
+def init_report_pdf_worker(save_report_trace):
+    if save_report_trace:
+        start_instrumentation()
+
+
+def generate_report_pdf(report_pdf_settings, season_time_series):
+    """Generate a report PDF.
+
+    :param report_pdf_settings: dict of the report pdf file path and PdfGenerator keyword arguments
+    :param season_time_series: SeasonTimeSeries of the weeks through the report week
+    :return: report pdf file path
+    """
+    pdf_generator = PdfGenerator(**report_pdf_settings["pdf_generator_kwargs"])
+    return pdf_generator.generate_pdf(
+        report_pdf_settings["file_path"], season_time_series
+    )
+
+
+def generate_report_pdf_in_worker(report_pdf_settings, season_time_series):
+    report_pdf = generate_report_pdf(report_pdf_settings, season_time_series)
+    # send the instrumentation events recorded in the worker process back with the report pdf
+    return report_pdf, pop_instrumentation_events()
+
 
 class FantasyFootballReport(object):
     def __init__(
@@ -29,12 +96,22 @@ class FantasyFootballReport(object):
         config=None,
         refresh_web_data=False,
         playoff_prob_sims=None,
+        playoff_prob_workers=None,
         break_ties=False,
         dq_ce=False,
         save_data=False,
         dev_offline=False,
         test=False,
+        bad_boy_stats=None,
+        beef_stats=None,
+        covid_risk=None,
+        league=None,
     ):
+        """Retrieve the league data for the report. Bad boy, beef, and COVID-19 risk data that has already been
+        retrieved (such as NFL data shared by a batch of league reports), and league data that has already been
+        retrieved (such as league data kept in memory by the report service), can be passed in to skip retrieving it
+        again. The metrics of the report are calculated on the passed league data, so it cannot be reused afterwards.
+        """
 
         logger.debug("Instantiating fantasy football report.")
 
@@ -71,12 +148,42 @@ class FantasyFootballReport(object):
         # refresh data pulled from external web sources: bad boy data from USA Today, beef data from Fox Sports
         self.refresh_web_data = refresh_web_data
         self.playoff_prob_sims = playoff_prob_sims
+        self.playoff_prob_workers = playoff_prob_workers
         self.break_ties = break_ties
         self.dq_ce = dq_ce
 
         self.dev_offline = dev_offline
         self.test = test
 
+        # only the metrics (and the web data they need) of the report sections that are enabled are calculated
+        self.report_sections = ReportSections(self.config)
+
+        self.num_report_data_workers = self.config.getint(
+            "Settings", "num_report_data_workers", fallback=1
+        )
+
+        # record the timing and resources of every report stage to a trace file saved next to the report
+        self.save_report_trace = self.config.getboolean(
+            "Settings", "save_report_trace", fallback=True
+        )
+        if self.save_report_trace:
+            start_instrumentation()
+
+        # test mode overwrites the weekly results to test ties, so they are never saved or reused
+        self.use_report_data_cache = (
+            self.config.getboolean(
+                "Settings", "cache_report_data", fallback=True
+            )
+            and not self.test
+        )
+
+        # metrics of the report week, which are kept once the report is created (such as for the report service)
+        self.report_data = None  # type: ReportData
+        # all-play records of every week of the season, which are calculated together when the report is created
+        self.all_play_records = None  # type: AllPlayRecords
+        # optimal lineups of the rosters of every week of the season, which are also solved together
+        self.lineup_solver = None  # type: OptimalLineupSolver
+
         # verification output message
         logger.info(
             "\nGenerating%s %s Fantasy Football report with settings:\n"
@@ -86,6 +193,7 @@ class FantasyFootballReport(object):
             "%s"
             "%s"
             "    playoff_prob_sims: %s\n"
+            "    playoff_prob_workers: %s\n"
             "%s"
             "%s"
             "%s"
@@ -102,6 +210,7 @@ class FantasyFootballReport(object):
                 "    save_data: " + str(self.save_data) + "\n",
                 "    refresh_web_data: " + str(self.refresh_web_data) + "\n",
                 str(self.playoff_prob_sims),
+                str(self.playoff_prob_workers),
                 "    break_ties: " + str(self.break_ties) + "\n",
                 "    dq_ce: " + str(self.dq_ce) + "\n",
                 "    dev_offline: " + str(self.dev_offline) + "\n",
@@ -110,6 +219,71 @@ class FantasyFootballReport(object):
             )
         )
 
+        # retrieve the league data and the NFL data from the web sources that do not depend on it at the same time
+        report_stages = [
+            ReportStage(
+                "league",
+                lambda: league
+                if league is not None
+                else self.retrieve_league_data(week_for_report, base_dir),
+            ),
+            ReportStage(
+                "playoff_probs",
+                self.get_playoff_probs,
+                inputs=["league"],
+                io_bound=False,
+            ),
+        ]
+
+        if bad_boy_stats is not None:
+            self.bad_boy_stats = bad_boy_stats
+        elif self.report_sections.is_required("bad_boy_stats"):
+            report_stages.append(
+                ReportStage("bad_boy_stats", self.retrieve_bad_boy_stats)
+            )
+        else:
+            self.bad_boy_stats = None
+
+        if beef_stats is not None:
+            self.beef_stats = beef_stats
+        elif self.report_sections.is_required("beef_stats"):
+            report_stages.append(
+                ReportStage("beef_stats", self.retrieve_beef_stats)
+            )
+        else:
+            self.beef_stats = None
+
+        # COVID-19 risk data depends on the week of the report, which is only known once the league data is retrieved
+        if covid_risk is not None or self.report_sections.is_required(
+            "covid_risk"
+        ):
+            report_stages.append(
+                ReportStage(
+                    "covid_risk",
+                    lambda league: self.retrieve_covid_risk(
+                        league, covid_risk
+                    ),
+                    inputs=["league"],
+                )
+            )
+        else:
+            self.covid_risk = None
+
+        report_stage_scheduler = ReportStageScheduler(report_stages)
+        for stage_name, stage_output in report_stage_scheduler.run().items():
+            setattr(self, stage_name, stage_output)
+        report_stage_scheduler.log_summary()
+
+        # output league info for verification
+        logger.info(
+            '...setup complete for "{0}" ({1}) week {2} report.\n'.format(
+                self.league.name.upper(),
+                self.league_id,
+                self.league.week_for_report,
+            )
+        )
+
+    def retrieve_league_data(self, week_for_report, base_dir):
         begin = datetime.datetime.now()
         logger.info(
             "Retrieving fantasy football data from {0}...".format(
@@ -119,7 +293,7 @@ class FantasyFootballReport(object):
         )
 
         # retrieve all league data from respective platform API
-        self.league = league_data_factory(
+        league = league_data_factory(
             week_for_report=week_for_report,
             platform=self.platform,
             league_id=self.league_id,
@@ -141,249 +315,719 @@ class FantasyFootballReport(object):
             )
         )
 
-        self.playoff_probs = self.league.get_playoff_probs(
+        return league
+
+    def get_playoff_probs(self, league: BaseLeague):
+        return league.get_playoff_probs(
             self.save_data,
             self.playoff_prob_sims,
             self.dev_offline,
             recalculate=True,
+            playoff_prob_workers=self.playoff_prob_workers,
         )
 
-        if self.config.getboolean("Report", "league_bad_boy_rankings"):
-            begin = datetime.datetime.now()
-            logger.info(
-                "Retrieving bad boy data from https://www.usatoday.com/sports/nfl/arrests/ {0}...".format(
-                    "website"
-                    if not self.dev_offline or self.refresh_web_data
-                    else "saved data"
-                )
-            )
-            self.bad_boy_stats = self.league.get_bad_boy_stats(
-                self.save_data, self.dev_offline, self.refresh_web_data
+    def retrieve_bad_boy_stats(self):
+        begin = datetime.datetime.now()
+        logger.info(
+            "Retrieving bad boy data from https://www.usatoday.com/sports/nfl/arrests/ {0}...".format(
+                "website"
+                if not self.dev_offline or self.refresh_web_data
+                else "saved data"
             )
-            delta = datetime.datetime.now() - begin
-            logger.info(
-                "...retrieved all bad boy data from https://www.usatoday.com/sports/nfl/arrests/ {0} in {1}\n".format(
-                    "website" if not self.dev_offline else "saved data",
-                    str(delta),
-                )
+        )
+        bad_boy_stats = BadBoyStats(
+            get_saved_nfl_data_dir(
+                self.data_dir,
+                self.season,
+                [self.league_id],
+                "bad_boy_data.json",
+                self.dev_offline,
+            ),
+            save_data=self.save_data,
+            dev_offline=self.dev_offline,
+            refresh=self.refresh_web_data,
+        )
+        delta = datetime.datetime.now() - begin
+        logger.info(
+            "...retrieved all bad boy data from https://www.usatoday.com/sports/nfl/arrests/ {0} in {1}\n".format(
+                "website" if not self.dev_offline else "saved data",
+                str(delta),
             )
-        else:
-            self.bad_boy_stats = None
+        )
+        return bad_boy_stats
 
-        if self.config.getboolean("Report", "league_beef_rankings"):
-            begin = datetime.datetime.now()
-            logger.info(
-                "Retrieving beef data from Fox Sports {0}...".format(
-                    "API"
-                    if not self.dev_offline or self.refresh_web_data
-                    else "saved data"
-                )
+    def retrieve_beef_stats(self):
+        begin = datetime.datetime.now()
+        logger.info(
+            "Retrieving beef data from Fox Sports {0}...".format(
+                "API"
+                if not self.dev_offline or self.refresh_web_data
+                else "saved data"
             )
-            self.beef_stats = self.league.get_beef_stats(
-                self.save_data, self.dev_offline, self.refresh_web_data
+        )
+        beef_stats = BeefStats(
+            get_saved_nfl_data_dir(
+                self.data_dir,
+                self.season,
+                [self.league_id],
+                "beef_data.json",
+                self.dev_offline,
+            ),
+            save_data=self.save_data,
+            dev_offline=self.dev_offline,
+            refresh=self.refresh_web_data,
+        )
+        delta = datetime.datetime.now() - begin
+        logger.info(
+            "...retrieved all beef data from Fox Sports {0} in {1}\n".format(
+                "API" if not self.dev_offline else "saved data", str(delta)
             )
-            delta = datetime.datetime.now() - begin
-            logger.info(
-                "...retrieved all beef data from Fox Sports {0} in {1}\n".format(
-                    "API" if not self.dev_offline else "saved data", str(delta)
-                )
+        )
+        return beef_stats
+
+    def retrieve_covid_risk(self, league: BaseLeague, covid_risk=None):
+        if covid_risk is not None and covid_risk.week == int(
+            league.week_for_report
+        ):
+            return covid_risk
+
+        if not (
+            self.report_sections.is_required("covid_risk")
+            and int(self.season) >= 2020
+        ):
+            return None
+
+        begin = datetime.datetime.now()
+        logger.info(
+            "Retrieving COVID-19 risk data from https://sportsdata.usatoday.com/football/nfl/transactions {0}...".format(
+                "website"
+                if not self.dev_offline or self.refresh_web_data
+                else "saved data"
             )
-        else:
-            self.beef_stats = None
+        )
+        covid_risk = league.get_covid_risk(
+            self.save_data, self.dev_offline, self.refresh_web_data
+        )
+        delta = datetime.datetime.now() - begin
+        logger.info(
+            "...retrieved all COVID-19 risk data from https://sportsdata.usatoday.com/football/nfl/transactions {0}"
+            " in {1}\n".format(
+                "website" if not self.dev_offline else "saved data",
+                str(delta),
+            )
+        )
+        return covid_risk
 
-        if (
-            self.config.getboolean("Report", "league_covid_risk_rankings")
+    def retrieve_week_covid_risk(self, week):
+        """Retrieve the COVID-19 risk data of a week before the week of the league data (such as for the reports of
+        earlier weeks generated from the same league data).
+        """
+        if not (
+            self.report_sections.is_required("covid_risk")
             and int(self.season) >= 2020
         ):
-            begin = datetime.datetime.now()
-            logger.info(
-                "Retrieving COVID-19 risk data from https://sportsdata.usatoday.com/football/nfl/transactions {0}...".format(
-                    "website"
-                    if not self.dev_offline or self.refresh_web_data
-                    else "saved data"
+            return None
+
+        return CovidRisk(
+            self.config,
+            get_saved_nfl_data_dir(
+                self.data_dir,
+                self.season,
+                [self.league_id],
+                "covid_data.json",
+                self.dev_offline,
+                week=week,
+            ),
+            season=self.season,
+            week=week,
+            save_data=self.save_data,
+            dev_offline=self.dev_offline,
+            refresh=self.refresh_web_data,
+        )
+
+    @instrumented(category="cache", arg_names=("week",))
+    def get_week_fingerprint(
+        self, week, custom_weekly_matchups, previous_week_fingerprint
+    ):
+        """Hash the inputs of the weekly results that are carried forward to the weeks after it, so saved weekly results
+        are only reused when none of them have changed. Fingerprints are chained to the fingerprint of the previous
+        week, since z-scores depend on the scores of every previous week.
+
+        :param week: week of the results
+        :param custom_weekly_matchups: list of dicts of matchup results by team id for the week
+        :param previous_week_fingerprint: fingerprint of the previous week (None for the first week)
+        :return: hex digest of the week inputs
+        """
+        # only the team and player attributes that the weekly results are calculated from are included, since others
+        # (like percent owned or FAAB) reflect the current state of the league instead of the week
+        teams = [
+            [
+                team.team_id,
+                team.name,
+                team.manager_str,
+                team.points,
+                team.home_field_advantage,
+                [
+                    [
+                        player.player_id,
+                        player.full_name,
+                        player.points,
+                        player.selected_position,
+                        sorted(player.eligible_positions),
+                        player.status,
+                        player.bye_week,
+                    ]
+                    for player in team.roster
+                ],
+            ]
+            for team in self.league.teams_by_week.get(str(week)).values()
+        ]
+
+        # opponents of the week, which decide the records and matchup results carried forward to the later weeks
+        matchups = [
+            [
+                [team.team_id for team in matchup.teams],
+                matchup.complete,
+                matchup.tied,
+                matchup.winner.team_id if matchup.winner else None,
+            ]
+            for matchup in self.league.matchups_by_week.get(str(week), [])
+        ]
+
+        coaching_efficiency_disqualified_teams = ""
+        if int(week) == int(self.league.week_for_report):
+            coaching_efficiency_disqualified_teams = self.config.get(
+                "Settings", "coaching_efficiency_disqualified_teams"
+            )
+
+        inputs = {
+            "version": WEEK_RESULTS_CACHE_VERSION,
+            "previous_week_fingerprint": previous_week_fingerprint,
+            "week": int(week),
+            "teams": teams,
+            "matchups": matchups,
+            "custom_weekly_matchups": custom_weekly_matchups,
+            "roster_position_counts": self.league.roster_position_counts,
+            "active_positions": self.league.active_positions,
+            "bench_positions": self.league.bench_positions,
+            "flex_positions": self.league.get_flex_positions_dict(),
+            "prohibited_statuses": self.config.get(
+                "Configuration", "prohibited_statuses"
+            ),
+            "coaching_efficiency_disqualified_teams": coaching_efficiency_disqualified_teams,
+            "break_ties": self.break_ties,
+            "dq_ce": self.dq_ce,
+            "required_metrics": sorted(self.report_sections.required_metrics),
+        }
+        return hashlib.sha256(
+            json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+    @staticmethod
+    def get_week_results(week, report_data: ReportData):
+        """Get the weekly results of the report data that are carried forward to the season metrics and time series.
+
+        :return: dict of weekly results
+        """
+        return {
+            "teams": report_data.data_for_teams,
+            "teams_points": [
+                [team_id, float(team_result.points)]
+                for team_id, team_result in report_data.teams_results.items()
+            ],
+            "weekly_points_by_position": report_data.data_for_weekly_points_by_position,
+            "top_scorer": {
+                "week": week,
+                "team": report_data.data_for_scores[0][1],
+                "manager": report_data.data_for_scores[0][2],
+                "score": report_data.data_for_scores[0][3],
+            },
+            "highest_ce": {
+                "week": week,
+                "team": report_data.data_for_coaching_efficiency[0][1],
+                "manager": report_data.data_for_coaching_efficiency[0][2],
+                "ce": report_data.data_for_coaching_efficiency[0][3],
+            },
+        }
+
+    def get_week_results_file_path(self, week):
+        return os.path.join(
+            self.league.data_dir,
+            str(self.season),
+            str(self.league_id),
+            "week_" + str(week),
+            "report_data_cache.json",
+        )
+
+    @instrumented(category="cache", arg_names=("week",))
+    def load_week_results(self, week, week_fingerprint):
+        week_results_file_path = self.get_week_results_file_path(week)
+        if os.path.exists(week_results_file_path):
+            with open(week_results_file_path, "r", encoding="utf-8") as wr_in:
+                cached_week_results = json.load(wr_in)
+            if cached_week_results.get("fingerprint") == week_fingerprint:
+                logger.debug(
+                    "Using saved results for unchanged week {0}.".format(week)
                 )
+                return cached_week_results["week_results"]
+        return None
+
+    @instrumented(category="cache", arg_names=("week",))
+    def save_week_results(self, week, week_fingerprint, week_results):
+        try:
+            week_results_json = json.dumps(
+                {
+                    "fingerprint": week_fingerprint,
+                    "week_results": week_results,
+                },
+                ensure_ascii=False,
+                indent=2,
             )
-            self.covid_risk = self.league.get_covid_risk(
-                self.save_data, self.dev_offline, self.refresh_web_data
+        except TypeError as e:
+            logger.warning(
+                "Unable to save results for week {0}: {1}".format(week, e)
             )
-            delta = datetime.datetime.now() - begin
+            return
+
+        week_results_file_path = self.get_week_results_file_path(week)
+        week_results_dir = os.path.dirname(week_results_file_path)
+        if not os.path.exists(week_results_dir):
+            os.makedirs(week_results_dir)
+
+        with open(week_results_file_path, "w", encoding="utf-8") as wr_out:
+            wr_out.write(week_results_json)
+
+    @instrumented("report_data", category="week", arg_names=("week",))
+    def get_report_data(
+        self, week, season_score_statistics, week_for_report=None
+    ):
+        """Calculate the report data of a week. The records of the week must already be calculated.
+
+        :param week: week of the report data
+        :param season_score_statistics: SeasonScoreStatistics of the scores of every previous week
+        :param week_for_report: week of the report the report data is for (defaults to the week of the league data)
+        :return: ReportData object
+        """
+        if week_for_report is None:
+            week_for_report = self.league.week_for_report
+
+        metrics_calculator = CalculateMetrics(
+            self.config,
+            self.league_id,
+            self.league.num_playoff_slots,
+            self.playoff_prob_sims,
+        )
+
+        custom_weekly_matchups = self.league.get_custom_weekly_matchups(
+            str(week)
+        )
+
+        return ReportData(
+            config=self.config,
+            league=self.league,
+            season_score_statistics=season_score_statistics,
+            week_counter=str(week),
+            week_for_report=week_for_report,
+            season=self.season,
+            metrics_calculator=metrics_calculator,
+            metrics={
+                "coaching_efficiency": CoachingEfficiency(
+                    self.config, self.league, self.lineup_solver
+                ),
+                "luck": metrics_calculator.calculate_luck(
+                    week,
+                    self.league,
+                    custom_weekly_matchups,
+                    self.all_play_records,
+                ),
+                "records": self.league.records_by_week[str(week)],
+                "playoff_probs": self.playoff_probs,
+                "bad_boy_stats": self.bad_boy_stats,
+                "beef_stats": self.beef_stats,
+                "covid_risk": self.covid_risk
+                if int(week_for_report) == int(self.league.week_for_report)
+                else self.retrieve_week_covid_risk(week_for_report),
+            },
+            report_sections=self.report_sections,
+            break_ties=self.break_ties,
+            dq_ce=self.dq_ce,
+            testing=self.test,
+        )
+
+    def calculate_week_results(self, weeks, season_score_statistics_by_week):
+        """Calculate the weekly results of weeks that do not depend on each other. When more than one report data worker
+        is configured, the weeks are calculated in a process pool whose worker processes each get a copy of the report.
+
+        :param weeks: list of weeks
+        :param season_score_statistics_by_week: dict of SeasonScoreStatistics of the scores of every previous week by
+            week
+        :return: dict of weekly results by week
+        """
+        num_workers = max(1, min(self.num_report_data_workers, len(weeks)))
+        if num_workers > 1:
+            begin = datetime.datetime.now()
             logger.info(
-                "...retrieved all COVID-19 risk data from https://sportsdata.usatoday.com/football/nfl/transactions {0}"
-                " in {1}\n".format(
-                    "website" if not self.dev_offline else "saved data",
-                    str(delta),
+                "Calculating metrics for {0} weeks across {1} worker processes...".format(
+                    len(weeks), num_workers
                 )
             )
-        else:
-            self.covid_risk = None
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=num_workers,
+                    initializer=init_week_results_worker,
+                    initargs=(self,),
+                ) as executor:
+                    week_results_with_events = list(
+                        executor.map(
+                            calculate_week_results_in_worker,
+                            weeks,
+                            [
+                                season_score_statistics_by_week[week]
+                                for week in weeks
+                            ],
+                        )
+                    )
+                logger.info(
+                    "...calculated metrics for {0} weeks in {1}\n".format(
+                        len(weeks), str(datetime.datetime.now() - begin)
+                    )
+                )
+                week_results = []
+                for week_result, events in week_results_with_events:
+                    week_results.append(week_result)
+                    add_instrumentation_events(events)
+                return dict(zip(weeks, week_results))
+            except Exception as e:
+                logger.warning(
+                    "Unable to calculate metrics in worker processes ({0}), calculating them in order instead.".format(
+                        e
+                    )
+                )
 
-        # output league info for verification
-        logger.info(
-            '...setup complete for "{0}" ({1}) week {2} report.\n'.format(
-                self.league.name.upper(),
-                self.league_id,
-                self.league.week_for_report,
+        return {
+            week: self.get_week_results(
+                week,
+                self.get_report_data(
+                    week, season_score_statistics_by_week[week]
+                ),
             )
+            for week in weeks
+        }
+
+    def calculate_season_records(self, weeks):
+        """Calculate the records, standings, and the running statistics of the scores of every week in order, since
+        they are built on those of the previous week, and load the saved results of the weeks before the week of the
+        league data whose inputs are unchanged. After this, the metrics of every week are independent.
+
+        :param weeks: list of weeks from the first week through the week of the league data
+        :return: tuple of the dict of saved weekly results by week, the dict of week fingerprints by week, and the dict
+            of SeasonScoreStatistics of the scores of every previous week by week
+        """
+        week_for_report = int(self.league.week_for_report)
+
+        # the luck of every week is looked up from the all-play records of the whole season
+        self.all_play_records = AllPlayRecords.from_league(self.league, weeks)
+        # the coaching efficiency of every week looks up the optimal points of the rosters of the whole season
+        self.lineup_solver = OptimalLineupSolver.from_league(self.league)
+        self.lineup_solver.solve_rosters(
+            [
+                team.roster
+                for week in weeks
+                for team in self.league.teams_by_week.get(str(week)).values()
+            ]
+        )
+
+        week_results_by_week = {}
+        week_fingerprints = {}
+        season_score_statistics_by_week = {}
+        season_score_statistics = SeasonScoreStatistics()
+        week_fingerprint = None
+        for week_counter in weeks:
+            custom_weekly_matchups = self.league.get_custom_weekly_matchups(
+                str(week_counter)
+            )
+
+            CalculateMetrics.calculate_records(
+                week_counter, self.league, custom_weekly_matchups
+            )
+
+            # the records of the next week are built on the standings as of this week
+            week_records = self.league.records_by_week[str(week_counter)]
+            self.league.standings = sorted(
+                self.league.teams_by_week.get(str(week_counter)).values(),
+                key=lambda x: (
+                    week_records[x.team_id].rank,
+                    -week_records[x.team_id].get_points_for(),
+                ),
+            )
+
+            # z-scores of each week are calculated from the running statistics of the scores of every previous week
+            season_score_statistics_by_week[week_counter] = deepcopy(
+                season_score_statistics
+            )
+            season_score_statistics.add_week(
+                {
+                    team.team_id: team.points
+                    for team in self.league.teams_by_week.get(
+                        str(week_counter)
+                    ).values()
+                }
+            )
+
+            # reuse the saved results of weeks that were already calculated from unchanged inputs
+            if self.use_report_data_cache:
+                week_fingerprint = self.get_week_fingerprint(
+                    week_counter, custom_weekly_matchups, week_fingerprint
+                )
+                week_fingerprints[week_counter] = week_fingerprint
+                if week_counter < week_for_report:
+                    week_results = self.load_week_results(
+                        week_counter, week_fingerprint
+                    )
+                    if week_results is not None:
+                        week_results_by_week[week_counter] = week_results
+
+        return (
+            week_results_by_week,
+            week_fingerprints,
+            season_score_statistics_by_week,
         )
 
     def create_pdf_report(self):
         logger.debug("Creating fantasy football report PDF.")
 
-        report_data = None
+        week_for_report = int(self.league.week_for_report)
+        weeks = list(range(1, week_for_report + 1))
 
-        week_for_report_ordered_team_names = []
-        week_for_report_ordered_managers = []
+        (
+            week_results_by_week,
+            week_fingerprints,
+            season_score_statistics_by_week,
+        ) = self.calculate_season_records(weeks)
 
-        time_series_points_data = []
-        time_series_efficiency_data = []
-        time_series_luck_data = []
-        time_series_power_rank_data = []
-        time_series_zscore_data = []
+        # calculate the metrics of the previous weeks without saved results (in parallel when configured), and then the
+        # metrics of the report week, for which the full report data is kept
+        calculated_weeks = [
+            week for week in weeks[:-1] if week not in week_results_by_week
+        ]
+        week_results_by_week.update(
+            self.calculate_week_results(
+                calculated_weeks, season_score_statistics_by_week
+            )
+        )
+        report_data = self.get_report_data(
+            week_for_report, season_score_statistics_by_week[week_for_report]
+        )
+        week_results_by_week[week_for_report] = self.get_week_results(
+            week_for_report, report_data
+        )
+        calculated_weeks.append(week_for_report)
 
-        season_total_optimal_points_data = {}
+        if self.use_report_data_cache:
+            for week in calculated_weeks:
+                self.save_week_results(
+                    week, week_fingerprints[week], week_results_by_week[week]
+                )
 
-        season_avg_points_by_position = defaultdict(list)
-        season_weekly_top_scorers = []
-        season_weekly_highest_ce = []
-        season_weekly_teams_results = []
+        season_time_series = self.add_season_report_data(
+            week_for_report, report_data, week_results_by_week
+        )
+        self.report_data = report_data
+
+        # generate pdf of report
+        file_for_upload = generate_report_pdf(
+            self.get_report_pdf_settings(week_for_report, report_data),
+            season_time_series,
+        )
 
-        week_counter = 1
-        while week_counter <= self.league.week_for_report:
+        logger.info("...SUCCESS! Generated PDF: {0}\n".format(file_for_upload))
 
-            week_for_report = self.league.week_for_report
-            metrics_calculator = CalculateMetrics(
-                self.config,
-                self.league_id,
-                self.league.num_playoff_slots,
-                self.playoff_prob_sims,
+        if self.save_report_trace:
+            save_instrumentation_trace(
+                os.path.splitext(file_for_upload)[0] + "_trace.json",
+                platform=self.platform,
+                league_id=self.league_id,
+                season=self.season,
+                week=self.league.week_for_report,
+                generated="{:%Y-%m-%d %H:%M:%S}".format(
+                    datetime.datetime.now()
+                ),
             )
+            stop_instrumentation()
+        logger.debug(
+            "\n\n\n"
+            "\n~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * "
+            "\n~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * END RUN ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * "
+            "\n~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * "
+            "\n\n\n"
+        )
 
-            custom_weekly_matchups = self.league.get_custom_weekly_matchups(
-                str(week_counter)
+        return file_for_upload
+
+    def create_backfill_pdf_reports(self):
+        """Generate the report of every week of the season through the week of the league data from the league data
+        retrieved once. Records and standings are built in a single pass over the season, the report data of every week
+        is calculated once instead of once for every later report, and the PDFs of the weeks are generated in up to
+        num_report_pdf_workers worker processes. Every report is the same as the report generated for its week on its
+        own, except for the data the platforms only provide as of the week of the league data (such as league median
+        standings and season totals of players).
+
+        :return: list of report pdf file paths in order of week
+        """
+        logger.debug("Creating fantasy football report PDFs for every week.")
+
+        begin = datetime.datetime.now()
+        week_for_report = int(self.league.week_for_report)
+        weeks = list(range(1, week_for_report + 1))
+
+        (
+            week_results_by_week,
+            week_fingerprints,
+            season_score_statistics_by_week,
+        ) = self.calculate_season_records(weeks)
+
+        # the results of a week in the reports of later weeks only differ from its results in its own report when
+        # coaching efficiency disqualifications are configured (which only apply to the report week), in which case
+        # they are calculated separately
+        calculated_weeks = [
+            week for week in weeks[:-1] if week not in week_results_by_week
+        ]
+        if self.config.get(
+            "Settings", "coaching_efficiency_disqualified_teams"
+        ):
+            week_results_by_week.update(
+                self.calculate_week_results(
+                    calculated_weeks, season_score_statistics_by_week
+                )
             )
+        calculated_weeks.append(week_for_report)
 
-            report_data = ReportData(
-                config=self.config,
-                league=self.league,
-                season_weekly_teams_results=season_weekly_teams_results,
-                week_counter=str(week_counter),
-                week_for_report=week_for_report,
-                season=self.season,
-                metrics_calculator=metrics_calculator,
-                metrics={
-                    "coaching_efficiency": CoachingEfficiency(
-                        self.config, self.league
-                    ),
-                    "luck": metrics_calculator.calculate_luck(
-                        week_counter, self.league, custom_weekly_matchups
-                    ),
-                    "records": metrics_calculator.calculate_records(
-                        week_counter, self.league, custom_weekly_matchups
-                    ),
-                    "playoff_probs": self.playoff_probs,
-                    "bad_boy_stats": self.bad_boy_stats,
-                    "beef_stats": self.beef_stats,
-                    "covid_risk": self.covid_risk,
-                },
-                break_ties=self.break_ties,
-                dq_ce=self.dq_ce,
-                testing=self.test,
-            )
-
-            for team_id, team_result in report_data.teams_results.items():
-                for (
-                    weekly_team_points_by_position
-                ) in report_data.data_for_weekly_points_by_position:
-                    if weekly_team_points_by_position[0] == team_id:
-                        season_avg_points_by_position[team_id].append(
-                            weekly_team_points_by_position[1]
-                        )
+        report_data_by_week = {}
+        report_week_results_by_week = {}
+        for week in weeks:
+            report_data_by_week[week] = self.get_report_data(
+                week,
+                season_score_statistics_by_week[week],
+                week_for_report=week,
+            )
+            report_week_results_by_week[week] = self.get_week_results(
+                week, report_data_by_week[week]
+            )
+            if week not in week_results_by_week:
+                week_results_by_week[week] = report_week_results_by_week[week]
 
-            top_scorer = {
-                "week": week_counter,
-                "team": report_data.data_for_scores[0][1],
-                "manager": report_data.data_for_scores[0][2],
-                "score": report_data.data_for_scores[0][3],
-            }
-            season_weekly_top_scorers.append(top_scorer)
+        if self.use_report_data_cache:
+            for week in calculated_weeks:
+                self.save_week_results(
+                    week, week_fingerprints[week], week_results_by_week[week]
+                )
 
-            highest_ce = {
-                "week": week_counter,
-                "team": report_data.data_for_coaching_efficiency[0][1],
-                "manager": report_data.data_for_coaching_efficiency[0][2],
-                "ce": report_data.data_for_coaching_efficiency[0][3],
+        # the season metrics of each report are calculated from the results of the weeks through its report week
+        report_pdf_args = []
+        for week in weeks:
+            season_week_results_by_week = {
+                previous_week: week_results_by_week[previous_week]
+                for previous_week in weeks[: week - 1]
             }
-            season_weekly_highest_ce.append(highest_ce)
-
-            season_weekly_teams_results.append(report_data.teams_results)
-
-            ordered_team_names = []
-            ordered_team_managers = []
-            weekly_points_data = []
-            weekly_coaching_efficiency_data = []
-            weekly_luck_data = []
-            weekly_optimal_points_data = []
-            weekly_z_score_data = []
-            weekly_power_rank_data = []
-
-            for team in report_data.data_for_teams:  # type: list
-                ordered_team_names.append(team[1])
-                ordered_team_managers.append(team[2])
-                weekly_points_data.append([int(week_counter), float(team[3])])
-                weekly_coaching_efficiency_data.append(
-                    [int(week_counter), team[4]]
+            season_week_results_by_week[week] = report_week_results_by_week[
+                week
+            ]
+            season_time_series = self.add_season_report_data(
+                week, report_data_by_week[week], season_week_results_by_week
+            )
+            report_pdf_args.append(
+                (
+                    self.get_report_pdf_settings(
+                        week, report_data_by_week[week]
+                    ),
+                    season_time_series,
+                )
+            )
+        self.report_data = report_data_by_week[week_for_report]
+
+        report_pdfs = self.generate_report_pdfs(report_pdf_args)
+
+        logger.info(
+            "...SUCCESS! Generated {0} PDFs for weeks 1-{1} in {2}:\n    {3}\n".format(
+                len(report_pdfs),
+                week_for_report,
+                str(datetime.datetime.now() - begin),
+                "\n    ".join(report_pdfs),
+            )
+        )
+
+        if self.save_report_trace:
+            save_instrumentation_trace(
+                os.path.join(
+                    os.path.dirname(report_pdfs[-1]),
+                    "weeks-1-{0}_backfill_trace.json".format(week_for_report),
+                ),
+                platform=self.platform,
+                league_id=self.league_id,
+                season=self.season,
+                weeks="1-{0}".format(week_for_report),
+                generated="{:%Y-%m-%d %H:%M:%S}".format(
+                    datetime.datetime.now()
+                ),
+            )
+            stop_instrumentation()
+
+        return report_pdfs
+
+    def add_season_report_data(
+        self, week_for_report, report_data: ReportData, week_results_by_week
+    ):
+        """Add the season metrics of the weeks through the report week (season averages, season totals, and weekly top
+        scorers) to the report data of the report week.
+
+        :param week_for_report: week of the report
+        :param report_data: ReportData of the report week
+        :param week_results_by_week: dict of weekly results of every week through the report week by week
+        :return: SeasonTimeSeries of the weeks through the report week
+        """
+        season_avg_points_by_position = defaultdict(list)
+        season_weekly_top_scorers = []
+        season_weekly_highest_ce = []
+        weeks = list(range(1, int(week_for_report) + 1))
+
+        # weekly metrics of every team are stored by team id in the order of the teams in the report week
+        week_for_report_data_for_teams = week_results_by_week[week_for_report][
+            "teams"
+        ]
+        season_time_series = SeasonTimeSeries(
+            [team[0] for team in week_for_report_data_for_teams],
+            [team[1] for team in week_for_report_data_for_teams],
+            weeks,
+        )
+
+        time_series_metric_columns = {
+            "points": 3,
+            "coaching_efficiency": 4,
+            "luck": 5,
+            "optimal_points": 6,
+            "z_score": 7,
+            "power_rank": 8,
+        }
+
+        for week_counter in weeks:
+            week_results = week_results_by_week[week_counter]
+
+            for team_id, team_points_by_position in week_results[
+                "weekly_points_by_position"
+            ]:
+                season_avg_points_by_position[team_id].append(
+                    team_points_by_position
                 )
-                weekly_luck_data.append([int(week_counter), float(team[5])])
-                weekly_optimal_points_data.append(
-                    [int(week_counter), team[1], float(team[6])]
+
+            season_weekly_top_scorers.append(week_results["top_scorer"])
+            season_weekly_highest_ce.append(week_results["highest_ce"])
+
+            for metric, column in time_series_metric_columns.items():
+                season_time_series.set_week_values(
+                    week_counter,
+                    metric,
+                    {team[0]: team[column] for team in week_results["teams"]},
                 )
-                weekly_z_score_data.append([int(week_counter), team[7]])
-                weekly_power_rank_data.append([int(week_counter), team[8]])
-
-            week_for_report_ordered_team_names = ordered_team_names
-            week_for_report_ordered_managers = ordered_team_managers
-
-            if week_counter == 1:
-                for team_points in weekly_points_data:
-                    time_series_points_data.append([team_points])
-                for team_efficiency in weekly_coaching_efficiency_data:
-                    time_series_efficiency_data.append([team_efficiency])
-                for team_luck in weekly_luck_data:
-                    time_series_luck_data.append([team_luck])
-                for team_optimal_points in weekly_optimal_points_data:
-                    season_total_optimal_points_data[
-                        team_optimal_points[1]
-                    ] = team_optimal_points[2]
-                for team_zscore in weekly_z_score_data:
-                    time_series_zscore_data.append([team_zscore])
-                for team_power_rank in weekly_power_rank_data:
-                    time_series_power_rank_data.append([team_power_rank])
-            else:
-                for index, team_points in enumerate(weekly_points_data):
-                    time_series_points_data[index].append(team_points)
-                for index, team_efficiency in enumerate(
-                    weekly_coaching_efficiency_data
-                ):
-                    if team_efficiency[1] != "DQ":
-                        time_series_efficiency_data[index].append(
-                            team_efficiency
-                        )
-                for index, team_luck in enumerate(weekly_luck_data):
-                    time_series_luck_data[index].append(team_luck)
-                for index, team_optimal_points in enumerate(
-                    weekly_optimal_points_data
-                ):
-                    season_total_optimal_points_data[
-                        team_optimal_points[1]
-                    ] += team_optimal_points[2]
-                for index, team_zscore in enumerate(weekly_z_score_data):
-                    time_series_zscore_data[index].append(team_zscore)
-                for index, team_power_rank in enumerate(
-                    weekly_power_rank_data
-                ):
-                    time_series_power_rank_data[index].append(team_power_rank)
-
-            week_counter += 1
 
         report_data.data_for_season_avg_points_by_position = (
             season_avg_points_by_position
@@ -397,18 +1041,18 @@ class FantasyFootballReport(object):
 
         # calculate season average metrics and then add columns for them to their respective metric table data
         season_average_calculator = SeasonAverageCalculator(
-            week_for_report_ordered_team_names, report_data, self.break_ties
+            season_time_series, report_data, self.break_ties
         )
 
         report_data.data_for_scores = season_average_calculator.get_average(
-            time_series_points_data,
+            "points",
             "data_for_scores",
             first_ties=report_data.num_first_place_for_score_before_resolution
             > 1,
         )
 
         report_data.data_for_coaching_efficiency = season_average_calculator.get_average(
-            time_series_efficiency_data,
+            "coaching_efficiency",
             "data_for_coaching_efficiency",
             with_percent=True,
             first_ties=(
@@ -423,13 +1067,13 @@ class FantasyFootballReport(object):
         )
 
         report_data.data_for_luck = season_average_calculator.get_average(
-            time_series_luck_data, "data_for_luck", with_percent=True
+            "luck", "data_for_luck", with_percent=True
         )
 
         # add weekly record to luck data
         for team_luck_data_entry in report_data.data_for_luck:
             for team in self.league.teams_by_week[
-                str(self.league.week_for_report)
+                str(week_for_report)
             ].values():  # type: BaseTeam
                 if team_luck_data_entry[1] == team.name:
                     team_luck_data_entry.append(
@@ -437,35 +1081,89 @@ class FantasyFootballReport(object):
                     )
 
         # add season total optimal points to optimal points data
+        season_total_optimal_points_by_team_name = dict(
+            zip(
+                season_time_series.team_names,
+                season_time_series.get_season_totals(
+                    "optimal_points"
+                ).tolist(),
+            )
+        )
         for (
             team_optimal_points_data_entry
         ) in report_data.data_for_optimal_scores:
-            for (
-                team_name,
-                season_total_optimal_points,
-            ) in season_total_optimal_points_data.items():
-                if team_optimal_points_data_entry[1] == team_name:
-                    team_optimal_points_data_entry.append(
-                        "{:.2f}".format(round(season_total_optimal_points, 2))
-                    )
+            season_total_optimal_points = (
+                season_total_optimal_points_by_team_name.get(
+                    team_optimal_points_data_entry[1]
+                )
+            )
+            if season_total_optimal_points is not None:
+                team_optimal_points_data_entry.append(
+                    "{:.2f}".format(round(season_total_optimal_points, 2))
+                )
 
         report_data.data_for_power_rankings = (
             season_average_calculator.get_average(
-                time_series_power_rank_data,
+                "power_rank",
                 "data_for_power_rankings",
                 reverse=False,
             )
         )
 
-        line_chart_data_list = [
-            week_for_report_ordered_team_names,
-            week_for_report_ordered_managers,
-            time_series_points_data,
-            time_series_efficiency_data,
-            time_series_luck_data,
-            time_series_zscore_data,
-            time_series_power_rank_data,
-        ]
+        # calculate playoff probabilities as of every completed regular season week in one batched run
+        if self.config.getboolean(
+            "Report", "report_time_series_charts"
+        ) and self.config.getboolean(
+            "Report", "report_playoff_probs_chart", fallback=False
+        ):
+            num_regular_season_weeks = int(
+                self.league.num_regular_season_weeks
+            )
+            completed_weeks = list(
+                range(
+                    1,
+                    min(
+                        int(week_for_report),
+                        num_regular_season_weeks,
+                    )
+                    + 1,
+                )
+            )
+            week_for_report_teams = self.league.teams_by_week[
+                str(week_for_report)
+            ]
+
+            begin = datetime.datetime.now()
+            logger.info(
+                "Calculating playoff probabilities for weeks 1-{0}...".format(
+                    completed_weeks[-1]
+                )
+            )
+            playoff_chances_by_week = self.playoff_probs.calculate_historical(
+                list(week_for_report_teams.values()),
+                {
+                    week: self.league.records_by_week[str(week)]
+                    for week in completed_weeks
+                },
+                {
+                    int(week): [
+                        tuple(team.team_id for team in matchup.teams)
+                        for matchup in matchups
+                    ]
+                    for week, matchups in self.league.matchups_by_week.items()
+                    if int(week) <= num_regular_season_weeks
+                },
+            )
+            logger.info(
+                "...calculated playoff probabilities for weeks 1-{0} in {1}\n".format(
+                    completed_weeks[-1], str(datetime.datetime.now() - begin)
+                )
+            )
+
+            for week in completed_weeks:
+                season_time_series.set_week_values(
+                    week, "playoff_probs", playoff_chances_by_week[week]
+                )
 
         # calculate season average points by position and add them to the report_data
         report_data.data_for_season_avg_points_by_position = (
@@ -474,12 +1172,23 @@ class FantasyFootballReport(object):
             )
         )
 
+        return season_time_series
+
+    def get_report_pdf_settings(
+        self, week_for_report, report_data: ReportData
+    ):
+        """Get the file path of the report PDF of a week and the settings of its PDF generator.
+
+        :param week_for_report: week of the report
+        :param report_data: ReportData of the report week with its season metrics
+        :return: dict of the report pdf file path and PdfGenerator keyword arguments
+        """
         filename = (
             self.league.name.replace(" ", "-")
             + "("
             + str(self.league_id)
             + ")_week-"
-            + str(self.league.week_for_report)
+            + str(week_for_report)
             + "_report.pdf"
         )
         report_save_dir = os.path.join(
@@ -492,7 +1201,7 @@ class FantasyFootballReport(object):
             + " ("
             + str(self.league_id)
             + ") Week "
-            + str(self.league.week_for_report)
+            + str(week_for_report)
             + " Report"
         )
         report_footer_text = (
@@ -520,32 +1229,84 @@ class FantasyFootballReport(object):
         else:
             filename_with_path = os.path.join(
                 self.config.get("Configuration", "output_dir"),
-                "test_report.pdf",
+                "test_report.pdf"
+                if int(week_for_report) == int(self.league.week_for_report)
+                else "test_report_week-{0}.pdf".format(week_for_report),
             )
 
-        # instantiate pdf generator
-        pdf_generator = PdfGenerator(
-            config=self.config,
-            season=self.season,
-            league=self.league,
-            playoff_prob_sims=self.playoff_prob_sims,
-            report_title_text=report_title_text,
-            report_footer_text=report_footer_text,
-            report_data=report_data,
-        )
+        # the PDF generator gets the report week from the league data, which is shared by the reports of every week
+        league = self.league
+        if int(week_for_report) != int(self.league.week_for_report):
+            league = copy(self.league)
+            league.week_for_report = week_for_report
 
-        # generate pdf of report
-        file_for_upload = pdf_generator.generate_pdf(
-            filename_with_path, line_chart_data_list
-        )
+        return {
+            "file_path": filename_with_path,
+            "pdf_generator_kwargs": {
+                "config": self.config,
+                "season": self.season,
+                "league": league,
+                "playoff_prob_sims": self.playoff_prob_sims,
+                "report_title_text": report_title_text,
+                "report_footer_text": report_footer_text,
+                "report_data": report_data,
+            },
+        }
 
-        logger.info("...SUCCESS! Generated PDF: {0}\n".format(file_for_upload))
-        logger.debug(
-            "\n\n\n"
-            "\n~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * "
-            "\n~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * END RUN ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * "
-            "\n~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * ~ * "
-            "\n\n\n"
+    def generate_report_pdfs(self, report_pdf_args):
+        """Generate report PDFs that do not depend on each other. When more than one report PDF worker is configured,
+        the PDFs are generated in a process pool.
+
+        :param report_pdf_args: list of tuples of the report pdf settings and SeasonTimeSeries of each report
+        :return: list of report pdf file paths
+        """
+        num_workers = max(
+            1,
+            min(
+                self.config.getint(
+                    "Settings", "num_report_pdf_workers", fallback=1
+                ),
+                len(report_pdf_args),
+            ),
         )
+        if num_workers > 1:
+            begin = datetime.datetime.now()
+            logger.info(
+                "Generating {0} report PDFs across {1} worker processes...".format(
+                    len(report_pdf_args), num_workers
+                )
+            )
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=num_workers,
+                    initializer=init_report_pdf_worker,
+                    initargs=(self.save_report_trace,),
+                ) as executor:
+                    report_pdfs_with_events = list(
+                        executor.map(
+                            generate_report_pdf_in_worker,
+                            *zip(*report_pdf_args)
+                        )
+                    )
+                logger.info(
+                    "...generated {0} report PDFs in {1}\n".format(
+                        len(report_pdf_args),
+                        str(datetime.datetime.now() - begin),
+                    )
+                )
+                report_pdfs = []
+                for report_pdf, events in report_pdfs_with_events:
+                    report_pdfs.append(report_pdf)
+                    add_instrumentation_events(events)
+                return report_pdfs
+            except Exception as e:
+                logger.warning(
+                    "Unable to generate report PDFs in worker processes ({0}), generating them in order instead.".format(
+                        e
+                    )
+                )
 
-        return file_for_upload
+        return [
+            generate_report_pdf(report_pdf_settings, season_time_series)
+            for report_pdf_settings, season_time_series in report_pdf_args
+        ]
@@ -1,11 +1,12 @@
 __author__ = "Wren J. R. (uberfastman)"
 __email__ = "wrenjr@yahoo.com"
 
-import itertools
-
+from calculate.metric_ranks import get_num_first_place
 from calculate.metrics import CalculateMetrics
 from calculate.points_by_position import PointsByPosition
+from calculate.score_statistics import SeasonScoreStatistics
 from dao.base import BaseLeague, BaseMatchup, BaseTeam
+from report.sections import ReportSections
 from utils.report_tools import (
     add_report_team_stats,
     get_player_game_time_statuses,
@@ -20,12 +21,13 @@ class ReportData(object):
         self,
         config,
         league: BaseLeague,
-        season_weekly_teams_results,
+        season_score_statistics: SeasonScoreStatistics,
         week_counter,
         week_for_report,
         season,
         metrics_calculator: CalculateMetrics,
         metrics,
+        report_sections: ReportSections,
         break_ties=False,
         dq_ce=False,
         testing=False,
@@ -58,7 +60,7 @@ class ReportData(object):
 
         self.teams_results = {
             team.team_id: add_report_team_stats(
-                config,
+                report_sections,
                 team,
                 league,
                 week_counter,
@@ -67,6 +69,8 @@ class ReportData(object):
                 metrics,
                 dq_ce,
                 inactive_players,
+                # bad boy, beef, and COVID-19 risk rankings are only included for the report week
+                add_player_stats=int(week_counter) == int(week_for_report),
             )
             for team in league.teams_by_week.get(str(week_counter)).values()
         }
@@ -114,9 +118,18 @@ class ReportData(object):
                     remaining_matchups[int(week)].append(tuple(matchup_teams))
 
         # calculate z-scores (dependent on all previous weeks scores)
-        z_score_results = metrics_calculator.calculate_z_scores(
-            season_weekly_teams_results + [self.teams_results]
-        )
+        if report_sections.is_required("z_scores"):
+            z_score_results = metrics_calculator.calculate_z_scores(
+                season_score_statistics,
+                {
+                    team_id: team_result.points
+                    for team_id, team_result in self.teams_results.items()
+                },
+            )
+        else:
+            z_score_results = {
+                team_id: None for team_id in self.teams_results.keys()
+            }
 
         # ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~
         # ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ REPORT DATA ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~
@@ -138,19 +151,60 @@ class ReportData(object):
         self.data_for_current_division_standings = None
         if self.has_divisions:
             self.divisions = league.divisions
-            self.data_for_current_division_standings = (
-                metrics_calculator.get_division_standings_data(league)
-            )
+            if report_sections.is_required("division_standings"):
+                self.data_for_current_division_standings = (
+                    metrics_calculator.get_division_standings_data(league)
+                )
 
         # current median standings data
-        self.data_for_current_median_standings = (
-            metrics_calculator.get_median_standings_data(league)
-        )
+        self.data_for_current_median_standings = None
+        if report_sections.is_required("median_standings"):
+            self.data_for_current_median_standings = (
+                metrics_calculator.get_median_standings_data(league)
+            )
 
         # playoff probabilities data
-        self.data_for_playoff_probs = metrics.get("playoff_probs").calculate(
-            week_counter, week_for_report, league.standings, remaining_matchups
-        )
+        self.data_for_playoff_probs = None
+        if report_sections.is_required("playoff_probs"):
+            self.data_for_playoff_probs = metrics.get(
+                "playoff_probs"
+            ).calculate(
+                week_counter,
+                week_for_report,
+                league.standings,
+                remaining_matchups,
+            )
+        self.playoff_probs_simulations = metrics.get(
+            "playoff_probs"
+        ).simulations_run
+        self.playoff_probs_exact = metrics.get("playoff_probs").is_exact
+        self.playoff_probs_effective_sample_size = metrics.get(
+            "playoff_probs"
+        ).effective_sample_size
+        self.playoff_probs_antithetic = metrics.get("playoff_probs").antithetic
+        self.playoff_probs_precision = metrics.get("playoff_probs").precision
+        self.playoff_probs_confidence = metrics.get("playoff_probs").confidence
+        self.playoff_probs_clinch_statuses = metrics.get(
+            "playoff_probs"
+        ).clinch_statuses
+
+        # playoff scenarios data
+        self.data_for_playoff_scenarios = None
+        if (
+            self.data_for_playoff_probs
+            and remaining_matchups
+            and report_sections.is_required("playoff_scenarios")
+        ):
+            self.data_for_playoff_scenarios = (
+                metrics_calculator.get_playoff_scenarios_data(
+                    league.standings,
+                    self.data_for_playoff_probs,
+                    metrics.get("playoff_probs").calculate_next_week_scenarios(
+                        league.standings, remaining_matchups
+                    ),
+                )
+            )
+
         if self.data_for_playoff_probs:
             self.data_for_playoff_probs = (
                 metrics_calculator.get_playoff_probs_data(
@@ -195,12 +249,14 @@ class ReportData(object):
                 z_score_rank += 1
 
         # points by position data
-        points_by_position = PointsByPosition(league, week_for_report)
-        self.data_for_weekly_points_by_position = (
-            points_by_position.get_weekly_points_by_position(
-                self.teams_results
+        self.data_for_weekly_points_by_position = []
+        if report_sections.is_required("points_by_position"):
+            points_by_position = PointsByPosition(league, week_for_report)
+            self.data_for_weekly_points_by_position = (
+                points_by_position.get_weekly_points_by_position(
+                    self.teams_results
+                )
             )
-        )
 
         # teams data and season average points by position data
         self.data_for_teams = []
@@ -269,33 +325,43 @@ class ReportData(object):
         )
 
         # bad boy data
-        self.data_for_bad_boy_rankings = metrics_calculator.get_bad_boy_data(
-            sorted(
-                self.teams_results.values(),
-                key=lambda x: x.bad_boy_points,
-                reverse=True,
+        self.data_for_bad_boy_rankings = []
+        if report_sections.is_required("bad_boy_stats"):
+            self.data_for_bad_boy_rankings = (
+                metrics_calculator.get_bad_boy_data(
+                    sorted(
+                        self.teams_results.values(),
+                        key=lambda x: x.bad_boy_points,
+                        reverse=True,
+                    )
+                )
             )
-        )
 
         # beef rank data
-        self.data_for_beef_rankings = metrics_calculator.get_beef_rank_data(
-            sorted(
-                self.teams_results.values(),
-                key=lambda x: x.tabbu,
-                reverse=True,
+        self.data_for_beef_rankings = []
+        if report_sections.is_required("beef_stats"):
+            self.data_for_beef_rankings = (
+                metrics_calculator.get_beef_rank_data(
+                    sorted(
+                        self.teams_results.values(),
+                        key=lambda x: x.tabbu,
+                        reverse=True,
+                    )
+                )
             )
-        )
 
         # covid risk data
-        self.data_for_covid_risk_rankings = (
-            metrics_calculator.get_covid_risk_rank_data(
-                sorted(
-                    self.teams_results.values(),
-                    key=lambda x: str(x.name).lower(),
-                    reverse=True,
+        self.data_for_covid_risk_rankings = []
+        if report_sections.is_required("covid_risk"):
+            self.data_for_covid_risk_rankings = (
+                metrics_calculator.get_covid_risk_rank_data(
+                    sorted(
+                        self.teams_results.values(),
+                        key=lambda x: str(x.name).lower(),
+                        reverse=True,
+                    )
                 )
             )
-        )
 
         # ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~
         # ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ COUNT METRIC TIES ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~
@@ -306,13 +372,8 @@ class ReportData(object):
         self.ties_for_scores = metrics_calculator.get_ties_count(
             self.data_for_scores, "score", self.break_ties
         )
-        self.num_first_place_for_score_before_resolution = len(
-            [
-                list(group)
-                for key, group in itertools.groupby(
-                    self.data_for_scores, lambda x: x[3]
-                )
-            ][0]
+        self.num_first_place_for_score_before_resolution = get_num_first_place(
+            self.data_for_scores, 3
         )
 
         # reorder score data based on bench points if there are ties and break_ties = True
@@ -320,16 +381,8 @@ class ReportData(object):
             self.data_for_scores = metrics_calculator.resolve_score_ties(
                 self.data_for_scores, self.break_ties
             )
-            metrics_calculator.get_ties_count(
-                self.data_for_scores, "score", self.break_ties
-            )
-        self.num_first_place_for_score = len(
-            [
-                list(group)
-                for key, group in itertools.groupby(
-                    self.data_for_scores, lambda x: x[3]
-                )
-            ][0]
+        self.num_first_place_for_score = get_num_first_place(
+            self.data_for_scores, 3
         )
 
         # get number of coaching efficiency ties and ties for first
@@ -338,16 +391,16 @@ class ReportData(object):
             "coaching_efficiency",
             self.break_ties,
         )
-        self.num_first_place_for_coaching_efficiency_before_resolution = len(
-            [
-                list(group)
-                for key, group in itertools.groupby(
-                    self.data_for_coaching_efficiency, lambda x: x[0]
-                )
-            ][0]
+        self.num_first_place_for_coaching_efficiency_before_resolution = (
+            get_num_first_place(self.data_for_coaching_efficiency, 0)
         )
 
-        if self.ties_for_coaching_efficiency > 0:
+        # coaching efficiency tiebreakers look up the weekly player data of the tied teams, so they are only resolved
+        # when the coaching efficiency ranks after tiebreakers are included in the report
+        if (
+            self.ties_for_coaching_efficiency > 0
+            and report_sections.is_required("coaching_efficiency_ties")
+        ):
             self.data_for_coaching_efficiency = (
                 metrics_calculator.resolve_coaching_efficiency_ties(
                     self.data_for_coaching_efficiency,
@@ -359,59 +412,45 @@ class ReportData(object):
                     self.break_ties,
                 )
             )
-        self.num_first_place_for_coaching_efficiency = len(
-            [
-                list(group)
-                for key, group in itertools.groupby(
-                    self.data_for_coaching_efficiency, lambda x: x[0]
-                )
-            ][0]
+        self.num_first_place_for_coaching_efficiency = get_num_first_place(
+            self.data_for_coaching_efficiency, 0
         )
 
         # get number of luck ties and ties for first
         self.ties_for_luck = metrics_calculator.get_ties_count(
             self.data_for_luck, "luck", self.break_ties
         )
-        self.num_first_place_for_luck = len(
-            [
-                list(group)
-                for key, group in itertools.groupby(
-                    self.data_for_luck, lambda x: x[3]
-                )
-            ][0]
+        self.num_first_place_for_luck = get_num_first_place(
+            self.data_for_luck, 3
         )
 
         # get number of bad boy rankings ties and ties for first
-        self.ties_for_bad_boy_rankings = metrics_calculator.get_ties_count(
-            self.data_for_bad_boy_rankings, "bad_boy", self.break_ties
-        )
-        self.num_first_place_for_bad_boy_rankings = len(
-            [
-                list(group)
-                for key, group in itertools.groupby(
-                    self.data_for_bad_boy_rankings, lambda x: x[3]
-                )
-            ][0]
-        )
-        # filter out teams that have no bad boys in their starting lineup
-        self.data_for_bad_boy_rankings = [
-            result
-            for result in self.data_for_bad_boy_rankings
-            if int(result[5]) != 0
-        ]
+        self.ties_for_bad_boy_rankings = 0
+        self.num_first_place_for_bad_boy_rankings = 0
+        if self.data_for_bad_boy_rankings:
+            self.ties_for_bad_boy_rankings = metrics_calculator.get_ties_count(
+                self.data_for_bad_boy_rankings, "bad_boy", self.break_ties
+            )
+            self.num_first_place_for_bad_boy_rankings = get_num_first_place(
+                self.data_for_bad_boy_rankings, 3
+            )
+            # filter out teams that have no bad boys in their starting lineup
+            self.data_for_bad_boy_rankings = [
+                result
+                for result in self.data_for_bad_boy_rankings
+                if int(result[5]) != 0
+            ]
 
         # get number of beef rankings ties and ties for first
-        self.ties_for_beef_rankings = metrics_calculator.get_ties_count(
-            self.data_for_beef_rankings, "beef", self.break_ties
-        )
-        self.num_first_place_for_beef_rankings = len(
-            [
-                list(group)
-                for key, group in itertools.groupby(
-                    self.data_for_beef_rankings, lambda x: x[3]
-                )
-            ][0]
-        )
+        self.ties_for_beef_rankings = 0
+        self.num_first_place_for_beef_rankings = 0
+        if self.data_for_beef_rankings:
+            self.ties_for_beef_rankings = metrics_calculator.get_ties_count(
+                self.data_for_beef_rankings, "beef", self.break_ties
+            )
+            self.num_first_place_for_beef_rankings = get_num_first_place(
+                self.data_for_beef_rankings, 3
+            )
 
         # ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~
         # ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ CALCULATE POWER RANKING ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~
@@ -419,20 +458,22 @@ class ReportData(object):
         logger.debug("Calculating power rankings.")
 
         # calculate power ranking last to account for metric rankings that have been reordered due to tiebreakers
-        power_ranking_results = metrics_calculator.calculate_power_rankings(
-            self.teams_results,
-            self.data_for_scores,
-            self.data_for_coaching_efficiency,
-            self.data_for_luck,
-        )
+        power_ranking_results = {}
+        if report_sections.is_required("power_rankings"):
+            power_ranking_results = (
+                metrics_calculator.calculate_power_rankings(
+                    self.teams_results,
+                    self.data_for_scores,
+                    self.data_for_coaching_efficiency,
+                    self.data_for_luck,
+                )
+            )
 
-        # update data_for_teams with power rankings
+        # update data_for_teams with power rankings (None when power rankings are not included in the report)
         for team in self.data_for_teams:
-            for team_id in power_ranking_results.keys():
-                if team[0] == team_id:
-                    team.append(
-                        power_ranking_results[team_id]["power_ranking"]
-                    )
+            team.append(
+                power_ranking_results.get(team[0], {}).get("power_ranking")
+            )
 
         # power rankings data
         self.data_for_power_rankings = []
@@ -449,17 +490,15 @@ class ReportData(object):
             )
 
         # get number of power rankings ties and ties for first
-        self.ties_for_power_rankings = metrics_calculator.get_ties_count(
-            self.data_for_power_rankings, "power_ranking", self.break_ties
-        )
-        self.ties_for_first_for_power_rankings = len(
-            [
-                list(group)
-                for key, group in itertools.groupby(
-                    self.data_for_power_rankings, lambda x: x[0]
-                )
-            ][0]
-        )
+        self.ties_for_power_rankings = 0
+        self.ties_for_first_for_power_rankings = 0
+        if self.data_for_power_rankings:
+            self.ties_for_power_rankings = metrics_calculator.get_ties_count(
+                self.data_for_power_rankings, "power_ranking", self.break_ties
+            )
+            self.ties_for_first_for_power_rankings = get_num_first_place(
+                self.data_for_power_rankings, 0
+            )
 
         # ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~
         # ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ LOGGER OUTPUT ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~
@@ -0,0 +1,265 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "wrenjr@yahoo.com"
+
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from urllib3 import connectionpool
+
+from report.logger import get_logger
+
+try:
+    import resource
+except ImportError:
+    # the resource module is only available on Unix
+    resource = None
+
+logger = get_logger(__name__, propagate=False)
+
+# instrumentation of the report being generated in this process (each worker process has its own)
+instrumentation_enabled = False
+instrumentation_lock = threading.Lock()
+instrumentation_events = []
+# stack of the open spans of each thread, so that HTTP calls are counted for the spans of the thread that made them
+instrumentation_thread_state = threading.local()
+original_urlopen = None
+
+
+def get_max_rss_mb():
+    """Get the peak resident memory of the process so far in MB (None if it is not available on the platform)."""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # maximum resident set size is in bytes on macOS and in kilobytes on Linux
+    return round(
+        max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1
+    )
+
+
+def get_open_spans():
+    if not hasattr(instrumentation_thread_state, "spans"):
+        instrumentation_thread_state.spans = []
+    return instrumentation_thread_state.spans
+
+
+def record_http_call(num_bytes=0):
+    """Count an HTTP call (and the bytes of its response) for every open span of the current thread.
+
+    :param num_bytes: number of bytes of the response body
+    """
+    for span in get_open_spans():
+        span.http_calls += 1
+        span.http_bytes += num_bytes
+
+
+def record_http_bytes(num_bytes):
+    """Count bytes of a response body read by the current thread for every open span of the thread.
+
+    :param num_bytes: number of bytes read
+    """
+    for span in get_open_spans():
+        span.http_bytes += num_bytes
+
+
+def count_read_bytes(read):
+    @functools.wraps(read)
+    def wrapper(*args, **kwargs):
+        data = read(*args, **kwargs)
+        if instrumentation_enabled and data:
+            record_http_bytes(len(data))
+        return data
+
+    return wrapper
+
+
+def count_read_chunked_bytes(read_chunked):
+    @functools.wraps(read_chunked)
+    def wrapper(*args, **kwargs):
+        for chunk in read_chunked(*args, **kwargs):
+            if instrumentation_enabled and chunk:
+                record_http_bytes(len(chunk))
+            yield chunk
+
+    return wrapper
+
+
+def instrumented_urlopen(self, *args, **kwargs):
+    """Count an HTTP call made through urllib3 and the bytes of its response body as they are read, so that chunked
+    responses and responses without a Content-Length header are counted too.
+    """
+    response = original_urlopen(self, *args, **kwargs)
+    if instrumentation_enabled:
+        record_http_call()
+        # responses of redirects are returned by the nested call that made them, which already counts their bytes
+        if not getattr(response, "instrumented", False):
+            response.instrumented = True
+            if kwargs.get("preload_content", True):
+                # the body was already read
+                record_http_bytes(len(response.data or b""))
+            else:
+                response.read = count_read_bytes(response.read)
+                response.read_chunked = count_read_chunked_bytes(
+                    response.read_chunked
+                )
+    return response
+
+
+def start_instrumentation():
+    """Discard the events of any previous report and start recording the spans of a new one. HTTP calls made through
+    urllib3 (used by requests for every platform API and web source) are counted from then on.
+    """
+    global instrumentation_enabled, original_urlopen
+
+    with instrumentation_lock:
+        instrumentation_enabled = True
+        del instrumentation_events[:]
+
+        if original_urlopen is None:
+            original_urlopen = connectionpool.HTTPConnectionPool.urlopen
+            connectionpool.HTTPConnectionPool.urlopen = instrumented_urlopen
+
+
+def stop_instrumentation():
+    global instrumentation_enabled
+    instrumentation_enabled = False
+
+
+def pop_instrumentation_events():
+    """Get and discard the recorded events (used to send the events of a worker process back to the main process).
+
+    :return: list of trace event dicts
+    """
+    with instrumentation_lock:
+        events = list(instrumentation_events)
+        del instrumentation_events[:]
+    return events
+
+
+def add_instrumentation_events(events):
+    with instrumentation_lock:
+        instrumentation_events.extend(events)
+
+
+class InstrumentationSpan(object):
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+        self.http_calls = 0
+        self.http_bytes = 0
+
+        self.begin = time.perf_counter()
+        self.begin_cpu = time.thread_time()
+        self.begin_max_rss_mb = get_max_rss_mb()
+
+    def get_event(self):
+        """Get the span as a complete event of the Chrome trace event format (times in microseconds)."""
+        end = time.perf_counter()
+        max_rss_mb = get_max_rss_mb()
+        return {
+            "name": self.name,
+            "cat": self.category,
+            "ph": "X",
+            "ts": round(self.begin * 1e6),
+            "dur": round((end - self.begin) * 1e6),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": dict(
+                self.args,
+                wall_seconds=round(end - self.begin, 6),
+                cpu_seconds=round(time.thread_time() - self.begin_cpu, 6),
+                max_rss_mb=max_rss_mb,
+                max_rss_increase_mb=round(
+                    max_rss_mb - self.begin_max_rss_mb, 1
+                )
+                if max_rss_mb is not None
+                else None,
+                http_calls=self.http_calls,
+                http_bytes=self.http_bytes,
+            ),
+        }
+
+
+@contextmanager
+def instrument(name, category="stage", **args):
+    """Record the wall time, CPU time of the thread, peak memory of the process, and HTTP calls and bytes of a block of
+    code when instrumentation is enabled.
+
+    :param name: name of the span
+    :param category: category of the span (such as "stage", "metric", or "pdf")
+    :param args: additional values to record with the span (such as the week)
+    """
+    if not instrumentation_enabled:
+        yield
+        return
+
+    span = InstrumentationSpan(name, category, args)
+    open_spans = get_open_spans()
+    open_spans.append(span)
+    try:
+        yield
+    finally:
+        open_spans.remove(span)
+        if instrumentation_enabled:
+            add_instrumentation_events([span.get_event()])
+
+
+def instrumented(name=None, category="metric", arg_names=()):
+    """Decorator that records every call of a function with instrument.
+
+    :param name: name of the spans (defaults to the qualified name of the function)
+    :param category: category of the spans
+    :param arg_names: names of arguments of the function whose values are recorded with the spans
+    """
+
+    def decorator(function):
+        span_name = name if name else function.__qualname__
+        signature = inspect.signature(function) if arg_names else None
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not instrumentation_enabled:
+                return function(*args, **kwargs)
+
+            span_args = {}
+            if signature:
+                bound_args = signature.bind(*args, **kwargs).arguments
+                span_args = {
+                    arg_name: str(bound_args.get(arg_name))
+                    for arg_name in arg_names
+                }
+            with instrument(span_name, category, **span_args):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def save_instrumentation_trace(trace_file_path, **metadata):
+    """Save the recorded events to a Chrome trace event format JSON file, which can be loaded in chrome://tracing or
+    https://ui.perfetto.dev, or read as JSON to compare runs.
+
+    :param trace_file_path: system file path of the trace file
+    :param metadata: values that describe the run (such as the league and week)
+    """
+    events = sorted(pop_instrumentation_events(), key=lambda x: x["ts"])
+    with open(trace_file_path, "w", encoding="utf-8") as trace_out:
+        json.dump(
+            {
+                "traceEvents": events,
+                "displayTimeUnit": "ms",
+                "otherData": metadata,
+            },
+            trace_out,
+            ensure_ascii=False,
+            indent=1,
+        )
+    logger.info("Saved report trace to {0}".format(trace_file_path))
@@ -5,10 +5,12 @@ import json
 import logging
 import os
 import sys
+import urllib.parse
 import urllib.request
 from copy import deepcopy
 from urllib.error import URLError
 
+import numpy as np
 from PIL import Image
 from PIL import ImageFile
 from reportlab.graphics.shapes import Line, Drawing
@@ -27,8 +29,16 @@ from reportlab.platypus import Spacer
 from reportlab.platypus.flowables import Image as ReportLabImage
 from reportlab.platypus.flowables import KeepTogether
 
-from dao.base import BaseLeague, BaseTeam, BasePlayer
+from calculate.season_time_series import SeasonTimeSeries
+from dao.base import (
+    get_nfl_data_dir,
+    get_saved_nfl_data_path,
+    BaseLeague,
+    BaseTeam,
+    BasePlayer,
+)
 from report.data import ReportData
+from report.instrumentation import instrument, instrumented, record_http_call
 from report.logger import get_logger
 from report.pdf.charts.bar import HorizontalBarChart3DGenerator
 from report.pdf.charts.line import LineChartGenerator
@@ -41,6 +51,10 @@ logger = get_logger(__name__, propagate=False)
 # suppress verbose PIL debug logging
 logging.getLogger("PIL.PngImagePlugin").setLevel(level=logging.INFO)
 
+# sizes of the player headshots that have already been loaded, kept for the later reports of the same process (such as
+# the reports generated by the report service)
+player_image_sizes = {}
+
 
 def get_player_image(
     url,
@@ -50,21 +64,46 @@ def get_player_image(
     width=1.0 * inch,
     player_name=None,
     dev_offline=False,
+    league_data_dir=None,
 ):
     headshots_dir = os.path.join(
         data_dir, "week_" + str(week), "player_headshots"
     )
 
-    if not os.path.exists(headshots_dir):
-        os.makedirs(headshots_dir)
-
     if url:
+        # headshots from different platforms can have the same file name, so they are saved separately by host
+        headshots_dir = os.path.join(
+            headshots_dir, urllib.parse.urlparse(url).netloc
+        )
+        os.makedirs(headshots_dir, exist_ok=True)
+
         img_name = url.split("/")[-1]
         local_img_path = os.path.join(headshots_dir, img_name)
         local_img_jpg_path = os.path.join(
             headshots_dir, img_name.split(".")[0] + ".jpg"
         )
 
+        if league_data_dir:
+            # headshots used to be saved in the data directory of each league, so use them when running offline
+            league_headshots_dir = os.path.join(
+                league_data_dir, "week_" + str(week), "player_headshots"
+            )
+            local_img_path = get_saved_nfl_data_path(
+                local_img_path,
+                [os.path.join(league_headshots_dir, img_name)],
+                dev_offline,
+            )
+            local_img_jpg_path = get_saved_nfl_data_path(
+                local_img_jpg_path,
+                [
+                    os.path.join(
+                        league_headshots_dir,
+                        img_name.split(".")[0] + ".jpg",
+                    )
+                ],
+                dev_offline,
+            )
+
         if not os.path.exists(local_img_jpg_path):
             if not os.path.exists(local_img_path):
                 if not dev_offline:
@@ -74,7 +113,14 @@ def get_player_image(
                         )
                     )
                     try:
-                        urllib.request.urlretrieve(url, local_img_path)
+                        # headshots are shared by all leagues, so download to a temporary file first to keep
+                        # concurrent report runs from loading a partially downloaded image
+                        temp_img_path = "{0}.{1}.tmp".format(
+                            local_img_path, os.getpid()
+                        )
+                        urllib.request.urlretrieve(url, temp_img_path)
+                        record_http_call(os.path.getsize(temp_img_path))
+                        os.replace(temp_img_path, local_img_path)
                     except URLError:
                         logger.error(
                             "Unable to retrieve player headshot{0} at url {1}".format(
@@ -118,8 +164,11 @@ def get_player_image(
         img_name = "photo-not-available.jpg"
         local_img_path = os.path.join("resources", "images", img_name)
 
-    img_reader = ImageReader(local_img_path)
-    iw, ih = img_reader.getSize()
+    if local_img_path not in player_image_sizes:
+        player_image_sizes[local_img_path] = ImageReader(
+            local_img_path
+        ).getSize()
+    iw, ih = player_image_sizes[local_img_path]
     aspect = ih / float(iw)
 
     ImageFile.LOAD_TRUNCATED_IMAGES = True
@@ -196,7 +245,8 @@ class PdfGenerator(object):
         self.playoff_slots = int(league.num_playoff_slots)
         self.num_regular_season_weeks = int(league.num_regular_season_weeks)
         self.week_for_report = league.week_for_report
-        self.data_dir = os.path.join(
+        self.nfl_data_dir = get_nfl_data_dir(league.data_dir, league.season)
+        self.league_data_dir = os.path.join(
             league.data_dir, str(league.season), league.league_id
         )
         self.break_ties = report_data.break_ties
@@ -206,6 +256,16 @@ class PdfGenerator(object):
         )
 
         # table column widths
+        # .........................Team.......Manager....Opponent...Col 4......Col 5......Col 6.....
+        self.widths_06_cols_no_4 = [
+            1.85 * inch,
+            1.50 * inch,
+            1.85 * inch,
+            0.85 * inch,
+            0.85 * inch,
+            0.85 * inch,
+        ]  # 7.75
+
         # .........................Place/Rank..Team.......Manager....Col 4.....
         self.widths_04_cols_no_1 = [
             1.00 * inch,
@@ -637,6 +697,16 @@ class PdfGenerator(object):
         self.playoff_probs_headers = [
             ["Team", "Manager", "Record", "Playoffs", "Needed"] + ordinal_list
         ]
+        self.playoff_scenarios_headers = [
+            [
+                "Team",
+                "Manager",
+                "Opponent",
+                "Playoffs",
+                "With Win",
+                "With Loss",
+            ]
+        ]
         self.power_ranking_headers = [
             ["Power Rank", "Team", "Manager", "Season Avg. (Place)"]
         ]
@@ -954,6 +1024,7 @@ class PdfGenerator(object):
 
         return TableStyle(tied_values_table_style_list)
 
+    @instrumented(category="pdf", arg_names=("title_text",))
     def create_section(
         self,
         title_text,
@@ -1324,10 +1395,11 @@ class PdfGenerator(object):
             table.setStyle(self.style)
         return table
 
+    @instrumented(category="pdf", arg_names=("chart_title",))
     def create_line_chart(
         self,
-        data,
-        data_length,
+        values,
+        weeks,
         series_names,
         chart_title,
         x_axis_title,
@@ -1364,21 +1436,32 @@ class PdfGenerator(object):
         chart_width = 490
         chart_height = 150
 
-        # fit y-axis of table
-        values = [
-            weeks[1] if weeks[1] != "DQ" else 0.0
-            for teams in data
-            for weeks in teams
+        # chart points of every team (series) by week, leaving out weeks without a value (NaN)
+        data = [
+            [
+                [week, float(value)]
+                for week, value in zip(weeks, team_values.tolist())
+                if not np.isnan(value)
+            ]
+            for team_values in values
+        ]
+        # chart series cannot be empty, so teams without any values (such as teams disqualified from coaching efficiency
+        # every week) are shown at zero in the first week
+        data = [
+            team_data if team_data else [[weeks[0], 0.0]] for team_data in data
         ]
-        values_min = min(values)
-        values_max = max(values)
+
+        # fit y-axis of table
+        chart_values = [value for team_data in data for _, value in team_data]
+        values_min = min(chart_values)
+        values_max = max(chart_values)
 
         points_line_chart = LineChartGenerator(
             data,
             self.font,
             self.font_bold,
             chart_title,
-            [x_axis_title, 0, data_length + 1, 1],
+            [x_axis_title, 0, len(weeks) + 1, 1],
             [y_axis_title, values_min, values_max, y_step],
             series_names,
             series_colors,
@@ -1427,6 +1510,7 @@ class PdfGenerator(object):
 
         return image
 
+    @instrumented(category="pdf")
     def create_team_stats_pages(
         self,
         doc_elements,
@@ -1680,21 +1764,23 @@ class PdfGenerator(object):
 
                     best_player_headshot = get_player_image(
                         best_weekly_player.headshot_url,
-                        self.data_dir,
+                        self.nfl_data_dir,
                         self.week_for_report,
                         self.config.getint("Report", "image_quality"),
                         1.5 * inch,
                         best_weekly_player.full_name,
                         self.report_data.league.dev_offline,
+                        self.league_data_dir,
                     )
                     worst_player_headshot = get_player_image(
                         worst_weekly_player.headshot_url,
-                        self.data_dir,
+                        self.nfl_data_dir,
                         self.week_for_report,
                         self.config.getint("Report", "image_quality"),
                         1.5 * inch,
                         worst_weekly_player.full_name,
                         self.report_data.league.dev_offline,
+                        self.league_data_dir,
                     )
 
                     data = [
@@ -1816,7 +1902,10 @@ class PdfGenerator(object):
                 ):
                     doc_elements.append(self.add_page_break())
 
-    def generate_pdf(self, filename_with_path, line_chart_data_list):
+    @instrumented(category="pdf")
+    def generate_pdf(
+        self, filename_with_path, season_time_series: SeasonTimeSeries
+    ):
         logger.debug("Generating report PDF.")
 
         elements = []
@@ -2013,16 +2102,39 @@ class PdfGenerator(object):
                         playoff_probs_style,
                         playoff_probs_style,
                         self.widths_n_cols_no_1,
-                        subtitle_text="Playoff probabilities were calculated using %s Monte Carlo simulations to predict "
-                        "team performances through the end of the regular fantasy season."
+                        subtitle_text=(
+                            "Playoff probabilities were calculated exactly from all %s possible outcomes of the "
+                            "remaining matchups through the end of the regular fantasy season."
+                            if self.report_data.playoff_probs_exact
+                            else "Playoff probabilities were calculated using %s Monte Carlo simulations to predict "
+                            "team performances through the end of the regular fantasy season."
+                        )
                         % "{0:,}".format(
-                            int(self.playoff_prob_sims)
-                            if self.playoff_prob_sims is not None
-                            else self.config.getint(
-                                "Settings",
-                                "num_playoff_simulations",
-                                fallback=100000,
+                            self.report_data.playoff_probs_simulations
+                        )
+                        + (
+                            "\nSimulations were run in antithetic pairs for an effective sample size of {0}.".format(
+                                "{0:,}".format(
+                                    self.report_data.playoff_probs_effective_sample_size
+                                )
                             )
+                            if self.report_data.playoff_probs_antithetic
+                            and self.report_data.playoff_probs_effective_sample_size
+                            else ""
+                        )
+                        + (
+                            "\nSimulations were stopped once every team's playoff probability was within "
+                            "±{0}% at {1}% confidence.".format(
+                                self.report_data.playoff_probs_precision,
+                                round(
+                                    self.report_data.playoff_probs_confidence
+                                    * 100,
+                                    2,
+                                ),
+                            )
+                            if self.report_data.playoff_probs_precision
+                            and not self.report_data.playoff_probs_exact
+                            else ""
                         )
                         + (
                             "\nProbabilities account for division winners in addition to overall "
@@ -2043,10 +2155,30 @@ class PdfGenerator(object):
                             else ""
                         )
                         if self.report_data.has_divisions
+                        else "(x) Clinched Playoff Spot"
+                        "<br></br>(e) Eliminated from Playoff Contention"
+                        if self.report_data.playoff_probs_clinch_statuses
                         else None,
                     )
                 )
 
+            # playoff scenarios
+            if self.report_data.data_for_playoff_scenarios:
+                elements.append(self.spacer_twentieth_inch)
+                elements.append(
+                    self.create_section(
+                        "Playoff Scenarios",
+                        self.playoff_scenarios_headers,
+                        self.report_data.data_for_playoff_scenarios,
+                        self.style,
+                        self.style,
+                        self.widths_06_cols_no_4,
+                        subtitle_text="Playoff probabilities of teams still in contention with a win and with a loss in "
+                        "their next matchup, calculated from the same simulations for every outcome.",
+                        metric_type="playoff_scenarios",
+                    )
+                )
+
         if self.config.getboolean(
             "Report", "league_standings"
         ) or self.config.getboolean("Report", "league_playoff_probs"):
@@ -2358,23 +2490,20 @@ class PdfGenerator(object):
             elements.append(self.add_page_break())
 
         if self.config.getboolean("Report", "report_time_series_charts"):
-            series_names = line_chart_data_list[0]
-            points_data = line_chart_data_list[2]
-            efficiency_data = line_chart_data_list[3]
-            luck_data = line_chart_data_list[4]
-
-            # Remove any zeros from coaching efficiency to make table prettier
-            for team in efficiency_data:
-                week_index = 0
-                for week in team:
-                    if len(team) > 1:
-                        if week[1] == 0.0:
-                            del team[week_index]
-
-                    if week[1] == "DQ":
-                        week[1] = 0.0
+            series_names = season_time_series.team_names
+            weeks = season_time_series.weeks
+            points_values = season_time_series.get_metric("points")
+            playoff_probs_values = season_time_series.get_metric(
+                "playoff_probs"
+            )
 
-                    week_index += 1
+            # leave any zeros out of coaching efficiency to make table prettier
+            efficiency_values = season_time_series.get_metric(
+                "coaching_efficiency"
+            )
+            efficiency_values = np.where(
+                efficiency_values == 0.0, np.nan, efficiency_values
+            )
 
             # create line charts for points, coaching efficiency, and luck
             charts_time_series_page_title_str = "Time Series Charts"
@@ -2390,8 +2519,8 @@ class PdfGenerator(object):
             elements.append(
                 KeepTogether(
                     self.create_line_chart(
-                        points_data,
-                        len(points_data[0]),
+                        points_values,
+                        weeks,
                         series_names,
                         "Weekly Points",
                         "Weeks",
@@ -2404,8 +2533,8 @@ class PdfGenerator(object):
             elements.append(
                 KeepTogether(
                     self.create_line_chart(
-                        efficiency_data,
-                        len(points_data[0]),
+                        efficiency_values,
+                        weeks,
                         series_names,
                         "Weekly Coaching Efficiency",
                         "Weeks",
@@ -2418,8 +2547,8 @@ class PdfGenerator(object):
             elements.append(
                 KeepTogether(
                     self.create_line_chart(
-                        luck_data,
-                        len(points_data[0]),
+                        season_time_series.get_metric("luck"),
+                        weeks,
                         series_names,
                         "Weekly Luck",
                         "Weeks",
@@ -2428,6 +2557,21 @@ class PdfGenerator(object):
                     )
                 )
             )
+            if not np.isnan(playoff_probs_values).all():
+                elements.append(self.spacer_twentieth_inch)
+                elements.append(
+                    KeepTogether(
+                        self.create_line_chart(
+                            playoff_probs_values,
+                            weeks,
+                            series_names,
+                            "Weekly Playoff Probabilities",
+                            "Weeks",
+                            "Playoff Probability (%)",
+                            10.00,
+                        )
+                    )
+                )
             elements.append(self.spacer_tenth_inch)
             elements.append(self.add_page_break())
 
@@ -2460,7 +2604,8 @@ class PdfGenerator(object):
             "generating PDF ({0})...".format(filename_with_path.split("/")[-1])
         )
         # doc.build(elements, onFirstPage=self.add_page_number, onLaterPages=self.add_page_number)
-        doc.build(elements, onLaterPages=self.add_page_number)
+        with instrument("doc.build", category="pdf"):
+            doc.build(elements, onLaterPages=self.add_page_number)
 
         return doc.filename
 
@@ -0,0 +1,219 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "wrenjr@yahoo.com"
+
+import datetime
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from report.instrumentation import instrument
+from report.logger import get_logger
+
+logger = get_logger(__name__, propagate=False)
+
+
+class ReportStage(object):
+    def __init__(self, name, function, inputs=None, io_bound=True):
+        """Stage of the report that produces a single output from the outputs of the stages it depends on.
+
+        :param name: name of the stage, which is also the name of its output
+        :param function: function called with the outputs of the input stages as keyword arguments
+        :param inputs: list of names of the stages whose outputs the stage needs
+        :param io_bound: True if the stage mostly waits on network or disk, False if it is CPU-bound
+        """
+        self.name = name
+        self.function = function
+        self.inputs = list(inputs) if inputs else []
+        self.io_bound = io_bound
+
+        self.begin = None  # type: datetime.datetime
+        self.end = None  # type: datetime.datetime
+
+    def run(self, outputs):
+        self.begin = datetime.datetime.now()
+        try:
+            with instrument(self.name, category="stage"):
+                return self.function(
+                    **{
+                        stage_input: outputs[stage_input]
+                        for stage_input in self.inputs
+                    }
+                )
+        finally:
+            self.end = datetime.datetime.now()
+
+    @property
+    def duration(self):
+        if self.begin is None or self.end is None:
+            return None
+        return self.end - self.begin
+
+
+class ReportStageScheduler(object):
+    def __init__(self, stages):
+        """Run report stages as soon as the stages they depend on are done. I/O-bound stages run concurrently in a
+        thread pool, while CPU-bound stages run in the scheduling thread (CPU-bound work like the playoff simulations
+        manages its own worker processes), so network requests keep running while they do.
+
+        :param stages: list of ReportStage
+        """
+        logger.debug("Initializing report stage scheduler.")
+
+        self.stages = {}  # type: dict[str, ReportStage]
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(
+                    'Duplicate report stage "{0}".'.format(stage.name)
+                )
+            self.stages[stage.name] = stage
+
+        for stage in self.stages.values():
+            for stage_input in stage.inputs:
+                if stage_input not in self.stages:
+                    raise ValueError(
+                        'Report stage "{0}" depends on unknown stage "{1}".'.format(
+                            stage.name, stage_input
+                        )
+                    )
+        self.check_for_cycles()
+
+        self.begin = None  # type: datetime.datetime
+        self.end = None  # type: datetime.datetime
+
+    def check_for_cycles(self):
+        visited = set()
+        for stage_name in self.stages.keys():
+            self.visit_stage(stage_name, visited, [])
+
+    def visit_stage(self, stage_name, visited, path):
+        if stage_name in path:
+            raise ValueError(
+                "Report stages depend on each other in a cycle: {0}".format(
+                    " -> ".join(path[path.index(stage_name) :] + [stage_name])
+                )
+            )
+        if stage_name not in visited:
+            for stage_input in self.stages[stage_name].inputs:
+                self.visit_stage(stage_input, visited, path + [stage_name])
+            visited.add(stage_name)
+
+    def run(self):
+        """Run every stage once all of its inputs are available.
+
+        :return: dict of the output of every stage by stage name
+        """
+        self.begin = datetime.datetime.now()
+
+        outputs = {}
+        not_started = list(self.stages.values())
+        running = {}
+
+        num_io_stages = len(
+            [stage for stage in self.stages.values() if stage.io_bound]
+        )
+        executor = ThreadPoolExecutor(max_workers=max(1, num_io_stages))
+        try:
+            while not_started or running:
+                ready = [
+                    stage
+                    for stage in not_started
+                    if all(
+                        stage_input in outputs for stage_input in stage.inputs
+                    )
+                ]
+                for stage in ready:
+                    not_started.remove(stage)
+
+                # start the I/O-bound stages first so they run while the CPU-bound stages are running
+                for stage in ready:
+                    if stage.io_bound:
+                        logger.debug(
+                            'Starting report stage "{0}".'.format(stage.name)
+                        )
+                        running[
+                            executor.submit(stage.run, dict(outputs))
+                        ] = stage
+                cpu_bound_stages = [
+                    stage for stage in ready if not stage.io_bound
+                ]
+                for stage in cpu_bound_stages:
+                    logger.debug(
+                        'Starting report stage "{0}".'.format(stage.name)
+                    )
+                    outputs[stage.name] = stage.run(outputs)
+
+                # stages that depend on the CPU-bound stages can start right away
+                if cpu_bound_stages:
+                    continue
+
+                if not running:
+                    # every remaining stage depends on a stage that can never run
+                    raise ValueError(
+                        "Unable to run report stages: {0}".format(
+                            ", ".join(stage.name for stage in not_started)
+                        )
+                    )
+
+                done, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    outputs[stage.name] = future.result()
+        finally:
+            # do not wait for (or start) any other stages if a stage failed
+            for future in running.keys():
+                future.cancel()
+            executor.shutdown(wait=False)
+            self.end = datetime.datetime.now()
+
+        return outputs
+
+    def get_critical_path(self):
+        """Get the chain of stages that determined how long the run took, which starts from the stage that finished
+        last and follows the input stage that finished last back to a stage without inputs.
+
+        :return: list of ReportStage in the order they ran
+        """
+        finished_stages = [
+            stage for stage in self.stages.values() if stage.end is not None
+        ]
+        if not finished_stages:
+            return []
+
+        critical_path = [max(finished_stages, key=lambda x: x.end)]
+        while critical_path[0].inputs:
+            critical_path.insert(
+                0,
+                max(
+                    (
+                        self.stages[stage_input]
+                        for stage_input in critical_path[0].inputs
+                    ),
+                    key=lambda x: x.end,
+                ),
+            )
+        return critical_path
+
+    def log_summary(self):
+        summary = "\nReport stages finished in {0}:\n".format(
+            self.end - self.begin
+        )
+        for stage in sorted(
+            self.stages.values(), key=lambda x: x.begin or self.end
+        ):
+            summary += "    {0:<16} {1:<4} {2:>9} {3:>9}\n".format(
+                stage.name,
+                "I/O" if stage.io_bound else "CPU",
+                "+{0:.1f}s".format((stage.begin - self.begin).total_seconds())
+                if stage.begin is not None
+                else "-",
+                "{0:.1f}s".format(stage.duration.total_seconds())
+                if stage.duration is not None
+                else "-",
+            )
+        summary += "    critical path: {0}\n".format(
+            " -> ".join(
+                "{0} ({1:.1f}s)".format(
+                    stage.name, stage.duration.total_seconds()
+                )
+                for stage in self.get_critical_path()
+            )
+        )
+        logger.info(summary)
@@ -0,0 +1,69 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "wrenjr@yahoo.com"
+
+from report.logger import get_logger
+
+logger = get_logger(__name__, propagate=False)
+
+
+class ReportSections(object):
+    # report sections that display each metric, where each section is a tuple of [Report] settings that must all be
+    # enabled for the section to be included in the report
+    metric_sections = {
+        "division_standings": [("league_standings",)],
+        "median_standings": [("league_median_standings",)],
+        "playoff_probs": [("league_playoff_probs",)],
+        "playoff_scenarios": [
+            ("league_playoff_probs", "league_playoff_scenarios")
+        ],
+        "z_scores": [("league_z_score_rankings",)],
+        "coaching_efficiency_ties": [("league_coaching_efficiency_rankings",)],
+        "power_rankings": [("league_power_rankings",)],
+        "weekly_highest_ce": [("league_weekly_highest_ce",)],
+        "bad_boy_stats": [("league_bad_boy_rankings",)],
+        "beef_stats": [("league_beef_rankings",)],
+        "covid_risk": [("league_covid_risk_rankings",)],
+        # team stats pages are created from the weekly points by position of every team
+        "points_by_position": [
+            ("report_team_stats", "team_points_by_position_charts"),
+            ("report_team_stats", "team_bad_boy_stats"),
+            ("report_team_stats", "team_beef_stats"),
+            ("report_team_stats", "team_boom_or_bust"),
+        ],
+    }
+
+    # metrics that other metrics are calculated from
+    metric_dependencies = {
+        "playoff_scenarios": ["playoff_probs"],
+        # power rankings and the weekly highest coaching efficiency use the coaching efficiency ranks after tiebreakers
+        "power_rankings": ["coaching_efficiency_ties"],
+        "weekly_highest_ce": ["coaching_efficiency_ties"],
+    }
+
+    def __init__(self, config):
+        """Determine which optional metrics (and the web data they need) are required by the report sections that are
+        enabled in the [Report] settings, so that metrics of disabled sections are never calculated.
+
+        :param config: app config
+        """
+        logger.debug("Determining required report metrics.")
+
+        self.required_metrics = set()
+        for metric, sections in self.metric_sections.items():
+            if any(
+                all(
+                    config.getboolean("Report", setting, fallback=False)
+                    for setting in section
+                )
+                for section in sections
+            ):
+                self.add_required_metric(metric)
+
+    def add_required_metric(self, metric):
+        if metric not in self.required_metrics:
+            self.required_metrics.add(metric)
+            for dependency in self.metric_dependencies.get(metric, []):
+                self.add_required_metric(dependency)
+
+    def is_required(self, metric):
+        return metric in self.required_metrics
@@ -0,0 +1,602 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "wrenjr@yahoo.com"
+
+import datetime
+import json
+import os
+import threading
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from copy import deepcopy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from dao.base import BaseLeague
+from report.builder import FantasyFootballReport
+from report.data import ReportData
+from report.logger import get_logger
+from utils.report_tools import supported_platforms
+
+logger = get_logger(__name__, propagate=False)
+
+
+def copy_league_data(league: BaseLeague):
+    """Copy league data so that a report can calculate its metrics on the copy. The app config and the platform client
+    used to retrieve player data on demand are shared with the copy instead of being copied.
+
+    :param league: league data retrieved from the platform
+    :return: copy of the league data
+    """
+    memo = {id(league.config): league.config}
+    for player_data_function in [
+        league.player_data_by_week_function,
+        league.players_data_by_week_function,
+    ]:
+        if player_data_function is not None:
+            memo[id(player_data_function)] = player_data_function
+    return deepcopy(league, memo)
+
+
+def get_bool_value(values, key, default):
+    """Get a boolean value of a request to the report service API, which must be a JSON boolean (true or false) or
+    null when it has a default.
+
+    :param values: dict of the values of the request
+    :param key: key of the value
+    :param default: value used when the request does not include one
+    :return: bool (or the default)
+    """
+    value = values.get(key)
+    if value is None:
+        return default
+    if not isinstance(value, bool):
+        raise ValueError(
+            'Invalid "{0}" value {1}. It must be true or false.'.format(
+                key, json.dumps(value)
+            )
+        )
+    return value
+
+
+def get_report_metrics(report_data: ReportData):
+    """Get the metric tables of the report week by metric name (the name of each data_for_* attribute of the report
+    data without the prefix).
+    """
+    return {
+        attribute[len("data_for_") :]: value
+        for attribute, value in vars(report_data).items()
+        if attribute.startswith("data_for_")
+    }
+
+
+class ReportServiceRequest(object):
+    def __init__(
+        self,
+        platform,
+        league_id,
+        week=None,
+        game_id=None,
+        season=None,
+        refresh=False,
+        include_metrics=False,
+        playoff_prob_sims=None,
+        break_ties=None,
+        dq_ce=None,
+        wait=True,
+    ):
+        """Report requested from the report service.
+
+        :param platform: fantasy football platform of the league
+        :param league_id: league id
+        :param week: week of the report (None for the default week)
+        :param game_id: game id (None for the game id of the service)
+        :param season: season of the league (None for the season of the service)
+        :param refresh: retrieve the league and web data again even if it is kept in memory
+        :param include_metrics: include the metric tables of the report week in the result
+        :param playoff_prob_sims: number of playoff simulations (None for the setting of the service)
+        :param break_ties: break ties in metric rankings (None for the setting of the service)
+        :param dq_ce: disqualify teams ineligible for coaching efficiency (None for the setting of the service)
+        :param wait: respond with the result once the report is done instead of with the queued request right away
+        """
+        self.request_id = uuid.uuid4().hex
+        self.platform = platform
+        self.league_id = league_id
+        self.week = week
+        self.game_id = game_id
+        self.season = season
+        self.refresh = refresh
+        self.include_metrics = include_metrics
+        self.playoff_prob_sims = playoff_prob_sims
+        self.break_ties = break_ties
+        self.dq_ce = dq_ce
+        self.wait = wait
+
+        self.status = "queued"
+        self.submitted = datetime.datetime.now()
+        self.begin = None  # type: datetime.datetime
+        self.end = None  # type: datetime.datetime
+        self.done = threading.Event()
+
+        # results of the report
+        self.report_pdf = None
+        self.metrics = None  # type: dict
+        self.error = None
+
+    @classmethod
+    def from_dict(cls, values, default_platform, default_league_id):
+        """Create a report request from the values of a request to the report service API, which are checked first.
+
+        :param values: dict with the optional "platform", "league_id", "week", "game_id", "season", "refresh",
+            "metrics", "playoff_prob_sims", "break_ties", "dq_ce", and "wait" values of the request (the "refresh",
+            "metrics", "break_ties", "dq_ce", and "wait" values must be true or false)
+        :param default_platform: platform used when the request does not include one
+        :param default_league_id: league id used when the request does not include one
+        :return: ReportServiceRequest
+        """
+        if not isinstance(values, dict):
+            raise ValueError("Report request must be a JSON object.")
+
+        platform = str(values.get("platform") or default_platform).lower()
+        if platform not in supported_platforms:
+            raise ValueError(
+                'Unsupported platform "{0}". Supported platforms: {1}'.format(
+                    platform, ", ".join(supported_platforms)
+                )
+            )
+
+        week = values.get("week")
+        if week is not None and week != "":
+            if not (str(week).isdigit() and 1 <= int(week) <= 17):
+                raise ValueError(
+                    'Invalid week "{0}". Week must be from 1 to 17.'.format(
+                        week
+                    )
+                )
+            week = str(int(week))
+        else:
+            week = None
+
+        playoff_prob_sims = values.get("playoff_prob_sims")
+        if playoff_prob_sims is not None and not (
+            str(playoff_prob_sims).isdigit() and int(playoff_prob_sims) > 0
+        ):
+            raise ValueError(
+                'Invalid number of playoff simulations "{0}".'.format(
+                    playoff_prob_sims
+                )
+            )
+
+        return cls(
+            platform,
+            str(values.get("league_id") or default_league_id),
+            week=week,
+            game_id=values.get("game_id"),
+            season=values.get("season"),
+            refresh=get_bool_value(values, "refresh", False),
+            include_metrics=get_bool_value(values, "metrics", False),
+            playoff_prob_sims=playoff_prob_sims,
+            break_ties=get_bool_value(values, "break_ties", None),
+            dq_ce=get_bool_value(values, "dq_ce", None),
+            wait=get_bool_value(values, "wait", True),
+        )
+
+    def __str__(self):
+        return "{0} league {1} (week {2})".format(
+            self.platform,
+            self.league_id,
+            self.week if self.week else "default",
+        )
+
+    def to_dict(self):
+        return {
+            "request_id": self.request_id,
+            "status": self.status,
+            "platform": self.platform,
+            "league_id": self.league_id,
+            "week": self.week,
+            "season": self.season,
+            "submitted": "{:%Y-%m-%d %H:%M:%S}".format(self.submitted),
+            "duration": (self.end - self.begin).total_seconds()
+            if self.begin is not None and self.end is not None
+            else None,
+            "report_pdf": self.report_pdf,
+            "metrics": self.metrics,
+            "error": self.error,
+        }
+
+
+class FantasyFootballReportService(object):
+    def __init__(
+        self,
+        config,
+        game_id=None,
+        season=None,
+        refresh_web_data=False,
+        playoff_prob_sims=None,
+        playoff_prob_workers=None,
+        break_ties=False,
+        dq_ce=False,
+        save_data=False,
+        dev_offline=False,
+        test=False,
+    ):
+        """Long-running service that generates reports requested over a local HTTP API. The app config, the league
+        data of each league (for service_league_data_ttl seconds), and the NFL data of each season (bad boy, beef, and
+        COVID-19 risk data) are kept in memory, so later reports of the same league only recalculate the metrics that
+        are not already saved and build the PDF. Up to num_service_report_workers reports are generated at the same
+        time, and requests beyond that are queued.
+
+        :param config: app config
+        """
+        logger.debug("Instantiating fantasy football report service.")
+
+        self.config = config
+        self.game_id = game_id
+        self.season = season if season else config.get("Settings", "season")
+        self.refresh_web_data = refresh_web_data
+
+        self.report_kwargs = {
+            "config": config,
+            "playoff_prob_sims": playoff_prob_sims,
+            "playoff_prob_workers": playoff_prob_workers,
+            "break_ties": break_ties,
+            "dq_ce": dq_ce,
+            "save_data": save_data,
+            "dev_offline": dev_offline,
+            "test": test,
+        }
+
+        # the SERVICE_HOST environment variable is set by docker-compose.yml to accept requests from outside the container
+        self.host = os.environ.get("SERVICE_HOST") or self.config.get(
+            "Settings", "service_host", fallback="127.0.0.1"
+        )
+        self.port = self.config.getint(
+            "Settings", "service_port", fallback=5000
+        )
+        self.num_workers = self.config.getint(
+            "Settings", "num_service_report_workers", fallback=1
+        )
+        self.league_data_ttl = self.config.getint(
+            "Settings", "service_league_data_ttl", fallback=300
+        )
+        self.max_kept_requests = 100
+        self.max_kept_leagues = 20
+
+        self.executor = ThreadPoolExecutor(max_workers=self.num_workers)
+        self.lock = threading.Lock()
+        # reports of the same league are generated one at a time, so that later ones reuse the data of the first one
+        # (lock, number of reports using it) by league, forgotten once no report is using it
+        self.league_locks = {}  # type: dict[tuple, list]
+        self.requests = OrderedDict()  # type: dict[str, ReportServiceRequest]
+
+        # league data by league and week, kept with the time it was retrieved (for up to max_kept_leagues leagues)
+        self.league_data = {}  # type: dict[tuple, tuple]
+        # bad boy stats, beef stats, and COVID-19 risk data by week of each season
+        self.nfl_data = {}  # type: dict[str, dict]
+
+        if self.num_workers > 1 and self.config.getboolean(
+            "Settings", "save_report_trace", fallback=True
+        ):
+            logger.warning(
+                "Report traces of reports generated at the same time by the report service include the spans of each "
+                "other. Set num_service_report_workers to 1 for separate report traces."
+            )
+
+    def submit(self, values):
+        """Queue a report request.
+
+        :param values: dict of the values of the request (see ReportServiceRequest.from_dict)
+        :return: ReportServiceRequest
+        """
+        report_request = ReportServiceRequest.from_dict(
+            values,
+            self.config.get("Settings", "platform"),
+            self.config.get("Settings", "league_id"),
+        )
+        if not report_request.season:
+            report_request.season = self.season
+        if not report_request.game_id:
+            report_request.game_id = self.game_id
+
+        with self.lock:
+            self.requests[report_request.request_id] = report_request
+            # forget the oldest finished requests
+            finished_request_ids = [
+                request_id
+                for request_id, kept_request in self.requests.items()
+                if kept_request.done.is_set()
+            ]
+            for request_id in finished_request_ids[
+                : max(0, len(self.requests) - self.max_kept_requests)
+            ]:
+                del self.requests[request_id]
+
+        logger.info("Queued report request for {0}.".format(report_request))
+        self.executor.submit(self.create_report, report_request)
+
+        return report_request
+
+    def get_request(self, request_id):
+        with self.lock:
+            return self.requests.get(request_id)
+
+    def get_status(self):
+        with self.lock:
+            statuses = [
+                report_request.status
+                for report_request in self.requests.values()
+            ]
+            return {
+                "status": "ok",
+                "num_workers": self.num_workers,
+                "queued": statuses.count("queued"),
+                "running": statuses.count("running"),
+                "cached_leagues": len(self.league_data),
+                "cached_seasons": sorted(self.nfl_data.keys()),
+            }
+
+    @contextmanager
+    def league_lock(self, league_key):
+        """Generate reports of the same league one at a time."""
+        with self.lock:
+            if league_key not in self.league_locks:
+                self.league_locks[league_key] = [threading.Lock(), 0]
+            self.league_locks[league_key][1] += 1
+            lock = self.league_locks[league_key][0]
+        try:
+            with lock:
+                yield
+        finally:
+            with self.lock:
+                self.league_locks[league_key][1] -= 1
+                if not self.league_locks[league_key][1]:
+                    del self.league_locks[league_key]
+
+    def get_league_data(self, league_key):
+        """Get a copy of the league data kept in memory if it was retrieved less than service_league_data_ttl seconds
+        ago (None otherwise).
+        """
+        with self.lock:
+            retrieved, league = self.league_data.get(league_key, (None, None))
+            if (
+                league is not None
+                and (datetime.datetime.now() - retrieved).total_seconds()
+                > self.league_data_ttl
+            ):
+                # forget expired league data
+                del self.league_data[league_key]
+                league = None
+        if league is None:
+            return None
+        return copy_league_data(league)
+
+    def keep_league_data(self, league_key, league):
+        """Keep league data in memory, forgetting expired league data and the league data retrieved longest ago beyond
+        max_kept_leagues leagues.
+        """
+        with self.lock:
+            now = datetime.datetime.now()
+            # league data is kept in the order it was retrieved
+            self.league_data.pop(league_key, None)
+            self.league_data[league_key] = (now, league)
+
+            kept_league_keys = [
+                kept_league_key
+                for kept_league_key, (retrieved, _) in self.league_data.items()
+                if (now - retrieved).total_seconds() <= self.league_data_ttl
+            ][-self.max_kept_leagues :]
+            self.league_data = {
+                kept_league_key: self.league_data[kept_league_key]
+                for kept_league_key in kept_league_keys
+            }
+
+    def get_nfl_data(self, season):
+        with self.lock:
+            if season not in self.nfl_data:
+                self.nfl_data[season] = {
+                    "bad_boy_stats": None,
+                    "beef_stats": None,
+                    "covid_risk_by_week": {},
+                }
+            return self.nfl_data[season]
+
+    def create_report(self, report_request: ReportServiceRequest):
+        """Generate the requested report, reusing the league and NFL data kept in memory unless a refresh is requested.
+        Any failure is caught and kept with the request so that it does not stop the service.
+        """
+        report_request.status = "running"
+        report_request.begin = datetime.datetime.now()
+        logger.info("Generating report for {0}...".format(report_request))
+
+        league_key = (
+            report_request.platform,
+            report_request.league_id,
+            str(report_request.game_id),
+            str(report_request.season),
+            report_request.week,
+        )
+        try:
+            with self.league_lock(league_key):
+                league = (
+                    self.get_league_data(league_key)
+                    if not report_request.refresh
+                    else None
+                )
+                nfl_data = self.get_nfl_data(str(report_request.season))
+                reuse_nfl_data = not (
+                    report_request.refresh or self.refresh_web_data
+                )
+
+                report_kwargs = dict(self.report_kwargs)
+                for option in ["playoff_prob_sims", "break_ties", "dq_ce"]:
+                    if getattr(report_request, option) is not None:
+                        report_kwargs[option] = getattr(report_request, option)
+
+                report = FantasyFootballReport(
+                    week_for_report=report_request.week,
+                    platform=report_request.platform,
+                    league_id=report_request.league_id,
+                    game_id=report_request.game_id,
+                    season=report_request.season,
+                    refresh_web_data=not reuse_nfl_data,
+                    bad_boy_stats=nfl_data["bad_boy_stats"]
+                    if reuse_nfl_data
+                    else None,
+                    beef_stats=nfl_data["beef_stats"]
+                    if reuse_nfl_data
+                    else None,
+                    covid_risk=nfl_data["covid_risk_by_week"].get(
+                        int(report_request.week)
+                        if report_request.week
+                        else None
+                    )
+                    if reuse_nfl_data
+                    else None,
+                    league=league,
+                    **report_kwargs
+                )
+
+                # keep the data retrieved by the report before its metrics are calculated on the league data
+                if league is None:
+                    self.keep_league_data(
+                        league_key, copy_league_data(report.league)
+                    )
+                with self.lock:
+                    if report.bad_boy_stats is not None:
+                        nfl_data["bad_boy_stats"] = report.bad_boy_stats
+                    if report.beef_stats is not None:
+                        nfl_data["beef_stats"] = report.beef_stats
+                    if report.covid_risk is not None:
+                        nfl_data["covid_risk_by_week"][
+                            int(report.league.week_for_report)
+                        ] = report.covid_risk
+
+                report_request.report_pdf = report.create_pdf_report()
+                if report_request.include_metrics:
+                    report_request.metrics = get_report_metrics(
+                        report.report_data
+                    )
+            report_request.status = "succeeded"
+        except (Exception, SystemExit) as e:
+            logger.error(
+                "Error: {0}\n{1}".format(repr(e), traceback.format_exc())
+            )
+            report_request.error = repr(e)
+            report_request.status = "failed"
+        finally:
+            report_request.end = datetime.datetime.now()
+            report_request.done.set()
+
+        if report_request.error:
+            logger.error(
+                "...report for {0} FAILED after {1:.1f}s: {2}\n".format(
+                    report_request,
+                    (
+                        report_request.end - report_request.begin
+                    ).total_seconds(),
+                    report_request.error,
+                )
+            )
+        else:
+            logger.info(
+                "...report for {0} generated in {1:.1f}s: {2}\n".format(
+                    report_request,
+                    (
+                        report_request.end - report_request.begin
+                    ).total_seconds(),
+                    report_request.report_pdf,
+                )
+            )
+
+    def serve(self):
+        """Accept report requests until the service is stopped (with Ctrl+C):
+
+        GET  /health                 status of the service and of the queue
+        POST /reports                request a report with a JSON object of the request values (see
+                                     ReportServiceRequest.from_dict), including the optional "wait" value (default true),
+                                     which returns the result once the report is done when true, or the queued
+                                     request right away when false
+        GET  /reports/<request_id>   status and result of a report request
+        """
+        server = ThreadingHTTPServer(
+            (self.host, self.port), ReportServiceRequestHandler
+        )
+        server.report_service = self
+        logger.info(
+            "Fantasy football report service listening on http://{0}:{1} with {2} report worker{3}...".format(
+                self.host,
+                server.server_address[1],
+                self.num_workers,
+                "s" if self.num_workers > 1 else "",
+            )
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("...stopping fantasy football report service.")
+        finally:
+            server.server_close()
+            self.executor.shutdown(wait=False)
+
+
+class ReportServiceRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        report_service = (
+            self.server.report_service
+        )  # type: FantasyFootballReportService
+        path = urlparse(self.path).path.rstrip("/")
+
+        if path == "/health":
+            self.send_json(200, report_service.get_status())
+        elif path.startswith("/reports/"):
+            report_request = report_service.get_request(
+                path[len("/reports/") :]
+            )
+            if report_request is None:
+                self.send_json(404, {"error": "Unknown report request."})
+            else:
+                self.send_json(200, report_request.to_dict())
+        else:
+            self.send_json(404, {"error": "Unknown path {0}.".format(path)})
+
+    def do_POST(self):
+        report_service = (
+            self.server.report_service
+        )  # type: FantasyFootballReportService
+        path = urlparse(self.path).path.rstrip("/")
+
+        if path != "/reports":
+            self.send_json(404, {"error": "Unknown path {0}.".format(path)})
+            return
+
+        try:
+            content_length = int(self.headers.get("Content-Length") or 0)
+            values = json.loads(self.rfile.read(content_length) or "{}")
+            report_request = report_service.submit(values)
+        except ValueError as e:
+            self.send_json(400, {"error": str(e)})
+            return
+
+        if not report_request.wait:
+            self.send_json(202, report_request.to_dict())
+            return
+
+        report_request.done.wait()
+        self.send_json(
+            200 if report_request.status == "succeeded" else 500,
+            report_request.to_dict(),
+        )
+
+    def send_json(self, status, body):
+        response = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format, *args):
+        logger.debug("{0} - {1}".format(self.address_string(), format % args))
@@ -26,6 +26,13 @@ playoff_probabilities = (
     "eligibility for leagues with divisions or other custom playoff settings."
 )
 
+playoff_scenarios = (
+    "Shows how each team's likelihood of making the playoffs changes if it wins or loses its next "
+    "matchup. Every win and loss scenario is evaluated on the same simulated outcomes of the other "
+    "remaining matchups, so the difference between the two columns reflects only the result of that "
+    "one matchup."
+)
+
 team_power_rankings = (
     "The power rankings are calculated by taking a weekly average of each team's score, coaching "
     "efficiency, and luck."
@@ -0,0 +1,70 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "wrenjr@yahoo.com"
+
+import os
+import sys
+
+import numpy as np
+
+module_dir = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(module_dir)
+
+from calculate.all_play import AllPlayRecords
+from calculate.metrics import CalculateMetrics
+from dao.base import BaseLeague, BaseTeam
+from utils.app_config_parser import AppConfigParser
+
+
+def test_all_play_records_match_pairwise_comparisons():
+    random_state = np.random.RandomState(5)
+    team_ids = [str(team_id) for team_id in range(1, 11)]
+    weeks = list(range(1, 14))
+    # round scores to whole points so that there are ties
+    scores = np.round(random_state.uniform(60, 160, (10, 13)) / 10) * 10
+
+    all_play_records = AllPlayRecords(team_ids, weeks, scores)
+
+    for team_ndx, team_id in enumerate(team_ids):
+        for week_ndx, week in enumerate(weeks):
+            other_scores = np.delete(scores[:, week_ndx], team_ndx)
+            score = scores[team_ndx, week_ndx]
+            assert all_play_records.get_record(team_id, week) == (
+                int(np.sum(other_scores < score)),
+                int(np.sum(other_scores == score)),
+                int(np.sum(other_scores > score)),
+            )
+
+
+def test_luck_from_all_play_records():
+    config = AppConfigParser()
+    config.read(os.path.join(module_dir, "EXAMPLE-config.ini"))
+    league = BaseLeague(1, "12345", config, "data", save_data=False)
+
+    teams = {}
+    for team_id, points in [("1", 120), ("2", 100), ("3", 100), ("4", 80)]:
+        team = BaseTeam()
+        team.team_id = team_id
+        team.points = points
+        teams[team_id] = team
+    league.teams_by_week["1"] = teams
+
+    custom_weekly_matchups = [
+        {"1": {"result": "W"}, "4": {"result": "L"}},
+        {"2": {"result": "T"}, "3": {"result": "T"}},
+    ]
+    luck_results = CalculateMetrics.calculate_luck(
+        1, league, custom_weekly_matchups
+    )
+
+    # teams that beat or lost to every other team have no luck
+    assert luck_results["1"]["luck"] == 0
+    assert luck_results["4"]["luck"] == 0
+    assert luck_results["2"]["luck_record"].get_record_str() == "1-1-1"
+    assert round(luck_results["2"]["luck"], 2) == 66.67
+
+
+if __name__ == "__main__":
+    print("Testing all-play records...")
+
+    test_all_play_records_match_pairwise_comparisons()
+    test_luck_from_all_play_records()
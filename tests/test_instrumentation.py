@@ -0,0 +1,109 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "wrenjr@yahoo.com"
+
+import json
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+module_dir = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(module_dir)
+
+from report.instrumentation import (
+    instrument,
+    instrumented,
+    pop_instrumentation_events,
+    record_http_call,
+    save_instrumentation_trace,
+    start_instrumentation,
+    stop_instrumentation,
+)
+
+
+@instrumented(category="metric", arg_names=("week",))
+def calculate_metric(week, values):
+    record_http_call(100)
+    return sum(values)
+
+
+def test_spans_are_saved_as_chrome_trace_events():
+    start_instrumentation()
+    with instrument("report_data", category="week", week=3):
+        assert calculate_metric(3, [1, 2, 3]) == 6
+        record_http_call(20)
+    stop_instrumentation()
+
+    # calls are not recorded when instrumentation is stopped
+    calculate_metric(4, [1])
+
+    trace_file_path = os.path.join(tempfile.mkdtemp(), "report_trace.json")
+    save_instrumentation_trace(trace_file_path, league_id="12345")
+    with open(trace_file_path, "r", encoding="utf-8") as trace_in:
+        trace = json.load(trace_in)
+
+    assert trace["otherData"] == {"league_id": "12345"}
+    events = {event["name"]: event for event in trace["traceEvents"]}
+    assert set(events.keys()) == {"report_data", "calculate_metric"}
+
+    report_data_event = events["report_data"]
+    metric_event = events["calculate_metric"]
+    assert report_data_event["ph"] == "X"
+    assert report_data_event["args"]["week"] == 3
+    assert metric_event["args"]["week"] == "3"
+    assert metric_event["cat"] == "metric"
+    assert report_data_event["ts"] <= metric_event["ts"]
+    assert report_data_event["dur"] >= metric_event["dur"]
+
+    # HTTP calls are counted for every open span of the thread that made them
+    assert metric_event["args"]["http_calls"] == 1
+    assert metric_event["args"]["http_bytes"] == 100
+    assert report_data_event["args"]["http_calls"] == 2
+    assert report_data_event["args"]["http_bytes"] == 120
+
+
+class ChunkedResponseHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        # chunked responses do not have a Content-Length header
+        self.send_response(200)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in [b"a" * 30, b"b" * 45]:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_http_bytes_are_counted_as_they_are_read():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ChunkedResponseHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    start_instrumentation()
+    try:
+        with instrument("web_data"):
+            response = requests.get(
+                "http://127.0.0.1:{0}/".format(server.server_port)
+            )
+    finally:
+        stop_instrumentation()
+        server.shutdown()
+        server.server_close()
+
+    assert len(response.content) == 75
+    event = pop_instrumentation_events()[0]
+    assert event["args"]["http_calls"] == 1
+    assert event["args"]["http_bytes"] == 75
+
+
+if __name__ == "__main__":
+    print("Testing instrumentation...")
+
+    test_spans_are_saved_as_chrome_trace_events()
+    test_http_bytes_are_counted_as_they_are_read()
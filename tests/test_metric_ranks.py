@@ -0,0 +1,123 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "wrenjr@yahoo.com"
+
+import os
+import sys
+
+module_dir = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(module_dir)
+
+from calculate.metric_ranks import MetricRanks, get_num_first_place
+from calculate.metrics import CalculateMetrics
+from dao.base import BaseLeague
+from utils.app_config_parser import AppConfigParser
+
+
+def test_metric_ranks():
+    metric_ranks = MetricRanks(
+        [100, 95, 95, 90, 80, 80, 80, -1, -1],
+        excluded=[False] * 7 + [True] * 2,
+        tiebreakers=[[0, 1, 2, 0, 5, 5, 7, 0, 0], [0, 0, 0, 0, 1, 2, 0, 0, 0]],
+    )
+
+    assert metric_ranks.dense_ranks.tolist() == [1, 2, 2, 3, 4, 4, 4, 5, 5]
+    assert metric_ranks.competition_ranks.tolist() == [
+        1,
+        2,
+        2,
+        4,
+        5,
+        5,
+        5,
+        8,
+        8,
+    ]
+    # excluded rows are never tied
+    assert (
+        metric_ranks.tied.tolist()
+        == [False, True, True, False] + [True] * 3 + [False] * 2
+    )
+    assert metric_ranks.num_ties == 1 + 3
+    assert metric_ranks.resolved_order.tolist() == [0, 2, 1, 3, 6, 5, 4, 7, 8]
+
+
+def test_score_ties():
+    data_for_scores = [
+        [1, "Team A", "Manager A", "110.50", "12.00"],
+        [2, "Team B", "Manager B", "110.50", "9.50"],
+        [3, "Team C", "Manager C", "110.50", "20.00"],
+        [4, "Team D", "Manager D", "99.00", "30.00"],
+    ]
+
+    ties_for_scores = CalculateMetrics.get_ties_count(
+        data_for_scores, "score", False
+    )
+    assert ties_for_scores == 3
+    assert [team[0] for team in data_for_scores] == ["1*", "1*", "1*", "2"]
+    assert get_num_first_place(data_for_scores, 3) == 3
+
+    # bench points break the ties as numbers
+    data_for_scores = CalculateMetrics.resolve_score_ties(
+        data_for_scores, True
+    )
+    assert [team[1] for team in data_for_scores] == [
+        "Team C",
+        "Team A",
+        "Team B",
+        "Team D",
+    ]
+    assert [team[0] for team in data_for_scores] == ["1", "2", "3", "4"]
+
+
+def test_coaching_efficiency_ties_without_tiebreakers():
+    config = AppConfigParser()
+    config.read(os.path.join(module_dir, "EXAMPLE-config.ini"))
+    league = BaseLeague(1, "12345", config, "data", save_data=False)
+    league.player_data_by_week_function = lambda player_id, week: None
+
+    data_for_coaching_efficiency = [
+        [1, "Team A", "Manager A", "95.00%"],
+        [2, "Team B", "Manager C", "95.00%"],
+        [3, "Team C", "Manager B", "95.00%"],
+        [4, "Team D", "Manager D", "90.00%"],
+        [5, "Team E", "Manager E", "DQ"],
+    ]
+    ties_for_coaching_efficiency = CalculateMetrics.get_ties_count(
+        data_for_coaching_efficiency, "coaching_efficiency", False
+    )
+    assert ties_for_coaching_efficiency == 3
+
+    # tied teams are ordered by their last two columns (the manager and the coaching efficiency) in descending order
+    data_for_coaching_efficiency = (
+        CalculateMetrics.resolve_coaching_efficiency_ties(
+            data_for_coaching_efficiency,
+            ties_for_coaching_efficiency,
+            league,
+            {},
+            1,
+            1,
+            False,
+        )
+    )
+    assert [team[1] for team in data_for_coaching_efficiency] == [
+        "Team B",
+        "Team C",
+        "Team A",
+        "Team D",
+        "Team E",
+    ]
+    assert [team[0] for team in data_for_coaching_efficiency] == [
+        "1*",
+        "1*",
+        "1*",
+        "2",
+        "3",
+    ]
+
+
+if __name__ == "__main__":
+    print("Testing metric ranks...")
+
+    test_metric_ranks()
+    test_score_ties()
+    test_coaching_efficiency_ties_without_tiebreakers()
@@ -0,0 +1,153 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "wrenjr@yahoo.com"
+
+import os
+import sys
+
+import numpy as np
+
+module_dir = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(module_dir)
+
+from calculate.optimal_lineup import OptimalLineupSolver
+from calculate.points_by_position import PointsByPosition
+from dao.base import BaseLeague, BasePlayer
+from utils.app_config_parser import AppConfigParser
+
+roster_slot_counts = {
+    "QB": 1,
+    "RB": 2,
+    "WR": 2,
+    "TE": 1,
+    "FLEX_RB_TE_WR": 1,
+    "FLEX_QB_RB_TE_WR": 1,
+    "BN": 4,
+}
+flex_positions = {
+    "FLEX_RB_TE_WR": ["RB", "TE", "WR"],
+    "FLEX_QB_RB_TE_WR": ["QB", "RB", "TE", "WR"],
+}
+
+
+def get_player(position, points):
+    player = BasePlayer()
+    player.primary_position = position
+    player.points = points
+    player.eligible_positions = [position] + [
+        flex_position
+        for flex_position, base_positions in flex_positions.items()
+        if position in base_positions
+    ]
+    return player
+
+
+def get_brute_force_optimal_points(roster, open_slots=None):
+    if open_slots is None:
+        open_slots = {
+            position: count
+            for position, count in roster_slot_counts.items()
+            if position != "BN"
+        }
+    if not roster:
+        return 0, 0
+
+    # try the first player on the bench and in every open slot it is eligible for
+    optimal_lineup = get_brute_force_optimal_points(roster[1:], open_slots)
+    for position in roster[0].eligible_positions:
+        if open_slots.get(position, 0) > 0:
+            num_filled, points = get_brute_force_optimal_points(
+                roster[1:],
+                dict(open_slots, **{position: open_slots[position] - 1}),
+            )
+            optimal_lineup = max(
+                optimal_lineup,
+                (num_filled + 1, round(points + roster[0].points, 4)),
+            )
+    return optimal_lineup
+
+
+def test_optimal_lineup_with_overlapping_flex_slots():
+    solver = OptimalLineupSolver(roster_slot_counts, ["BN"])
+
+    # a player eligible for more than one position only fills one of its slots
+    running_back_wide_receiver = get_player("RB", 25)
+    running_back_wide_receiver.eligible_positions.append("WR")
+    roster = [
+        get_player("QB", 30),
+        get_player("QB", 25),
+        running_back_wide_receiver,
+        get_player("RB", 18),
+        get_player("RB", 10),
+        get_player("WR", 15),
+        get_player("WR", 12),
+        get_player("TE", 8),
+    ]
+    assert (
+        solver.get_optimal_points(roster)
+        == 30 + 25 + 25 + 18 + 15 + 12 + 8 + 10
+    )
+
+    # slots are filled even when the only eligible player scored negative points
+    assert solver.get_optimal_points([get_player("TE", -2)]) == -2
+
+
+def test_optimal_lineups_match_brute_force():
+    random_state = np.random.RandomState(3)
+    solver = OptimalLineupSolver(roster_slot_counts, ["BN"])
+
+    rosters = [
+        [
+            get_player(
+                random_state.choice(["QB", "RB", "WR", "TE"]),
+                int(random_state.randint(-3, 30)),
+            )
+            for _ in range(random_state.randint(3, 12))
+        ]
+        for _ in range(20)
+    ]
+    # the same roster is only solved once
+    rosters.append(list(reversed(rosters[0])))
+
+    optimal_points = solver.solve_rosters(rosters)
+    assert len(solver.optimal_points_by_fingerprint) == 20
+    for roster, roster_optimal_points in zip(rosters, optimal_points):
+        assert (
+            round(roster_optimal_points, 4)
+            == get_brute_force_optimal_points(roster)[1]
+        )
+
+
+def test_player_eligibility_masks():
+    config = AppConfigParser()
+    config.read(os.path.join(module_dir, "EXAMPLE-config.ini"))
+    league = BaseLeague(1, "12345", config, "data", save_data=False)
+    league.roster_position_counts.update(roster_slot_counts)
+    league.bench_positions = ["BN"]
+
+    running_back = get_player("RB", 12)
+    running_back.player_id = "1"
+    quarterback = get_player("QB", 20)
+    quarterback.player_id = "2"
+    league.players_by_week["1"] = {"1": running_back, "2": quarterback}
+    league.set_player_eligibility_masks()
+
+    roster_slot_table = league.get_roster_slot_table()
+    assert "BN" not in roster_slot_table
+    assert running_back.eligibility_mask == (
+        roster_slot_table["RB"]
+        | roster_slot_table["FLEX_RB_TE_WR"]
+        | roster_slot_table["FLEX_QB_RB_TE_WR"]
+    )
+
+    points_by_position = PointsByPosition(league, 1)
+    assert points_by_position.execute_points_by_position(
+        "team", [running_back, quarterback]
+    ) == [["QB", 20.0], ["RB", 12.0], ["TE", 0], ["WR", 0]]
+
+
+if __name__ == "__main__":
+    print("Testing optimal lineups...")
+
+    test_optimal_lineup_with_overlapping_flex_slots()
+    test_optimal_lineups_match_brute_force()
+    test_player_eligibility_masks()
@@ -0,0 +1,65 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "wrenjr@yahoo.com"
+
+import os
+import sys
+
+module_dir = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(module_dir)
+
+from dao.base import BaseLeague, BasePlayer
+from utils.app_config_parser import AppConfigParser
+
+
+class PlayerData(object):
+    def __init__(self, points):
+        self.player_points_value = points
+
+
+def test_player_points_are_retrieved_in_batches():
+    config = AppConfigParser()
+    config.read(os.path.join(module_dir, "EXAMPLE-config.ini"))
+    league = BaseLeague(2, "12345", config, "data", save_data=False)
+
+    player = BasePlayer()
+    player.player_id = "1"
+    player.points = 12
+    league.players_by_week["1"] = {}
+    league.players_by_week["2"] = {"1": player}
+
+    batches = []
+
+    def get_players_data(player_ids, week):
+        batches.append((list(player_ids), week))
+        return {
+            player_id: PlayerData(int(player_id) * int(week))
+            for player_id in player_ids
+            if player_id != "3"
+        }
+
+    player_data_requests = []
+
+    def get_player_data(player_id, week):
+        player_data_requests.append((player_id, week))
+        return PlayerData(0)
+
+    league.players_data_by_week_function = get_players_data
+    league.player_data_by_week_function = get_player_data
+    league.player_data_by_week_key = "player_points_value"
+
+    league.prefetch_player_points_by_week(["1", "2", "3"], [1, 2])
+
+    # players missing from the players of a week are retrieved together, and one at a time if the batch misses them
+    assert batches == [(["1", "2", "3"], "1"), (["2", "3"], "2")]
+    assert player_data_requests == [("3", "1"), ("3", "2")]
+    assert league.get_player_points_by_week("1", 1) == 1
+    assert league.get_player_points_by_week("1", 2) == 12
+    assert league.get_player_points_by_week("2", 2) == 4
+    assert league.get_player_points_by_week(3, "1") == 0
+    assert len(batches) == 2
+
+
+if __name__ == "__main__":
+    print("Testing player points...")
+
+    test_player_points_are_retrieved_in_batches()
@@ -0,0 +1,349 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "wrenjr@yahoo.com"
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+module_dir = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(module_dir)
+
+from calculate.playoff_probabilities import PlayoffProbabilities
+from dao.base import BaseTeam, BaseRecord
+from utils.app_config_parser import AppConfigParser
+
+test_data_dir = os.path.join(module_dir, "tests")
+
+config = AppConfigParser()
+config.read_dict(
+    {
+        "Settings": {
+            "num_playoff_slots_per_division": "1",
+            "cache_playoff_probs": "False",
+        }
+    }
+)
+
+num_playoff_slots = 4
+num_simulations = 20000
+
+
+def get_test_standings(num_teams=8, num_divisions=0):
+    standings = []
+    for team_num in range(1, num_teams + 1):
+        team = BaseTeam()
+        team.team_id = str(team_num)
+        team.name = "Team {0}".format(team_num)
+        team.manager_str = "Manager {0}".format(team_num)
+        if num_divisions:
+            team.division = (team_num % num_divisions) + 1
+        team.record = BaseRecord(
+            wins=num_teams - team_num,
+            losses=team_num - 1,
+            points_for=1000.0 + (10 * (num_teams - team_num)),
+            division=team.division,
+        )
+        standings.append(team)
+    return standings
+
+
+def get_test_remaining_matchups(standings, num_weeks=2):
+    team_ids = [team.team_id for team in standings]
+    remaining_matchups = {}
+    for week in range(1, num_weeks + 1):
+        remaining_matchups[week] = [
+            (team_ids[ndx], team_ids[-(ndx + 1)])
+            for ndx in range(len(team_ids) // 2)
+        ]
+        team_ids = [team_ids[0]] + team_ids[-1:] + team_ids[1:-1]
+    return remaining_matchups
+
+
+def get_playoff_probs(
+    num_divisions=0, num_workers=None, seed=None, max_exact_outcomes=0
+):
+    playoff_probs = PlayoffProbabilities(
+        config,
+        num_simulations,
+        13,
+        num_playoff_slots,
+        data_dir=test_data_dir,
+        num_divisions=num_divisions,
+        recalculate=True,
+        num_workers=num_workers,
+    )
+    playoff_probs.seed = seed
+    playoff_probs.max_exact_outcomes = max_exact_outcomes
+    return playoff_probs
+
+
+def test_playoff_probs_no_remaining_matchups():
+    standings = get_test_standings()
+    playoff_probs_data = get_playoff_probs().calculate(1, 1, standings, {})
+
+    for team in standings:
+        team_playoff_probs = playoff_probs_data[int(team.team_id)]
+        if int(team.team_id) <= num_playoff_slots:
+            assert team_playoff_probs[1] == 100.0
+            assert team_playoff_probs[2][int(team.team_id) - 1] == 100.0
+        else:
+            assert team_playoff_probs[1] == 0.0
+
+
+def test_playoff_probs_place_totals():
+    standings = get_test_standings()
+    playoff_probs_data = get_playoff_probs().calculate(
+        1, 1, standings, get_test_remaining_matchups(standings)
+    )
+
+    print("Playoff probabilities: {0}".format(playoff_probs_data))
+
+    assert (
+        round(sum(team[1] for team in playoff_probs_data.values()))
+        == 100 * num_playoff_slots
+    )
+    for place_ndx in range(num_playoff_slots):
+        assert (
+            round(
+                sum(team[2][place_ndx] for team in playoff_probs_data.values())
+            )
+            == 100
+        )
+
+
+def test_playoff_probs_with_divisions():
+    standings = get_test_standings(num_divisions=2)
+    playoff_probs_data = get_playoff_probs(num_divisions=2).calculate(
+        1, 1, standings, get_test_remaining_matchups(standings)
+    )
+
+    assert len([team for team in playoff_probs_data.values() if team[4]]) == 2
+    assert (
+        round(sum(team[1] for team in playoff_probs_data.values()))
+        == 100 * num_playoff_slots
+    )
+
+
+def test_playoff_probs_seeded_shards_reproducible():
+    standings = get_test_standings()
+    remaining_matchups = get_test_remaining_matchups(standings)
+
+    playoff_probs_data_runs = [
+        get_playoff_probs(num_workers=2, seed=42).calculate(
+            1, 1, standings, remaining_matchups
+        )
+        for _ in range(2)
+    ]
+
+    assert playoff_probs_data_runs[0] == playoff_probs_data_runs[1]
+
+
+def test_playoff_probs_clinch_statuses():
+    standings = get_test_standings()
+    playoff_probs = get_playoff_probs()
+    playoff_probs_data = playoff_probs.calculate(
+        1, 1, standings, get_test_remaining_matchups(standings)
+    )
+
+    assert playoff_probs.clinch_statuses["1"] == "clinched"
+    assert playoff_probs.clinch_statuses["8"] == "eliminated"
+    for team_id, clinch_status in playoff_probs.clinch_statuses.items():
+        team_playoff_probs = playoff_probs_data[int(team_id)]
+        assert team_playoff_probs[0].endswith(
+            playoff_probs.clinch_status_markers[clinch_status]
+        )
+        if clinch_status == "clinched":
+            assert team_playoff_probs[1] == 100.0
+        else:
+            assert team_playoff_probs[1] == 0.0
+
+
+def test_playoff_probs_exact_outcomes():
+    standings = get_test_standings()
+    remaining_matchups = get_test_remaining_matchups(standings)
+    num_outcomes = 2 ** sum(
+        len(week_matchups) for week_matchups in remaining_matchups.values()
+    )
+
+    playoff_probs = get_playoff_probs(max_exact_outcomes=num_outcomes)
+    playoff_probs_data = playoff_probs.calculate(
+        1, 1, standings, remaining_matchups
+    )
+
+    assert playoff_probs.is_exact
+    assert playoff_probs.simulations_run <= num_outcomes
+    assert (
+        round(sum(team[1] for team in playoff_probs_data.values()))
+        == 100 * num_playoff_slots
+    )
+    for team in playoff_probs_data.values():
+        outcome_count = team[1] * playoff_probs.simulations_run / 100
+        assert abs(outcome_count - round(outcome_count)) < 0.02
+
+
+def test_playoff_probs_adaptive_precision():
+    standings = get_test_standings()
+    remaining_matchups = get_test_remaining_matchups(standings)
+
+    playoff_probs = get_playoff_probs(seed=42)
+    playoff_probs.simulation_batch_size = 1000
+    playoff_probs.precision = 2.5
+    playoff_probs_data = playoff_probs.calculate(
+        1, 1, standings, remaining_matchups
+    )
+
+    assert playoff_probs.simulations_run < num_simulations
+    assert playoff_probs.simulations_run % 1000 == 0
+    playoff_tally = np.array(
+        [
+            team[1] * playoff_probs.simulations_run / 100
+            for team in playoff_probs_data.values()
+        ]
+    )
+    assert (
+        playoff_probs.get_confidence_interval(
+            playoff_tally, playoff_probs.simulations_run
+        ).max()
+        <= 2.5
+    )
+
+    playoff_probs.precision = 0.01
+    playoff_probs.calculate(1, 1, standings, remaining_matchups)
+
+    assert playoff_probs.simulations_run == num_simulations
+
+
+def test_playoff_probs_antithetic():
+    standings = get_test_standings()
+    remaining_matchups = get_test_remaining_matchups(standings)
+
+    playoff_probs = get_playoff_probs(seed=42)
+    playoff_probs.antithetic = True
+    playoff_probs_data = playoff_probs.calculate(
+        1, 1, standings, remaining_matchups
+    )
+
+    assert playoff_probs.simulations_run == num_simulations
+    assert playoff_probs.effective_sample_size > 0
+    assert (
+        round(sum(team[1] for team in playoff_probs_data.values()))
+        == 100 * num_playoff_slots
+    )
+
+
+def test_playoff_probs_scenarios():
+    standings = get_test_standings()
+    remaining_matchups = get_test_remaining_matchups(standings)
+
+    next_week_scenarios = get_playoff_probs(
+        seed=42
+    ).calculate_next_week_scenarios(standings, remaining_matchups)
+
+    assert len(next_week_scenarios) == len(standings)
+    for team_id, (
+        opponent_id,
+        win_chance,
+        loss_chance,
+    ) in next_week_scenarios.items():
+        assert next_week_scenarios[opponent_id][0] == team_id
+        assert win_chance >= loss_chance
+
+    try:
+        get_playoff_probs().calculate_scenarios(
+            standings, remaining_matchups, [[(1, "1", "2")]]
+        )
+        assert False
+    except ValueError:
+        pass
+
+
+def test_playoff_probs_historical():
+    standings = get_test_standings()
+    matchups_by_week = get_test_remaining_matchups(standings, num_weeks=4)
+    records_by_week = {
+        week: {
+            team.team_id: BaseRecord(
+                wins=team.record.get_wins() // (3 - week),
+                losses=team.record.get_losses() // (3 - week),
+                points_for=team.record.get_points_for(),
+            )
+            for team in standings
+        }
+        for week in [1, 2]
+    }
+
+    playoff_probs = get_playoff_probs(max_exact_outcomes=2**16)
+    playoff_chances_by_week = playoff_probs.calculate_historical(
+        standings, records_by_week, matchups_by_week
+    )
+
+    assert sorted(playoff_chances_by_week.keys()) == [1, 2]
+    for week, records in records_by_week.items():
+        for team in standings:
+            team.record = records[team.team_id]
+        playoff_probs_data = get_playoff_probs(
+            max_exact_outcomes=2**16
+        ).calculate(
+            1,
+            1,
+            standings,
+            {
+                matchups_week: matchups
+                for matchups_week, matchups in matchups_by_week.items()
+                if matchups_week > week
+            },
+        )
+        for team in standings:
+            assert (
+                playoff_chances_by_week[week][team.team_id]
+                == playoff_probs_data[int(team.team_id)][1]
+            )
+
+
+def test_playoff_probs_cache():
+    standings = get_test_standings()
+    remaining_matchups = get_test_remaining_matchups(standings)
+    cache_dir = tempfile.mkdtemp()
+
+    playoff_probs = get_playoff_probs()
+    playoff_probs.data_dir = cache_dir
+    playoff_probs.use_cache = True
+    playoff_probs_data = playoff_probs.calculate(
+        1, 1, standings, remaining_matchups
+    )
+    cache_files = os.listdir(os.path.join(cache_dir, "week_1"))
+
+    assert len(cache_files) == 1
+
+    # unchanged inputs reuse the cached results without simulating
+    playoff_probs.simulate = None
+    assert (
+        playoff_probs.calculate(1, 1, standings, remaining_matchups)
+        == playoff_probs_data
+    )
+
+    # changed inputs invalidate the cached results
+    del playoff_probs.simulate
+    playoff_probs.calculate(
+        1, 1, standings, get_test_remaining_matchups(standings, num_weeks=1)
+    )
+
+    assert os.listdir(os.path.join(cache_dir, "week_1")) != cache_files
+
+
+if __name__ == "__main__":
+    print("Testing playoff probabilities...")
+
+    test_playoff_probs_no_remaining_matchups()
+    test_playoff_probs_place_totals()
+    test_playoff_probs_with_divisions()
+    test_playoff_probs_seeded_shards_reproducible()
+    test_playoff_probs_clinch_statuses()
+    test_playoff_probs_exact_outcomes()
+    test_playoff_probs_adaptive_precision()
+    test_playoff_probs_antithetic()
+    test_playoff_probs_scenarios()
+    test_playoff_probs_historical()
+    test_playoff_probs_cache()
@@ -0,0 +1,130 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "wrenjr@yahoo.com"
+
+import os
+import sys
+import tempfile
+
+module_dir = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(module_dir)
+
+import report.batch as batch
+from report.batch import (
+    FantasyFootballBatchReport,
+    LeagueReportJob,
+    read_league_report_jobs,
+)
+from utils.app_config_parser import AppConfigParser
+
+
+class FantasyFootballReportStub(object):
+    """Fantasy football report that fails for league "failing" instead of generating a report."""
+
+    def __init__(
+        self, week_for_report=None, platform=None, league_id=None, **kwargs
+    ):
+        self.week_for_report = week_for_report
+        self.platform = platform
+        self.league_id = league_id
+
+    def create_pdf_report(self):
+        if self.league_id == "failing":
+            raise ValueError("Unable to retrieve league data.")
+        return "{0}-{1}-week_{2}.pdf".format(
+            self.platform, self.league_id, self.week_for_report or "default"
+        )
+
+
+def get_config():
+    config = AppConfigParser()
+    config.read(os.path.join(module_dir, "EXAMPLE-config.ini"))
+    config.set("Configuration", "data_dir", tempfile.mkdtemp())
+    config.set("Settings", "num_league_report_workers", "1")
+    for report_section in [
+        "league_bad_boy_rankings",
+        "league_beef_rankings",
+        "league_covid_risk_rankings",
+    ]:
+        config.set("Report", report_section, "False")
+    return config
+
+
+def write_jobs_file(lines):
+    jobs_file_path = os.path.join(tempfile.mkdtemp(), "league_jobs.csv")
+    with open(jobs_file_path, "w") as jobs_out:
+        jobs_out.write("\n".join(lines) + "\n")
+    return jobs_file_path
+
+
+def test_league_report_jobs_are_read():
+    jobs = read_league_report_jobs(
+        write_jobs_file(
+            [
+                "# platform,league_id,week",
+                "",
+                "Sleeper, 12345, 3",
+                "yahoo,54321",
+                "  espn,67890,  ",
+            ]
+        )
+    )
+    assert [(job.platform, job.league_id, job.week) for job in jobs] == [
+        ("sleeper", "12345", "3"),
+        ("yahoo", "54321", None),
+        ("espn", "67890", None),
+    ]
+
+
+def test_invalid_league_report_jobs_are_rejected():
+    for invalid_line in [
+        "nfl.com,12345",
+        "sleeper",
+        "sleeper,,3",
+        "sleeper,12345,18",
+        "sleeper,12345,three",
+        "sleeper,12345,3,extra",
+    ]:
+        jobs_file_path = write_jobs_file(["yahoo,54321", invalid_line])
+        try:
+            read_league_report_jobs(jobs_file_path)
+        except ValueError as e:
+            assert "line 2" in str(e)
+        else:
+            assert False
+
+
+def test_failed_league_report_does_not_stop_other_reports():
+    fantasy_football_report = batch.FantasyFootballReport
+    batch.FantasyFootballReport = FantasyFootballReportStub
+    try:
+        jobs = FantasyFootballBatchReport(
+            [
+                LeagueReportJob("sleeper", "12345", "3"),
+                LeagueReportJob("yahoo", "failing"),
+                LeagueReportJob("espn", "67890"),
+            ],
+            get_config(),
+            season=2020,
+        ).create_pdf_reports()
+    finally:
+        batch.FantasyFootballReport = fantasy_football_report
+
+    assert [job.report_pdf for job in jobs] == [
+        "sleeper-12345-week_3.pdf",
+        None,
+        "espn-67890-week_default.pdf",
+    ]
+    assert [job.error for job in jobs] == [
+        None,
+        repr(ValueError("Unable to retrieve league data.")),
+        None,
+    ]
+    assert all(job.duration is not None for job in jobs)
+
+
+if __name__ == "__main__":
+    print("Testing batch reports...")
+
+    test_league_report_jobs_are_read()
+    test_invalid_league_report_jobs_are_rejected()
+    test_failed_league_report_does_not_stop_other_reports()
@@ -0,0 +1,392 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "wrenjr@yahoo.com"
+
+import json
+import logging
+import os
+import pickle
+import sys
+import tempfile
+from collections import defaultdict
+
+import numpy as np
+
+module_dir = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(module_dir)
+
+import report.builder as builder
+from dao.base import BaseLeague, BaseMatchup, BasePlayer, BaseTeam
+from report.builder import FantasyFootballReport
+from utils.app_config_parser import AppConfigParser
+
+num_teams = 6
+num_weeks = 8
+week_for_report = 6
+
+
+class PdfGeneratorStub(object):
+    """PDF generator that keeps the report of every generated PDF instead of building it."""
+
+    generated_reports = []
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    def generate_pdf(self, filename_with_path, season_time_series):
+        PdfGeneratorStub.generated_reports.append(
+            dict(self.kwargs, season_time_series=season_time_series)
+        )
+        return filename_with_path
+
+
+class WarningHandler(logging.Handler):
+    """Logging handler that keeps the logged warnings."""
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.warnings = []
+
+    def emit(self, record):
+        self.warnings.append(record.getMessage())
+
+
+def get_config(output_dir, cache_report_data=True):
+    config = AppConfigParser()
+    config.read(os.path.join(module_dir, "EXAMPLE-config.ini"))
+    config.set("Configuration", "output_dir", output_dir)
+    config.set("Settings", "cache_report_data", str(cache_report_data))
+    config.set("Settings", "cache_playoff_probs", "False")
+    config.set("Settings", "save_report_trace", "False")
+    config.set("Settings", "num_playoff_simulations", "100")
+    config.set("Settings", "playoff_simulation_seed", "3")
+    config.set("Settings", "coaching_efficiency_disqualified_teams", "")
+    for report_section in [
+        "league_bad_boy_rankings",
+        "league_beef_rankings",
+        "league_covid_risk_rankings",
+        "league_playoff_scenarios",
+    ]:
+        config.set("Report", report_section, "False")
+    return config
+
+
+def get_league(config, data_dir, seed=1, week_for_league=week_for_report):
+    """Get a league with random scores and matchups for every week of the season, as of a week of the season."""
+    random_state = np.random.RandomState(seed)
+
+    league = BaseLeague(week_for_league, "12345", config, data_dir, False)
+    league.name = "Test League"
+    league.season = 2020
+    league.num_teams = num_teams
+    league.num_playoff_slots = 4
+    league.num_regular_season_weeks = num_weeks
+    league.roster_positions = ["QB", "RB", "WR", "BN"]
+    league.roster_position_counts = defaultdict(
+        int, {"QB": 1, "RB": 1, "WR": 1, "BN": 2}
+    )
+    league.active_positions = ["QB", "RB", "WR"]
+    league.bench_positions = ["BN"]
+
+    team_ids = [str(team_id) for team_id in range(1, num_teams + 1)]
+    for week in range(1, num_weeks + 1):
+        teams = {}
+        for team_id in team_ids:
+            team = BaseTeam()
+            team.week = week
+            team.team_id = team_id
+            team.name = "Team " + team_id
+            team.manager_str = "Manager " + team_id
+            for position, selected_position in [
+                ("QB", "QB"),
+                ("RB", "RB"),
+                ("WR", "WR"),
+                ("RB", "BN"),
+                ("WR", "BN"),
+            ]:
+                player = BasePlayer()
+                player.week_for_report = week_for_league
+                player.player_id = team_id + position + selected_position
+                player.full_name = "Player " + player.player_id
+                player.primary_position = position
+                player.display_position = position
+                player.eligible_positions = [position]
+                player.selected_position = selected_position
+                player.points = round(random_state.uniform(0, 30), 2)
+                team.roster.append(player)
+            team.points = round(
+                sum(
+                    player.points
+                    for player in team.roster
+                    if player.selected_position != "BN"
+                ),
+                2,
+            )
+            teams[team_id] = team
+        league.teams_by_week[str(week)] = teams
+
+        league.matchups_by_week[str(week)] = []
+        opponents = random_state.permutation(team_ids).tolist()
+        for matchup_ndx in range(0, num_teams, 2):
+            matchup = BaseMatchup()
+            matchup.week = week
+            matchup.complete = week <= week_for_league
+            matchup.teams = [
+                teams[opponents[matchup_ndx]],
+                teams[opponents[matchup_ndx + 1]],
+            ]
+            matchup.winner, matchup.loser = sorted(
+                matchup.teams, key=lambda x: x.points, reverse=True
+            )
+            league.matchups_by_week[str(week)].append(matchup)
+
+    league.current_standings = list(
+        league.teams_by_week[str(week_for_league)].values()
+    )
+    return league
+
+
+def get_report(config, league, test=False):
+    return FantasyFootballReport(
+        platform="yahoo",
+        league_id="12345",
+        season=2020,
+        config=config,
+        playoff_prob_sims=100,
+        test=test,
+        league=league,
+    )
+
+
+def create_pdf_report(report: FantasyFootballReport):
+    """Create the report with the PDF generator stubbed out, and get the report data passed to the PDF generator."""
+    return create_pdf_reports(report.create_pdf_report)[0]["report_data"]
+
+
+def create_pdf_reports(create_function):
+    """Create reports with the PDF generator stubbed out, and get the keyword arguments passed to the PDF generator of
+    every report.
+    """
+    pdf_generator = builder.PdfGenerator
+    builder.PdfGenerator = PdfGeneratorStub
+    try:
+        create_function()
+    finally:
+        builder.PdfGenerator = pdf_generator
+    generated_reports = list(PdfGeneratorStub.generated_reports)
+    del PdfGeneratorStub.generated_reports[:]
+    return generated_reports
+
+
+def get_report_tables(report_data):
+    return json.loads(
+        json.dumps(
+            {
+                attribute: value
+                for attribute, value in vars(report_data).items()
+                if attribute.startswith("data_for_")
+            },
+            default=str,
+        )
+    )
+
+
+def get_types(value):
+    """Get the nested types of a value, which change when tuples or numpy numbers do not survive a JSON round-trip."""
+    if isinstance(value, dict):
+        return {key: get_types(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [type(value).__name__] + [get_types(item) for item in value]
+    return type(value).__name__
+
+
+def get_loaded_weeks(config, league):
+    report = get_report(config, league)
+    return sorted(
+        report.calculate_season_records(list(range(1, week_for_report + 1)))[
+            0
+        ].keys()
+    )
+
+
+def test_changed_weeks_are_recalculated():
+    output_dir = tempfile.mkdtemp()
+    config = get_config(output_dir)
+
+    create_pdf_report(get_report(config, get_league(config, output_dir)))
+
+    # every week before the report week is reused when nothing changed
+    assert get_loaded_weeks(config, get_league(config, output_dir)) == [
+        1,
+        2,
+        3,
+        4,
+        5,
+    ]
+
+    # a changed score in week 3 changes the z-scores of every later week
+    league = get_league(config, output_dir)
+    team = league.teams_by_week["3"]["1"]
+    team.roster[0].points += 10
+    team.points += 10
+    assert get_loaded_weeks(config, league) == [1, 2]
+
+    # a changed roster in week 4 (a bench player in the lineup instead)
+    league = get_league(config, output_dir)
+    roster = league.teams_by_week["4"]["2"].roster
+    roster[1].selected_position, roster[3].selected_position = "BN", "RB"
+    assert get_loaded_weeks(config, league) == [1, 2, 3]
+
+    # changed opponents in week 5 change the records of every later week
+    league = get_league(config, output_dir)
+    matchups = league.matchups_by_week["5"]
+    matchups[0].teams[1], matchups[1].teams[1] = (
+        matchups[1].teams[1],
+        matchups[0].teams[1],
+    )
+    assert get_loaded_weeks(config, league) == [1, 2, 3, 4]
+
+    # results saved by another version of the metrics are recalculated
+    cache_version = builder.WEEK_RESULTS_CACHE_VERSION
+    builder.WEEK_RESULTS_CACHE_VERSION = cache_version + 1
+    try:
+        assert get_loaded_weeks(config, get_league(config, output_dir)) == []
+    finally:
+        builder.WEEK_RESULTS_CACHE_VERSION = cache_version
+
+
+def test_saved_week_results_match_calculated_week_results():
+    output_dir = tempfile.mkdtemp()
+    config = get_config(output_dir)
+    weeks = list(range(1, week_for_report + 1))
+
+    create_pdf_report(get_report(config, get_league(config, output_dir)))
+
+    report = get_report(config, get_league(config, output_dir))
+    (
+        loaded_week_results_by_week,
+        _,
+        season_score_statistics_by_week,
+    ) = report.calculate_season_records(weeks)
+    calculated_week_results_by_week = report.calculate_week_results(
+        weeks[:-1], season_score_statistics_by_week
+    )
+
+    for week in weeks[:-1]:
+        loaded_week_results = loaded_week_results_by_week[week]
+        calculated_week_results = calculated_week_results_by_week[week]
+        assert set(loaded_week_results.keys()) == {
+            "teams",
+            "teams_points",
+            "weekly_points_by_position",
+            "top_scorer",
+            "highest_ce",
+        }
+        assert loaded_week_results == calculated_week_results
+        assert get_types(loaded_week_results) == get_types(
+            calculated_week_results
+        )
+
+    # the season metrics of a report from saved results are the same as those of a report that calculates every week
+    cached_report_data = create_pdf_report(
+        get_report(config, get_league(config, output_dir))
+    )
+    uncached_config = get_config(output_dir, cache_report_data=False)
+    uncached_report_data = create_pdf_report(
+        get_report(uncached_config, get_league(uncached_config, output_dir))
+    )
+    assert get_report_tables(cached_report_data) == get_report_tables(
+        uncached_report_data
+    )
+
+
+def test_test_reports_do_not_use_saved_week_results():
+    output_dir = tempfile.mkdtemp()
+    config = get_config(output_dir)
+
+    report = get_report(config, get_league(config, output_dir), test=True)
+    assert not report.use_report_data_cache
+    create_pdf_report(report)
+    assert not os.path.exists(report.get_week_results_file_path(1))
+
+    # test reports do not load results saved by other reports either
+    create_pdf_report(get_report(config, get_league(config, output_dir)))
+    assert os.path.exists(report.get_week_results_file_path(1))
+    report = get_report(config, get_league(config, output_dir), test=True)
+    assert (
+        report.calculate_season_records(list(range(1, week_for_report + 1)))[0]
+        == {}
+    )
+
+
+def test_backfill_reports_match_single_week_reports():
+    output_dir = tempfile.mkdtemp()
+    config = get_config(output_dir, cache_report_data=False)
+
+    backfill_reports = create_pdf_reports(
+        get_report(
+            config, get_league(config, output_dir)
+        ).create_backfill_pdf_reports
+    )
+    assert len(backfill_reports) == week_for_report
+
+    for week, backfill_report in enumerate(backfill_reports, start=1):
+        week_report = create_pdf_reports(
+            get_report(
+                config, get_league(config, output_dir, week_for_league=week)
+            ).create_pdf_report
+        )[0]
+
+        assert int(backfill_report["league"].week_for_report) == week
+        assert (
+            backfill_report["report_title_text"]
+            == week_report["report_title_text"]
+            == "Test League (12345) Week {0} Report".format(week)
+        )
+
+        backfill_report_tables = get_report_tables(
+            backfill_report["report_data"]
+        )
+        week_report_tables = get_report_tables(week_report["report_data"])
+        for table in ["data_for_current_standings", "data_for_z_scores"]:
+            assert backfill_report_tables[table] == week_report_tables[table]
+
+
+def test_week_results_in_worker_processes_match_week_results_in_order():
+    output_dir = tempfile.mkdtemp()
+    config = get_config(output_dir, cache_report_data=False)
+    weeks = list(range(1, week_for_report + 1))
+
+    report = get_report(config, get_league(config, output_dir))
+    _, _, season_score_statistics_by_week = report.calculate_season_records(
+        weeks
+    )
+
+    # the report is pickled for worker processes that are spawned instead of forked (such as on macOS and Windows)
+    pickle.dumps(report)
+
+    # results that cannot be calculated in worker processes are calculated in order with a warning instead
+    warning_handler = WarningHandler()
+    builder.logger.addHandler(warning_handler)
+    try:
+        report.num_report_data_workers = 2
+        parallel_week_results_by_week = report.calculate_week_results(
+            weeks[:-1], season_score_statistics_by_week
+        )
+    finally:
+        builder.logger.removeHandler(warning_handler)
+    assert warning_handler.warnings == []
+
+    report.num_report_data_workers = 1
+    assert parallel_week_results_by_week == report.calculate_week_results(
+        weeks[:-1], season_score_statistics_by_week
+    )
+
+
+if __name__ == "__main__":
+    print("Testing report builder...")
+
+    test_changed_weeks_are_recalculated()
+    test_saved_week_results_match_calculated_week_results()
+    test_test_reports_do_not_use_saved_week_results()
+    test_backfill_reports_match_single_week_reports()
+    test_week_results_in_worker_processes_match_week_results_in_order()
@@ -0,0 +1,67 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "wrenjr@yahoo.com"
+
+import os
+import sys
+import time
+
+module_dir = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(module_dir)
+
+from report.scheduler import ReportStage, ReportStageScheduler
+
+
+def sleep_and_return(seconds, value):
+    time.sleep(seconds)
+    return value
+
+
+def test_io_bound_stages_run_concurrently():
+    report_stage_scheduler = ReportStageScheduler(
+        [
+            ReportStage("league", lambda: sleep_and_return(0.3, "league")),
+            ReportStage("bad_boy_stats", lambda: sleep_and_return(0.2, "bb")),
+            ReportStage("beef_stats", lambda: sleep_and_return(0.1, "beef")),
+            ReportStage(
+                "playoff_probs",
+                lambda league: league + " playoff probs",
+                inputs=["league"],
+                io_bound=False,
+            ),
+        ]
+    )
+
+    begin = time.time()
+    outputs = report_stage_scheduler.run()
+
+    assert time.time() - begin < 0.55
+    assert outputs == {
+        "league": "league",
+        "bad_boy_stats": "bb",
+        "beef_stats": "beef",
+        "playoff_probs": "league playoff probs",
+    }
+    assert [
+        stage.name for stage in report_stage_scheduler.get_critical_path()
+    ] == ["league", "playoff_probs"]
+
+
+def test_stage_dependency_cycles_are_rejected():
+    try:
+        ReportStageScheduler(
+            [
+                ReportStage("a", lambda b: b, inputs=["b"]),
+                ReportStage("b", lambda a: a, inputs=["a"]),
+            ]
+        )
+    except ValueError as e:
+        assert "cycle" in str(e)
+    else:
+        assert False
+
+
+if __name__ == "__main__":
+    print("Testing report stage scheduler...")
+
+    test_io_bound_stages_run_concurrently()
+    test_stage_dependency_cycles_are_rejected()
@@ -0,0 +1,62 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "wrenjr@yahoo.com"
+
+import os
+import sys
+
+module_dir = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(module_dir)
+
+from report.sections import ReportSections
+from utils.app_config_parser import AppConfigParser
+
+
+def get_report_config(enabled_settings):
+    config = AppConfigParser()
+    config.read(os.path.join(module_dir, "EXAMPLE-config.ini"))
+    for setting, _ in config.items("Report"):
+        config.set("Report", setting, str(setting in enabled_settings).lower())
+    return config
+
+
+def test_required_metrics_include_dependencies():
+    report_sections = ReportSections(
+        get_report_config({"league_power_rankings", "league_beef_rankings"})
+    )
+
+    assert report_sections.required_metrics == {
+        "power_rankings",
+        "coaching_efficiency_ties",
+        "beef_stats",
+    }
+
+
+def test_required_metrics_of_combined_sections():
+    # playoff scenarios are part of the playoff probabilities section, and team stats pages need both settings
+    report_sections = ReportSections(
+        get_report_config({"league_playoff_scenarios", "team_beef_stats"})
+    )
+    assert not report_sections.required_metrics
+
+    report_sections = ReportSections(
+        get_report_config(
+            {
+                "league_playoff_probs",
+                "league_playoff_scenarios",
+                "report_team_stats",
+                "team_beef_stats",
+            }
+        )
+    )
+    assert report_sections.required_metrics == {
+        "playoff_probs",
+        "playoff_scenarios",
+        "points_by_position",
+    }
+
+
+if __name__ == "__main__":
+    print("Testing report sections...")
+
+    test_required_metrics_include_dependencies()
+    test_required_metrics_of_combined_sections()
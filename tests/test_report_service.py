@@ -0,0 +1,118 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "wrenjr@yahoo.com"
+
+import datetime
+import os
+import sys
+
+module_dir = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(module_dir)
+
+from dao.base import BaseLeague, BaseTeam
+from report.service import (
+    FantasyFootballReportService,
+    ReportServiceRequest,
+    copy_league_data,
+)
+from utils.app_config_parser import AppConfigParser
+
+
+def test_report_requests_are_checked():
+    report_request = ReportServiceRequest.from_dict(
+        {"league_id": 12345, "week": 3, "metrics": True}, "Sleeper", "54321"
+    )
+    assert report_request.platform == "sleeper"
+    assert report_request.league_id == "12345"
+    assert report_request.week == "3"
+    assert report_request.include_metrics
+    assert report_request.wait
+    assert report_request.break_ties is None
+    assert report_request.to_dict()["status"] == "queued"
+
+    report_request = ReportServiceRequest.from_dict(
+        {"wait": False, "refresh": True, "break_ties": False, "dq_ce": True},
+        "sleeper",
+        "54321",
+    )
+    assert not report_request.wait
+    assert report_request.refresh
+    assert report_request.break_ties is False
+    assert report_request.dq_ce is True
+
+    for values in [
+        {"platform": "nfl.com"},
+        {"week": 18},
+        {"playoff_prob_sims": "many"},
+        ["sleeper", "12345"],
+        # boolean values must be JSON booleans
+        {"wait": "false"},
+        {"refresh": "false"},
+        {"metrics": 1},
+        {"break_ties": "true"},
+        {"dq_ce": "no"},
+    ]:
+        try:
+            ReportServiceRequest.from_dict(values, "sleeper", "54321")
+        except ValueError:
+            pass
+        else:
+            assert False
+
+
+def test_league_data_copies_share_config():
+    config = AppConfigParser()
+    config.read(os.path.join(module_dir, "EXAMPLE-config.ini"))
+
+    league = BaseLeague(1, "12345", config, "data", save_data=False)
+    team = BaseTeam()
+    team.team_id = "1"
+    league.teams_by_week["1"] = {"1": team}
+
+    league_copy = copy_league_data(league)
+    league_copy.teams_by_week["1"]["1"].points = 100
+
+    assert league_copy.config is config
+    assert league.teams_by_week["1"]["1"].points == 0
+
+
+def test_league_data_is_forgotten():
+    config = AppConfigParser()
+    config.read(os.path.join(module_dir, "EXAMPLE-config.ini"))
+
+    report_service = FantasyFootballReportService(config)
+    report_service.max_kept_leagues = 2
+    league = BaseLeague(1, "12345", config, "data", save_data=False)
+
+    # expired league data is forgotten when it is requested
+    report_service.keep_league_data(("sleeper", "1"), league)
+    assert report_service.get_league_data(("sleeper", "1")) is not None
+    report_service.league_data[("sleeper", "1")] = (
+        datetime.datetime.now()
+        - datetime.timedelta(seconds=report_service.league_data_ttl + 1),
+        league,
+    )
+    assert report_service.get_league_data(("sleeper", "1")) is None
+    assert ("sleeper", "1") not in report_service.league_data
+
+    # only the league data retrieved most recently is kept
+    for league_id in ["2", "3", "4"]:
+        report_service.keep_league_data(("sleeper", league_id), league)
+    assert sorted(report_service.league_data.keys()) == [
+        ("sleeper", "3"),
+        ("sleeper", "4"),
+    ]
+
+    # league locks are forgotten once no report is using them
+    with report_service.league_lock(("sleeper", "3")):
+        assert ("sleeper", "3") in report_service.league_locks
+    assert not report_service.league_locks
+
+    report_service.executor.shutdown()
+
+
+if __name__ == "__main__":
+    print("Testing report service...")
+
+    test_report_requests_are_checked()
+    test_league_data_copies_share_config()
+    test_league_data_is_forgotten()
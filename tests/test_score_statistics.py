@@ -0,0 +1,62 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "wrenjr@yahoo.com"
+
+import os
+import random
+import sys
+
+import numpy as np
+
+module_dir = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(module_dir)
+
+from calculate.score_statistics import SeasonScoreStatistics
+
+
+def test_z_scores_match_previous_weeks_scores():
+    rnd = random.Random(42)
+    team_ids = [str(team_num) for team_num in range(1, 11)]
+    weekly_teams_points = [
+        {team_id: round(rnd.uniform(60, 160), 2) for team_id in team_ids}
+        for _ in range(17)
+    ]
+    # a team with the same score every week has no standard deviation
+    for week_teams_points in weekly_teams_points:
+        week_teams_points["10"] = 100.0
+
+    season_score_statistics = SeasonScoreStatistics()
+    for week_ndx, week_teams_points in enumerate(weekly_teams_points):
+        z_scores = season_score_statistics.get_z_scores(week_teams_points)
+
+        for team_id in team_ids:
+            if week_ndx < 2:
+                assert z_scores[team_id] is None
+            else:
+                previous_scores = [
+                    previous_week_teams_points[team_id]
+                    for previous_week_teams_points in weekly_teams_points[
+                        :week_ndx
+                    ]
+                ]
+                standard_deviation = np.std(previous_scores)
+                expected_z_score = (
+                    (week_teams_points[team_id] - np.mean(previous_scores))
+                    / standard_deviation
+                    if standard_deviation != 0
+                    else 0
+                )
+                assert np.isclose(
+                    z_scores[team_id], expected_z_score, rtol=0, atol=1e-9
+                )
+
+        season_score_statistics.add_week(week_teams_points)
+
+    assert (
+        season_score_statistics.get_z_scores(weekly_teams_points[0])["10"] == 0
+    )
+
+
+if __name__ == "__main__":
+    print("Testing season score statistics...")
+
+    test_z_scores_match_previous_weeks_scores()
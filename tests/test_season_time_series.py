@@ -0,0 +1,51 @@
+__author__ = "Wren J. R. (uberfastman)"
+__email__ = "wrenjr@yahoo.com"
+
+import os
+import sys
+
+import numpy as np
+
+module_dir = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(module_dir)
+
+from calculate.season_time_series import SeasonTimeSeries
+
+
+def test_season_averages_skip_disqualified_and_missing_weeks():
+    season_time_series = SeasonTimeSeries(
+        ["2", "1", "3"], ["Team 2", "Team 1", "Team 3"], [1, 2, 3]
+    )
+    weekly_coaching_efficiency = [
+        {"1": 90.0, "2": "DQ", "3": "DQ"},
+        {"1": 80.0, "2": 70.0, "3": "DQ"},
+        {"1": "DQ", "2": 60.0, "3": None},
+    ]
+    for week, values_by_team_id in enumerate(
+        weekly_coaching_efficiency, start=1
+    ):
+        season_time_series.set_week_values(
+            week, "coaching_efficiency", values_by_team_id
+        )
+
+    coaching_efficiency = season_time_series.get_metric("coaching_efficiency")
+    assert coaching_efficiency.shape == (3, 3)
+    assert np.isnan(coaching_efficiency[0, 0])
+    assert coaching_efficiency[1, 1] == 80.0
+
+    season_averages = season_time_series.get_season_averages(
+        "coaching_efficiency"
+    )
+    assert season_averages[0] == 65.0
+    assert season_averages[1] == 85.0
+    assert np.isnan(season_averages[2])
+
+    assert season_time_series.get_season_totals("coaching_efficiency")[1] == (
+        90.0 + 80.0
+    )
+
+
+if __name__ == "__main__":
+    print("Testing season time series...")
+
+    test_season_averages_skip_disqualified_and_missing_weeks()
@@ -29,6 +29,7 @@ from dao.platforms.fleaflicker import LeagueData as FleaflickerLeagueData
 from dao.platforms.sleeper import LeagueData as SleeperLeagueData
 from dao.platforms.yahoo import LeagueData as YahooLeagueData
 from report.logger import get_logger
+from report.sections import ReportSections
 from utils.app_config_parser import AppConfigParser
 
 logger = get_logger(__name__, propagate=False)
@@ -690,7 +691,7 @@ def league_data_factory(
 
 
 def add_report_player_stats(
-    config,
+    report_sections: ReportSections,
     season,
     metrics,
     player,  # type: BasePlayer
@@ -705,7 +706,7 @@ def add_report_player_stats(
 
     if player.selected_position not in bench_positions:
 
-        if config.getboolean("Report", "league_bad_boy_rankings"):
+        if report_sections.is_required("bad_boy_stats"):
             bad_boy_stats = metrics.get("bad_boy_stats")  # type: BadBoyStats
             player.bad_boy_crime = bad_boy_stats.get_player_bad_boy_crime(
                 player.full_name, player.nfl_team_abbr, player.primary_position
@@ -721,7 +722,7 @@ def add_report_player_stats(
                 )
             )
 
-        if config.getboolean("Report", "league_beef_rankings"):
+        if report_sections.is_required("beef_stats"):
             beef_stats = metrics.get("beef_stats")  # type: BeefStats
             player.weight = beef_stats.get_player_weight(
                 player.first_name, player.last_name, player.nfl_team_abbr
@@ -730,10 +731,7 @@ def add_report_player_stats(
                 player.first_name, player.last_name, player.nfl_team_abbr
             )
 
-        if (
-            config.getboolean("Report", "league_covid_risk_rankings")
-            and int(season) >= 2020
-        ):
+        if report_sections.is_required("covid_risk") and int(season) >= 2020:
             covid_risk = metrics.get("covid_risk")  # type: CovidRisk
             player.covid_risk = covid_risk.get_player_covid_risk(
                 player.full_name, player.nfl_team_abbr, player.primary_position
@@ -743,7 +741,7 @@ def add_report_player_stats(
 
 
 def add_report_team_stats(
-    config,
+    report_sections: ReportSections,
     team: BaseTeam,
     league: BaseLeague,
     week_counter,
@@ -752,14 +750,16 @@ def add_report_team_stats(
     metrics,
     dq_ce,
     inactive_players,
+    add_player_stats=True,
 ) -> BaseTeam:
     team.name = metrics_calculator.decode_byte_string(team.name)
     bench_positions = league.bench_positions
 
-    for player in team.roster:
-        add_report_player_stats(
-            config, season, metrics, player, bench_positions
-        )
+    if add_player_stats:
+        for player in team.roster:
+            add_report_player_stats(
+                report_sections, season, metrics, player, bench_positions
+            )
 
     starting_lineup_points = round(
         sum(
@@ -793,7 +793,7 @@ def add_report_team_stats(
         2,
     )
 
-    if config.getboolean("Report", "league_bad_boy_rankings"):
+    if add_player_stats and report_sections.is_required("bad_boy_stats"):
         team.bad_boy_points = 0
         team.worst_offense = None
         team.num_offenders = 0
@@ -810,7 +810,7 @@ def add_report_team_stats(
                         team.worst_offense = p.bad_boy_crime
                         team.worst_offense_score = p.bad_boy_points
 
-    if config.getboolean("Report", "league_beef_rankings"):
+    if add_player_stats and report_sections.is_required("beef_stats"):
         team.total_weight = sum(
             [
                 p.weight
@@ -827,7 +827,8 @@ def add_report_team_stats(
         )
 
     if (
-        config.getboolean("Report", "league_covid_risk_rankings")
+        add_player_stats
+        and report_sections.is_required("covid_risk")
         and int(season) >= 2020
     ):
         team.total_covid_risk = sum(